@@ -1,17 +1,49 @@
 import json
-from src.ai.llm_service import get_llm_service
+from aws_lambda_api.lambda_runtime import LambdaRuntime, eager_init_enabled
+from src.ai.chat_jobs import get_chat_jobs
+
+def _llm_service():
+    from src.ai.llm_service import get_llm_service
+    return get_llm_service()
+
+def _llm_clients():
+    from src.ai.llm_clients import get_llm_clients
+    return get_llm_clients()
+
+def _active_prompt():
+    from src.ai.prompt_registry import get_prompt_registry
+    return get_prompt_registry().get_active('AI_Tasks')
+
+def _metrics():
+    stats = _llm_clients().stats()
+    return {'ConnectionReuseRate': stats['connection_reuse_rate'], 'LlmClientHitRate': stats['client_hit_rate']}
+runtime = LambdaRuntime('ai', [('chat_jobs', get_chat_jobs), ('llm_service', _llm_service), ('llm_clients', lambda: _llm_clients().warm()), ('active_prompt', _active_prompt)], metrics=_metrics)
+if eager_init_enabled():
+    runtime.init()
 
 def _response(status, body):
     return {'statusCode': status, 'body': json.dumps(body)}
 
+@runtime.handler
 def handler(event, context):
-    service = get_llm_service()
-    if event.get('httpMethod') == 'POST' and event.get('path') == '/chat':
-        params = event.get('queryStringParameters') or {}
-        user_id = params.get('user_id')
+    jobs = get_chat_jobs()
+    if 'chat_job' in event:
+        jobs.run(event['chat_job'])
+        return {'statusCode': 200}
+    method = event.get('httpMethod')
+    path = event.get('path', '')
+    params = event.get('queryStringParameters') or {}
+    user_id = params.get('user_id')
+    if not user_id:
+        return _response(400, {'message': 'user_id is required'})
+    if method == 'POST' and path == '/chat':
         data = json.loads(event.get('body') or '{}')
         text = data.get('text', '')
-        result = service.process_chat(user_id, text)
-        return _response(200, result)
+        chat_id = jobs.submit(user_id, text)
+        return _response(202, {'chat_id': chat_id, 'status': 'queued'})
+    if method == 'GET' and path.startswith('/chat/'):
+        job = jobs.get(path.split('/')[-1], user_id)
+        if job is None:
+            return _response(404, {'message': 'not found'})
+        return _response(200, job)
     return _response(400, {'message': 'bad request'})
-
@@ -1,9 +1,115 @@
+import base64
+import binascii
+import hashlib
 import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from aws_lambda_api.lambda_runtime import LambdaRuntime, eager_init_enabled
 from src.tasks.task_service import get_task_service
+runtime = LambdaRuntime('tasks', [('task_service', get_task_service)])
+if eager_init_enabled():
+    runtime.init()
 
-def _response(status, body):
-    return {'statusCode': status, 'body': json.dumps(body)}
+MAX_PAGE_SIZE = 500
+MAX_BATCH_OPS = 500
 
+def _json_default(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+def _response(status, body, headers=None):
+    response = {'statusCode': status, 'body': json.dumps(body, default=_json_default)}
+    if headers:
+        response['headers'] = headers
+    return response
+
+def _utc(value):
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def _validators(updated_at, *parts):
+    digest = hashlib.sha1('|'.join([str(p) for p in parts] + [updated_at.isoformat()]).encode('utf-8')).hexdigest()[:20]
+    return {'ETag': f'"{digest}"', 'Last-Modified': format_datetime(_utc(updated_at).astimezone(timezone.utc), usegmt=True)}
+
+def _not_modified(request_headers, validators):
+    headers = {k.lower(): v for k, v in (request_headers or {}).items()}
+    if 'if-none-match' in headers:
+        tags = [t.strip().removeprefix('W/') for t in headers['if-none-match'].split(',')]
+        return '*' in tags or validators['ETag'] in tags
+    if 'if-modified-since' in headers:
+        try:
+            since = _utc(parsedate_to_datetime(headers['if-modified-since']))
+        except (TypeError, ValueError):
+            return False
+        return parsedate_to_datetime(validators['Last-Modified']) <= since
+    return False
+
+def _conditional(request_headers, updated_at, *parts):
+    if updated_at is None:
+        return (None, {})
+    validators = _validators(updated_at, *parts)
+    if _not_modified(request_headers, validators):
+        return ({'statusCode': 304, 'headers': validators, 'body': ''}, validators)
+    return (None, validators)
+
+def _timestamp(value):
+    return _utc(datetime.fromisoformat(value.replace('Z', '+00:00')))
+
+def encode_cursor(task_id):
+    return base64.urlsafe_b64encode(task_id.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(token):
+    return base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode('utf-8')
+
+def _list_criteria(params):
+    criteria = {'status': params.get('status'), 'tag': params.get('tag'), 'limit': min(int(params.get('limit') or 100), MAX_PAGE_SIZE)}
+    if criteria['limit'] < 1:
+        raise ValueError('limit must be positive')
+    for key in ('due_before', 'due_after', 'since'):
+        if params.get(key):
+            criteria[key] = _timestamp(params[key])
+    if params.get('fields'):
+        criteria['fields'] = [f.strip() for f in params['fields'].split(',') if f.strip()]
+    if params.get('cursor'):
+        criteria['cursor'] = decode_cursor(params['cursor'])
+    return criteria
+
+def _list_tasks(service, user_id, params, request_headers=None):
+    try:
+        criteria = _list_criteria(params)
+    except (ValueError, binascii.Error, UnicodeDecodeError) as e:
+        return _response(400, {'message': f'bad request: {str(e)}'})
+    cached, validators = _conditional(request_headers, service.get_watermark(user_id), user_id, sorted(params.items()))
+    if cached:
+        return cached
+    try:
+        rows, next_cursor = service.query_tasks(user_id, **criteria)
+    except ValueError as e:
+        return _response(400, {'message': f'bad request: {str(e)}'})
+    fields = criteria.get('fields')
+    stamps = [r['updatedAt'] for r in rows if isinstance(r.get('updatedAt'), datetime)]
+    watermark = max(stamps + ([criteria['since']] if 'since' in criteria else []), default=None)
+    if fields:
+        rows = [{k: v for k, v in r.items() if k in ('id', 'removed') or k in fields} for r in rows]
+    headers = dict(validators)
+    if next_cursor:
+        headers['X-Next-Cursor'] = encode_cursor(next_cursor)
+    if watermark is not None:
+        headers['X-Watermark'] = watermark.isoformat()
+    return _response(200, rows, headers)
+
+def _batch(service, user_id, body):
+    try:
+        payload = json.loads(body or '{}')
+    except ValueError as e:
+        return _response(400, {'message': f'bad request: {str(e)}'})
+    operations = payload.get('operations') if isinstance(payload, dict) else payload
+    if not isinstance(operations, list) or not operations:
+        return _response(400, {'message': 'operations must be a non-empty list'})
+    if len(operations) > MAX_BATCH_OPS:
+        return _response(400, {'message': f'at most {MAX_BATCH_OPS} operations per batch'})
+    results = service.apply_batch(user_id, operations)
+    return _response(200, {'results': results, 'succeeded': sum((1 for r in results if r['ok'])), 'failed': sum((1 for r in results if not r['ok']))})
+
+@runtime.handler
 def handler(event, context):
     service = get_task_service()
     method = event.get('httpMethod')
@@ -11,8 +117,9 @@ def handler(event, context):
     params = event.get('queryStringParameters') or {}
     user_id = params.get('user_id')
     if path == '/tasks' and method == 'GET':
-        tasks = [t.to_dict() for t in service.get_all_tasks_for_user(user_id)]
-        return _response(200, tasks)
+        return _list_tasks(service, user_id, params, event.get('headers'))
+    if path == '/tasks:batch' and method == 'POST':
+        return _batch(service, user_id, event.get('body'))
     if path == '/tasks' and method == 'POST':
         data = json.loads(event.get('body') or '{}')
         task_id = service.create_task(user_id, data)
@@ -20,9 +127,15 @@ def handler(event, context):
     if path.startswith('/tasks/'):
         task_id = path.split('/')[-1]
         if method == 'GET':
+            request_headers = event.get('headers') or {}
+            if any((k.lower() in ('if-none-match', 'if-modified-since') for k in request_headers)):
+                cached, _ = _conditional(request_headers, service.get_task_updated_at(user_id, task_id), task_id)
+                if cached:
+                    return cached
             task = service.get_task(user_id, task_id)
             if task:
-                return _response(200, task.to_dict())
+                _, validators = _conditional(None, getattr(task, 'updated_at', None), task_id)
+                return _response(200, task.to_dict(), validators)
             return _response(404, {'message': 'not found'})
         if method == 'PUT':
             data = json.loads(event.get('body') or '{}')
@@ -0,0 +1,52 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+ROOT = Path(__file__).resolve().parents[1]
+HANDLERS = ('handler', 'ai_handler')
+FORBIDDEN = ('streamlit', 'langchain', 'langchain_openai', 'openai', 'pandas')
+BUDGET_MS = {'handler': 1500, 'ai_handler': 1500}
+
+def _run(code: str, importtime: bool=False) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(ROOT), str(ROOT / 'aws_lambda_api')]), PYTHONDONTWRITEBYTECODE='1', LAMBDA_EAGER_INIT='0')
+    args = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', code]
+    return subprocess.run(args, cwd=str(ROOT / 'aws_lambda_api'), env=env, capture_output=True, text=True, check=True)
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+def import_ms(module: str, runs: int=3) -> float:
+    samples = [parse_importtime(_run(f'import {module}', importtime=True).stderr)[module] / 1000 for _ in range(runs)]
+    return min(samples)
+
+def loaded_forbidden(module: str) -> List[str]:
+    code = f'import sys, json, {module}; print(json.dumps([m for m in {list(FORBIDDEN)!r} if m in sys.modules]))'
+    return json.loads(_run(code).stdout.strip().splitlines()[-1])
+
+def check(modules=HANDLERS, budgets: Optional[Dict[str, float]]=None, runs: int=3) -> Dict[str, Dict]:
+    budgets = budgets or BUDGET_MS
+    report = {}
+    for module in modules:
+        ms = import_ms(module, runs)
+        forbidden = loaded_forbidden(module)
+        report[module] = {'import_ms': round(ms, 1), 'budget_ms': budgets[module], 'forbidden': forbidden, 'ok': ms <= budgets[module] and not forbidden}
+    return report
+
+def main() -> int:
+    report = check()
+    for module, r in report.items():
+        print(f"{module:<12} import_ms={r['import_ms']:<8} budget_ms={r['budget_ms']:<6} forbidden={r['forbidden']} {('ok' if r['ok'] else 'REGRESSION')}")
+    return 0 if all((r['ok'] for r in report.values())) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+import json
+import logging
+import os
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple
+logger = logging.getLogger(__name__)
+NAMESPACE = 'TeamTasks/Lambda'
+
+def is_warmup(event: Dict[str, Any]) -> bool:
+    return bool(event.get('warmup')) or event.get('source') == 'serverless-plugin-warmup'
+
+def eager_init_enabled() -> bool:
+    default = '1' if os.environ.get('AWS_LAMBDA_FUNCTION_NAME') else '0'
+    return os.environ.get('LAMBDA_EAGER_INIT', default).lower() in ('1', 'true', 'yes')
+
+class LambdaRuntime:
+
+    def __init__(self, name: str, steps: List[Tuple[str, Callable[[], Any]]], metrics: Optional[Callable[[], Dict[str, float]]]=None, emit: Callable[[str], None]=print):
+        self.name = name
+        self.steps = steps
+        self.metrics = metrics
+        self.emit = emit
+        self.init_ms: Optional[float] = None
+        self.init_steps: Dict[str, float] = {}
+        self.init_errors: Dict[str, str] = {}
+        self.invocations = 0
+
+    def init(self) -> bool:
+        started = time.perf_counter()
+        for step, fn in self.steps:
+            step_started = time.perf_counter()
+            try:
+                fn()
+            except Exception as e:
+                self.init_errors[step] = str(e)
+                logger.error(f'Lambda init step {step} failed: {str(e)}')
+            self.init_steps[step] = round((time.perf_counter() - step_started) * 1000, 2)
+        self.init_ms = round((time.perf_counter() - started) * 1000, 2)
+        logger.info(f'{self.name} initialized in {self.init_ms}ms: {self.init_steps}')
+        return not self.init_errors
+
+    def _record(self, handle_ms: float, cold: bool, warmup: bool):
+        values = {'HandleMs': handle_ms, 'InitMs': self.init_ms if cold and self.init_ms is not None else 0.0, 'ColdStart': int(cold), 'Warmup': int(warmup)}
+        if self.metrics is not None:
+            try:
+                values.update(self.metrics())
+            except Exception as e:
+                logger.error(f'Error collecting metrics for {self.name}: {str(e)}')
+        units = {'HandleMs': 'Milliseconds', 'InitMs': 'Milliseconds'}
+        self.emit(json.dumps(dict(values, Function=self.name, _aws={'Timestamp': int(time.time() * 1000), 'CloudWatchMetrics': [{'Namespace': NAMESPACE, 'Dimensions': [['Function']], 'Metrics': [{'Name': k, 'Unit': units.get(k, 'None')} for k in values]}]})))
+
+    def handler(self, fn: Callable[[Dict[str, Any], Any], Dict[str, Any]]) -> Callable[[Dict[str, Any], Any], Dict[str, Any]]:
+
+        @wraps(fn)
+        def wrapped(event, context):
+            cold = self.invocations == 0
+            self.invocations += 1
+            started = time.perf_counter()
+            warmup = is_warmup(event or {})
+            try:
+                if warmup:
+                    return {'statusCode': 200, 'body': json.dumps({'warm': True, 'initMs': self.init_ms, 'initErrors': self.init_errors})}
+                return fn(event, context)
+            finally:
+                self._record(round((time.perf_counter() - started) * 1000, 2), cold, warmup)
+        wrapped.runtime = self
+        return wrapped
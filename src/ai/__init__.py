@@ -1,2 +1,7 @@
-from src.ai.prompt_repository import get_prompt_repository
-from src.ai.llm_executor import LlmExecutor
+_EXPORTS = {'get_prompt_repository': 'src.ai.prompt_repository', 'LlmExecutor': 'src.ai.llm_executor'}
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'src.ai' has no attribute '{name}'")
+    import importlib
+    return getattr(importlib.import_module(_EXPORTS[name]), name)
@@ -0,0 +1,115 @@
+import json
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from src.database.firestore import get_client
+from src.database.models import ChatJobStatus
+logger = logging.getLogger(__name__)
+
+class ChatJobs:
+
+    def __init__(self, max_workers: int=4, dispatcher: Optional[Callable[[Dict[str, Any]], None]]=None):
+        self.db = get_client()
+        self.collection = 'AI_chats'
+        self.dispatcher = dispatcher
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._max_workers = max_workers
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, user_id: str, input_text: str) -> str:
+        chat_id = self.db.create(self.collection, {'user_id': user_id, 'inputText': input_text, 'status': ChatJobStatus.QUEUED})
+        job = {'chat_id': chat_id, 'user_id': user_id, 'text': input_text}
+        if self.dispatcher is not None:
+            try:
+                self.dispatcher(job)
+            except Exception as e:
+                logger.error(f'Error dispatching chat job {chat_id}: {str(e)}')
+                self.db.update(self.collection, chat_id, {'status': ChatJobStatus.FAILED, 'error': f'Dispatch failed: {str(e)}'})
+                raise
+        else:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='chat-job')
+                future = self._pool.submit(self.run, job)
+                self._futures[chat_id] = future
+            future.add_done_callback(lambda f: self._forget(chat_id))
+        logger.info(f'Chat job {chat_id} queued for user {user_id}')
+        return chat_id
+
+    def _forget(self, chat_id: str):
+        with self._lock:
+            self._futures.pop(chat_id, None)
+
+    def _claim(self, chat_id: str) -> bool:
+
+        def build(data):
+            if not data or data.get('status') != ChatJobStatus.QUEUED:
+                return ([], False)
+            return ([('update', self.collection, chat_id, {'status': ChatJobStatus.RUNNING})], True)
+        return self.db.transact(self.collection, chat_id, build)
+
+    def run(self, job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        from src.ai.llm_service import get_llm_service
+        chat_id = job['chat_id']
+        if not self._claim(chat_id):
+            logger.warning(f'Chat job {chat_id} is no longer queued, skipping duplicate delivery')
+            return None
+        try:
+            result = get_llm_service().process_chat(job['user_id'], job['text'], chat_id=chat_id)
+            if result is None:
+                self.db.update(self.collection, chat_id, {'status': ChatJobStatus.FAILED, 'error': 'Task changes could not be applied'})
+            return result
+        except Exception as e:
+            logger.error(f'Chat job {chat_id} failed: {str(e)}')
+            self.db.update(self.collection, chat_id, {'status': ChatJobStatus.FAILED, 'error': str(e)})
+            return None
+
+    def get(self, chat_id: str, user_id: Optional[str]=None) -> Optional[Dict[str, Any]]:
+        data = self.db.read(self.collection, chat_id)
+        if not data:
+            return None
+        if user_id is not None and data.get('user_id') != user_id:
+            logger.warning(f'Chat job {chat_id} does not belong to user {user_id}')
+            return None
+        response = data.get('Response')
+        if isinstance(response, str):
+            response = json.loads(response)
+        return {'chat_id': chat_id, 'status': data.get('status', ChatJobStatus.DONE if response else ChatJobStatus.QUEUED), 'response': response, 'error': data.get('error')}
+
+    def subscribe(self, chat_id: str, callback: Callable[[Optional[Dict[str, Any]]], None]) -> bool:
+        with self._lock:
+            future = self._futures.get(chat_id)
+        if future is None:
+            callback(self.get(chat_id))
+            return False
+        future.add_done_callback(lambda f: callback(self.get(chat_id)))
+        return True
+
+    def wait(self, chat_id: str, timeout: Optional[float]=None) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            future = self._futures.get(chat_id)
+        if future is not None:
+            future.result(timeout=timeout)
+        return self.get(chat_id)
+
+def lambda_dispatcher(function_name: str) -> Callable[[Dict[str, Any]], None]:
+    import boto3
+    client = boto3.client('lambda')
+
+    def dispatch(job: Dict[str, Any]):
+        client.invoke(FunctionName=function_name, InvocationType='Event', Payload=json.dumps({'chat_job': job}).encode('utf-8'))
+    return dispatch
+_chat_jobs: Optional[ChatJobs] = None
+
+def get_chat_jobs() -> ChatJobs:
+    global _chat_jobs
+    if _chat_jobs is None:
+        function_name = os.environ.get('CHAT_JOB_FUNCTION_NAME')
+        if not function_name and os.environ.get('AWS_LAMBDA_FUNCTION_NAME'):
+            raise RuntimeError('CHAT_JOB_FUNCTION_NAME must be set in Lambda; background threads are frozen once the response is sent')
+        dispatcher = lambda_dispatcher(function_name) if function_name else None
+        _chat_jobs = ChatJobs(max_workers=int(os.environ.get('CHAT_JOB_WORKERS', '4')), dispatcher=dispatcher)
+    return _chat_jobs
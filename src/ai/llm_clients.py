@@ -0,0 +1,95 @@
+import json
+import logging
+import os
+import threading
+import weakref
+from typing import Any, Dict, Optional, Tuple
+import httpx
+logger = logging.getLogger(__name__)
+ChatOpenAI = None
+
+def _chat_openai():
+    global ChatOpenAI
+    if ChatOpenAI is None:
+        from langchain_openai import ChatOpenAI as chat_openai
+        ChatOpenAI = chat_openai
+    return ChatOpenAI
+
+def _schema_key(schema: Any) -> Any:
+    return json.dumps(schema, sort_keys=True) if isinstance(schema, dict) else schema
+
+class LlmClientRegistry:
+
+    def __init__(self, max_connections: int=20, keepalive_expiry: float=60):
+        self.max_connections = max_connections
+        self.keepalive_expiry = keepalive_expiry
+        self._lock = threading.Lock()
+        self._clients: Dict[Tuple, Any] = {}
+        self._http_client: Optional[httpx.Client] = None
+        self._seen_streams = weakref.WeakSet()
+        self._stats = {'client_requests': 0, 'client_hits': 0, 'http_requests': 0, 'new_connections': 0}
+
+    def _on_response(self, response: httpx.Response):
+        stream = response.extensions.get('network_stream')
+        with self._lock:
+            self._stats['http_requests'] += 1
+            try:
+                if stream is not None and stream in self._seen_streams:
+                    return
+                if stream is not None:
+                    self._seen_streams.add(stream)
+            except TypeError:
+                pass
+            self._stats['new_connections'] += 1
+
+    def http_client(self) -> httpx.Client:
+        with self._lock:
+            if self._http_client is None:
+                limits = httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections, keepalive_expiry=self.keepalive_expiry)
+                self._http_client = httpx.Client(limits=limits, timeout=httpx.Timeout(60.0, connect=10.0), event_hooks={'response': [self._on_response]})
+            return self._http_client
+
+    def get_chat(self, api_key: str, model: str, temperature: float, schema: Any=None):
+        key = (api_key, model, temperature, _schema_key(schema))
+        with self._lock:
+            self._stats['client_requests'] += 1
+            client = self._clients.get(key)
+            if client is not None:
+                self._stats['client_hits'] += 1
+                return client
+        http_client = self.http_client()
+        chat = _chat_openai()(api_key=api_key, model=model, temperature=temperature, http_client=http_client)
+        if schema is not None:
+            chat = chat.with_structured_output(schema)
+        with self._lock:
+            client = self._clients.setdefault(key, chat)
+        schema_name = schema.get('title') if isinstance(schema, dict) else getattr(schema, '__name__', None)
+        logger.info(f'LLM client created for {model} t={temperature} schema={schema_name}')
+        return client
+
+    def warm(self):
+        self.http_client()
+        _chat_openai()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['clients'] = len(self._clients)
+        requests = stats['http_requests']
+        stats['connection_reuse_rate'] = (requests - stats['new_connections']) / requests if requests else 0.0
+        stats['client_hit_rate'] = stats['client_hits'] / stats['client_requests'] if stats['client_requests'] else 0.0
+        return stats
+
+    def close(self):
+        with self._lock:
+            http_client, self._http_client = (self._http_client, None)
+            self._clients.clear()
+        if http_client is not None:
+            http_client.close()
+_llm_clients: Optional[LlmClientRegistry] = None
+
+def get_llm_clients() -> LlmClientRegistry:
+    global _llm_clients
+    if _llm_clients is None:
+        _llm_clients = LlmClientRegistry(max_connections=int(os.environ.get('OPENAI_MAX_CONNECTIONS', '20')))
+    return _llm_clients
@@ -1,39 +1,98 @@
 import os
+import sys
 import json
 import logging
 import traceback
 from contextlib import nullcontext
-from typing import Any, Dict
-import streamlit as st
+from typing import Any, Dict, Iterator, Tuple
 from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_openai import ChatOpenAI
-from langchain.callbacks.tracers import LangChainTracer
-from src.ai.llm_models import FirestoreEncoder, TaskChanges
+from src.ai.llm_clients import get_llm_clients
+from src.ai.task_context import TaskContext, build_task_context
+from src.ai.llm_models import ModifiedTask, NewTask, TaskChanges
+from src.database.models import PromptMode
 from src.tasks.task_service import get_task_service
 logger = logging.getLogger(__name__)
+STRUCTURE_PROMPT = 'You are an AI assistant that processes a list of task descriptions and structures them into new and modified tasks. Strictly adhere to the provided Pydantic model for the output format. Ensure all required fields are present for each task. The input text is a list of proposed changes.'
+SINGLE_PASS_SUFFIX = 'Return every change as a new task or a modified task, using the id of the existing task for modifications.'
+STREAM_ITEMS = (('new_tasks', 'new_task', NewTask), ('modified_tasks', 'modified_task', ModifiedTask))
 
 class LlmExecutor:
 
-    def __init__(self, service):
+    def __init__(self, service, chat_factory=None):
         self.service = service
+        self.chat_factory = chat_factory
 
-    def execute(self, user_id: str, system_prompt: str, user_input: str, task_list: Dict[str, Any], chat_id: str):
-        spinner = getattr(st, 'spinner', None)
-        if spinner is None:
-            spinner = nullcontext
+    def _chat(self, temperature: float, schema: Any=None):
+        if self.chat_factory is None:
+            return get_llm_clients().get_chat(self.service.api_key, self.service.model, temperature, schema)
+        chat = self.chat_factory(api_key=self.service.api_key, model=self.service.model, temperature=temperature)
+        return chat if schema is None else chat.with_structured_output(schema)
+
+    def execute(self, user_id: str, system_prompt: str, user_input: str, task_list: Dict[str, Any], chat_id: str, mode: str=PromptMode.TWO_PASS):
+        spinner = getattr(sys.modules.get('streamlit'), 'spinner', None) or nullcontext
         with spinner('Processing your request...'):
-            content1 = self._first_call(system_prompt, user_input, task_list)
-            resp = self._second_call(content1)
+            resp = self.plan(system_prompt, user_input, task_list, mode)
             final_response = self.__third_call(user_id, resp)
         return final_response
 
+    def stream(self, user_id: str, system_prompt: str, user_input: str, task_list: Dict[str, Any], mode: str=PromptMode.TWO_PASS) -> Iterator[Tuple[str, Any]]:
+        task_prompt = self._task_prompt(system_prompt, user_input, task_list)
+        if mode == PromptMode.SINGLE_PASS:
+            messages = [SystemMessage(content=f'{task_prompt}\n{SINGLE_PASS_SUFFIX}'), HumanMessage(content=user_input.strip())]
+        else:
+            content1 = ''
+            try:
+                first = [SystemMessage(content=f'{task_prompt}\nList each change separately.'), HumanMessage(content=user_input.strip())]
+                for chunk in self._chat(0.7).stream(first):
+                    token = getattr(chunk, 'content', '') or ''
+                    if token:
+                        content1 += token
+                        yield ('token', token)
+            except Exception as e:
+                logger.error(f'FIRST CALL (stream): Error calling OpenAI API: {str(e)}')
+                raise
+            messages = [SystemMessage(content=STRUCTURE_PROMPT), HumanMessage(content=content1)]
+        resp = yield from self._stream_changes(messages)
+        yield ('done', self.__third_call(user_id, resp))
+
+    def _stream_changes(self, messages) -> Iterator[Tuple[str, Any]]:
+        emitted = {key: 0 for key, _, _ in STREAM_ITEMS}
+        partial: Dict[str, Any] = {}
+        try:
+            chat = self._chat(0.2, TaskChanges.model_json_schema())
+            for partial in chat.stream(messages):
+                if not isinstance(partial, dict):
+                    continue
+                for key, event, model in STREAM_ITEMS:
+                    items = partial.get(key) or []
+                    # The last item may still be arriving; emit it once the next one starts.
+                    while emitted[key] < len(items) - 1:
+                        yield (event, model(**items[emitted[key]]))
+                        emitted[key] += 1
+        except Exception as e:
+            logger.error(f'SECOND CALL (stream): Error calling OpenAI API: {str(e)}')
+            raise
+        resp = TaskChanges(new_tasks=partial.get('new_tasks') or [], modified_tasks=partial.get('modified_tasks') or [])
+        for key, event, _ in STREAM_ITEMS:
+            for item in getattr(resp, key)[emitted[key]:]:
+                yield (event, item)
+        return resp
+
+    def plan(self, system_prompt: str, user_input: str, task_list: Dict[str, Any], mode: str=PromptMode.TWO_PASS) -> TaskChanges:
+        if mode == PromptMode.SINGLE_PASS:
+            return self._single_call(system_prompt, user_input, task_list)
+        content1 = self._first_call(system_prompt, user_input, task_list)
+        return self._second_call(content1)
+
+    def _task_prompt(self, system_prompt: str, user_input: str, task_list: Any) -> str:
+        context = task_list if isinstance(task_list, TaskContext) else build_task_context(user_input, task_list)
+        return f"{system_prompt}\n\n{context.text}\nBased on the user's request, determine what changes need to be made to the task list."
+
     def _first_call(self, system_prompt: str, user_input: str, task_list: Dict[str, Any]) -> str:
         try:
-            chat = ChatOpenAI(api_key=self.service.api_key, model=self.service.model, temperature=0.7)
+            chat = self._chat(0.7)
             clean_input = user_input.strip()
-            active_tasks_str = json.dumps(task_list.get('active', []), indent=2, cls=FirestoreEncoder)
-            completed_tasks_str = json.dumps(task_list.get('completed', []), indent=2, cls=FirestoreEncoder)
-            full_prompt = f"{system_prompt}\n\nCurrent active tasks:\n{active_tasks_str}\nCompleted tasks:\n{completed_tasks_str}\nBased on the user's request, determine what changes need to be made to the task list.\nList each change separately."
+            full_prompt = f'{self._task_prompt(system_prompt, user_input, task_list)}\nList each change separately.'
             messages = [SystemMessage(content=full_prompt), HumanMessage(content=clean_input)]
             logger.debug('\n\n\nCalling OpenAI with structured output schema PYDANTIC-H tool')
             response = chat.invoke(messages)
@@ -45,11 +104,10 @@ class LlmExecutor:
     def _second_call(self, content1: str) -> TaskChanges:
         logger.debug(f'\n\n\nCalling second-call {content1}')
         logger.debug(f'Entering _second_call. Received content1:\n{content1}')
-        system_prompt = 'You are an AI assistant that processes a list of task descriptions and structures them into new and modified tasks. Strictly adhere to the provided Pydantic model for the output format. Ensure all required fields are present for each task. The input text is a list of proposed changes.'
         try:
-            chat = ChatOpenAI(api_key=self.service.api_key, model=self.service.model, temperature=0.2)
-            messages = [SystemMessage(content=system_prompt), HumanMessage(content=content1)]
-            response = chat.with_structured_output(TaskChanges).invoke(messages)
+            chat = self._chat(0.2, TaskChanges)
+            messages = [SystemMessage(content=STRUCTURE_PROMPT), HumanMessage(content=content1)]
+            response = chat.invoke(messages)
             logger.debug(f'Successfully structured output in _second_call: {response}')
             return response
         except Exception as e:
@@ -64,20 +122,25 @@ class LlmExecutor:
             logger.error(f'SECOND CALL: Error calling OpenAI API. Details:\n{detailed_error_message}\nContent1 that caused error (first 500 chars):\n{content1[:500]}\nTraceback:\n{traceback.format_exc()}')
             raise
 
+    def _single_call(self, system_prompt: str, user_input: str, task_list: Dict[str, Any]) -> TaskChanges:
+        try:
+            chat = self._chat(0.2, TaskChanges)
+            full_prompt = f'{self._task_prompt(system_prompt, user_input, task_list)}\n{SINGLE_PASS_SUFFIX}'
+            messages = [SystemMessage(content=full_prompt), HumanMessage(content=user_input.strip())]
+            response = chat.invoke(messages)
+            logger.debug(f'Structured output from single call: {response}')
+            return response
+        except Exception as e:
+            logger.error(f'SINGLE CALL: Error calling OpenAI API: {str(e)}')
+            raise
+
     def _third_call(self, user_id: str, resp: TaskChanges) -> TaskChanges:
         logger.debug(f'\n\n\nCalling third-call {resp}')
         try:
-            ts = get_task_service()
-            for new_task in resp.new_tasks:
-                task_data = getattr(new_task, 'model_dump', new_task.dict)(exclude_none=True)
-                logger.debug(f'Creating task for {user_id}: {task_data}')
-                ts.create_task(user_id, task_data)
-            for mod_task in resp.modified_tasks:
-                task_id = mod_task.id
-                raw_data = getattr(mod_task, 'model_dump', mod_task.dict)(exclude={'id'})
-                update_data = {k: v for k, v in raw_data.items() if v is not None}
-                logger.debug(f'Updating task {task_id} for {user_id} with {update_data}')
-                ts.update_task(user_id, task_id, update_data)
+            results = get_task_service().apply_changes(user_id, resp)
+            for result in results:
+                if not result['ok']:
+                    logger.warning(f"THIRD CALL: {result['op']} {result['id']} failed for {user_id}: {result.get('error')}")
             return resp
         except Exception as e:
             logger.error(f'THIRD CALL: Error updating tasks - {str(e)}')
@@ -2,14 +2,15 @@ import os
 import json
 import logging
 import traceback
-from typing import Any, Dict, Optional
-import streamlit as st
+from typing import Any, Dict, Iterator, Optional, Tuple
 from src.ai.llm_executor import LlmExecutor
+from src.ai.response_cache import get_response_cache
+from src.ai.task_context import build_task_context
 from src.ai.llm_models import FirestoreEncoder, TaskChanges
 from src.tasks.task_service import get_task_service
 from src.database.firestore import get_client
-from src.database.models import AIPrompt, PromptStatus
-from src.ai.prompt_repository import get_prompt_repository
+from src.database.models import AIPrompt, ChatJobStatus, PromptStatus
+from src.ai.prompt_registry import get_prompt_registry
 logger = logging.getLogger(__name__)
 
 class LlmService:
@@ -23,17 +24,26 @@ class LlmService:
         self.db = get_client()
         self.collection = 'AI_chats'
         self.executor = LlmExecutor(self)
+        self.cache = get_response_cache()
 
-    def process_chat(self, user_id: str, input_text: str) -> Dict[str, Any]:
+    def process_chat(self, user_id: str, input_text: str, chat_id: Optional[str]=None) -> Dict[str, Any]:
         try:
             system_prompt = self._get_system_prompt()
-            chat_data = {'user_id': user_id, 'inputText': input_text, 'prompt_name': system_prompt.prompt_name, 'prompt_version': system_prompt.version}
-            task_list = self._list_tasks(user_id)
-            chat_id = self.db.create(self.collection, chat_data)
-            response = self.executor.execute(user_id, system_prompt.text, input_text, task_list, chat_id)
+            chat_data = {'user_id': user_id, 'inputText': input_text, 'prompt_name': system_prompt.prompt_name, 'prompt_version': system_prompt.version, 'prompt_mode': system_prompt.mode}
+            task_list = build_task_context(input_text, self._list_tasks(user_id))
+            chat_data.update(task_list.stats())
+            cached = self.cache.get(user_id, system_prompt, input_text, task_list.snapshot_hash)
+            chat_data['cacheHit'] = cached is not None
+            if chat_id is None:
+                chat_id = self.db.create(self.collection, chat_data)
+            else:
+                chat_data['status'] = ChatJobStatus.RUNNING
+                self.db.update(self.collection, chat_id, chat_data)
+            response = cached if cached is not None else self.executor.execute(user_id, system_prompt.text, input_text, task_list, chat_id, mode=system_prompt.mode)
             if response is None:
                 return None
-            self.db.update(self.collection, chat_id, {'Response': json.dumps(getattr(response, 'model_dump', response.dict)(), cls=FirestoreEncoder)})
+            self._remember(user_id, system_prompt, input_text, task_list.snapshot_hash, response)
+            self.db.update(self.collection, chat_id, {'Response': json.dumps(getattr(response, 'model_dump', response.dict)(), cls=FirestoreEncoder), 'status': ChatJobStatus.DONE})
             logger.debug(f'Chat processed for user {user_id}')
             return {'chat_id': chat_id, 'response': response}
         except Exception as e:
@@ -41,6 +51,37 @@ class LlmService:
             traceback.print_exc()
             raise
 
+    def stream_chat(self, user_id: str, input_text: str) -> Iterator[Tuple[str, Any]]:
+        try:
+            system_prompt = self._get_system_prompt()
+            chat_data = {'user_id': user_id, 'inputText': input_text, 'prompt_name': system_prompt.prompt_name, 'prompt_version': system_prompt.version, 'prompt_mode': system_prompt.mode}
+            task_list = build_task_context(input_text, self._list_tasks(user_id))
+            chat_data.update(task_list.stats())
+            cached = self.cache.get(user_id, system_prompt, input_text, task_list.snapshot_hash)
+            chat_data['cacheHit'] = cached is not None
+            chat_id = self.db.create(self.collection, chat_data)
+            events = iter([('done', cached)]) if cached is not None else self.executor.stream(user_id, system_prompt.text, input_text, task_list, mode=system_prompt.mode)
+            for event, payload in events:
+                if event != 'done':
+                    yield (event, payload)
+                    continue
+                if payload is None:
+                    yield ('done', None)
+                    return
+                self._remember(user_id, system_prompt, input_text, task_list.snapshot_hash, payload)
+                self.db.update(self.collection, chat_id, {'Response': json.dumps(getattr(payload, 'model_dump', payload.dict)(), cls=FirestoreEncoder), 'status': ChatJobStatus.DONE})
+                logger.debug(f'Chat streamed for user {user_id}')
+                yield ('done', {'chat_id': chat_id, 'response': payload})
+        except Exception as e:
+            logger.error(f'Error streaming chat for user {user_id}: {str(e)}')
+            traceback.print_exc()
+            raise
+
+    def _remember(self, user_id: str, system_prompt: AIPrompt, input_text: str, snapshot_hash: str, resp: TaskChanges):
+        if resp.new_tasks or resp.modified_tasks:
+            return
+        self.cache.put(user_id, system_prompt, input_text, snapshot_hash, resp)
+
     def _list_tasks(self, user_id: str):
         try:
             ts = get_task_service()
@@ -81,7 +122,7 @@ class LlmService:
     def _get_system_prompt(self) -> AIPrompt:
         DEFAULT_TEXT = "You are an expert Task manager. Given the user input which includes user's current task-list, first understand the user's goal and figure out what changes need to be made to user's task list."
         try:
-            prompt = get_prompt_repository().get_active_prompt('AI_Tasks')
+            prompt = get_prompt_registry().get_active('AI_Tasks')
             logger.info(f'Active AI_Tasks prompt: {prompt}')
             if prompt:
                 return prompt
@@ -89,33 +130,6 @@ class LlmService:
         except Exception as e:
             logger.error(f'Error getting system prompt: {str(e)}')
         return AIPrompt(prompt_name='AI_Tasks', text=DEFAULT_TEXT, status=PromptStatus.ACTIVE, version=0)
-
-    def __collect_feedback(self, chat_id: str, resp: TaskChanges) -> bool:
-        feedback_key = f'feedback_submitted_{chat_id}'
-        if st.session_state.get(feedback_key):
-            return True
-        with st.form(f'feedback_form_{chat_id}'):
-            st.subheader('New Tasks')
-            for t in resp.new_tasks:
-                st.json(getattr(t, 'model_dump', t.dict)(exclude_none=True))
-            st.subheader('Modified Tasks')
-            for t in resp.modified_tasks:
-                st.json(getattr(t, 'model_dump', t.dict)(exclude_none=True))
-            rating = st.radio('Are these updates correct?', ('👍', '👎'), key=f'rating_{chat_id}', horizontal=True)
-            text = st.text_area('Additional feedback', key=f'text_{chat_id}')
-            submit = st.form_submit_button('Submit')
-            cancel = st.form_submit_button('Cancel')
-        if submit:
-            logger.info(f'Feedback submitted for chat_id {chat_id}')
-            st.session_state[feedback_key] = True
-            self.db.update(self.collection, chat_id, {'feedbackRating': rating, 'feedbackText': text})
-            st.success('Feedback recorded')
-            return True
-        if cancel:
-            logger.info(f'Feedback cancelled for chat_id {chat_id}')
-            st.session_state[feedback_key] = True
-            return True
-        return False
 _llm_service: Optional[LlmService] = None
 
 def get_llm_service() -> LlmService:
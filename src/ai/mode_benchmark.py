@@ -0,0 +1,120 @@
+import json
+import os
+import re
+import sys
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+from src.ai.llm_executor import LlmExecutor
+from src.ai.llm_models import TaskChanges
+from src.database.models import PromptMode
+
+
+class StubChatModel:
+
+    def __init__(self, tasks: Dict[str, Any], latency: float=0.05, **kwargs):
+        self.tasks = tasks
+        self.latency = latency
+        self.calls = 0
+        self.prompt_chars = 0
+        self._schema = None
+
+    def __call__(self, **kwargs):
+        return self
+
+    def with_structured_output(self, schema):
+        structured = type(self)(self.tasks, self.latency)
+        structured._schema = schema
+        structured._parent = self
+        return structured
+
+    def _find_task(self, words: str) -> Optional[str]:
+        for task in self.tasks.get('active', []):
+            if words.lower() in (task.get('title') or '').lower():
+                return task['id']
+        return None
+
+    def _interpret(self, text: str) -> TaskChanges:
+        new_tasks, modified_tasks = ([], [])
+        plan = [line[2:] for line in text.splitlines() if line.startswith('- ')]
+        for clause in plan or re.split('\\s+and\\s+|\\.\\s+', text.strip().rstrip('.')):
+            added = re.match('(?:new task: |add (?:a task to )?)(.+?)(?: \\(due (\\S+)\\)| by (\\d{4}-\\d{2}-\\d{2}))?$', clause, re.IGNORECASE)
+            done = re.match('(?:complete task (\\S+)|mark the (.+?) task as (?:done|complete|completed))$', clause, re.IGNORECASE)
+            if added:
+                title = added.group(1).strip()
+                new_tasks.append({'title': title[0].upper() + title[1:], 'due_date': added.group(2) or added.group(3)})
+            elif done:
+                task_id = done.group(1) or self._find_task(done.group(2))
+                if task_id:
+                    modified_tasks.append({'id': task_id, 'status': 'completed'})
+        return TaskChanges(new_tasks=new_tasks, modified_tasks=modified_tasks)
+
+    def _plan_line(self, task: Any, modified: bool) -> str:
+        if modified:
+            return f'- complete task {task.id}'
+        return f'- new task: {task.title}' + (f' (due {task.due_date})' if task.due_date else '')
+
+    def invoke(self, messages):
+        owner = getattr(self, '_parent', self)
+        owner.calls += 1
+        owner.prompt_chars += sum(len(m.content) for m in messages)
+        time.sleep(self.latency)
+        changes = self._interpret(messages[-1].content)
+        if self._schema is not None:
+            return self._schema(**getattr(changes, 'model_dump', changes.dict)())
+        lines = [self._plan_line(t, False) for t in changes.new_tasks] + [self._plan_line(t, True) for t in changes.modified_tasks]
+        return SimpleNamespace(content='\n'.join(lines))
+
+
+def _dump(changes: Any) -> Dict[str, Any]:
+    return getattr(changes, 'model_dump', changes.dict)(exclude_none=True)
+
+
+def run_mode(mode: str, cases: List[Dict[str, Any]], latency: float=0.05, model: Optional[Callable[..., Any]]=None, live: bool=False) -> Dict[str, Any]:
+    elapsed = 0.0
+    calls = 0
+    prompt_chars = 0
+    outputs = []
+    wrong = []
+    for index, case in enumerate(cases):
+        stub = None if live else (model or StubChatModel)(case.get('tasks', {}), latency)
+        service = SimpleNamespace(api_key=os.environ.get('OPENAI_API_KEY'), model=os.environ.get('OPENAI_MODEL', 'gpt-4.1-mini')) if live else SimpleNamespace(api_key='offline', model='stub')
+        executor = LlmExecutor(service, chat_factory=stub)
+        start = time.perf_counter()
+        resp = executor.plan(case.get('system_prompt', ''), case['input'], case.get('tasks', {}), mode)
+        elapsed += time.perf_counter() - start
+        if stub is not None:
+            calls += stub.calls
+            prompt_chars += stub.prompt_chars
+        outputs.append(_dump(resp))
+        if outputs[-1] != _dump(case['expected']):
+            wrong.append(index)
+    return {'mode': PromptMode(mode).value, 'seconds': elapsed, 'calls': calls, 'prompt_chars': prompt_chars, 'outputs': outputs, 'wrong': wrong, 'accuracy': 1 - len(wrong) / len(cases) if cases else None}
+
+
+def compare_modes(cases: List[Dict[str, Any]], latency: float=0.05, model: Optional[Callable[..., Any]]=None, live: bool=False) -> Dict[str, Any]:
+    two_pass = run_mode(PromptMode.TWO_PASS, cases, latency, model, live)
+    single_pass = run_mode(PromptMode.SINGLE_PASS, cases, latency, model, live)
+    mismatches = [i for i, (a, b) in enumerate(zip(two_pass['outputs'], single_pass['outputs'])) if a != b]
+    return {'two_pass': two_pass, 'single_pass': single_pass, 'equivalent': not mismatches, 'mismatches': mismatches}
+
+
+def _sample_cases() -> List[Dict[str, Any]]:
+    tasks = {'active': [{'id': 't1', 'title': 'Book flights'}], 'completed': []}
+    return [
+        {'input': 'Add a task to renew my passport', 'tasks': tasks, 'expected': TaskChanges(new_tasks=[{'title': 'Renew my passport'}], modified_tasks=[])},
+        {'input': 'Mark the flights task as done', 'tasks': tasks, 'expected': TaskChanges(new_tasks=[], modified_tasks=[{'id': 't1', 'status': 'completed'}])},
+        {'input': 'Add a task to call the bank by 2024-05-01 and mark the flights task as done', 'tasks': tasks, 'expected': TaskChanges(new_tasks=[{'title': 'Call the bank', 'due_date': '2024-05-01'}], modified_tasks=[{'id': 't1', 'status': 'completed'}])},
+    ]
+
+
+def main(latency: Optional[float]=None, live: bool=False):
+    report = compare_modes(_sample_cases(), 0.05 if latency is None else latency, live=live)
+    for key in ('two_pass', 'single_pass'):
+        r = report[key]
+        print(f"{r['mode']:<12} calls={r['calls']:<3} prompt_chars={r['prompt_chars']:<6} seconds={r['seconds']:.3f} accuracy={r['accuracy']:.2f} wrong={r['wrong']}")
+    print(json.dumps({'equivalent': report['equivalent'], 'mismatches': report['mismatches']}))
+
+
+if __name__ == '__main__':
+    main(live='--live' in sys.argv)
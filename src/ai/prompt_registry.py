@@ -0,0 +1,98 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.ai.prompt_repository import get_prompt_repository
+from src.database.models import AIPrompt
+logger = logging.getLogger(__name__)
+
+class PromptRegistry:
+
+    def __init__(self, loader: Callable[[str], Optional[AIPrompt]], fresh_for: float=60, max_stale: float=600, clock: Callable[[], float]=time.monotonic, background: bool=True):
+        self.loader = loader
+        self.fresh_for = fresh_for
+        self.max_stale = max_stale
+        self.clock = clock
+        self.background = background
+        self._entries: Dict[str, Tuple[Optional[AIPrompt], float]] = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._watches: List[Any] = []
+        self._stats = {'hits': 0, 'stale_hits': 0, 'loads': 0, 'refreshes': 0, 'refresh_errors': 0}
+
+    def get_active(self, prompt_name: str) -> Optional[AIPrompt]:
+        with self._lock:
+            entry = self._entries.get(prompt_name)
+            age = self.clock() - entry[1] if entry else None
+            if entry is not None and age < self.fresh_for:
+                self._stats['hits'] += 1
+                return entry[0]
+            if entry is not None and age < self.max_stale:
+                self._stats['stale_hits'] += 1
+                start = prompt_name not in self._refreshing
+                self._refreshing.add(prompt_name)
+            else:
+                start = None
+        if start is None:
+            self._stats['loads'] += 1
+            return self.refresh(prompt_name)
+        if start:
+            if self.background:
+                threading.Thread(target=self._revalidate, args=(prompt_name,), daemon=True, name=f'prompt-refresh-{prompt_name}').start()
+            else:
+                self._revalidate(prompt_name)
+        return entry[0]
+
+    def _revalidate(self, prompt_name: str):
+        try:
+            self.refresh(prompt_name)
+        except Exception as e:
+            self._stats['refresh_errors'] += 1
+            logger.error(f'Error refreshing prompt {prompt_name}: {str(e)}')
+        finally:
+            with self._lock:
+                self._refreshing.discard(prompt_name)
+
+    def refresh(self, prompt_name: str) -> Optional[AIPrompt]:
+        prompt = self.loader(prompt_name)
+        with self._lock:
+            self._entries[prompt_name] = (prompt, self.clock())
+            self._stats['refreshes'] += 1
+        logger.info(f"Prompt registry loaded {prompt_name} v{getattr(prompt, 'version', None)}")
+        return prompt
+
+    def invalidate(self, prompt_name: Optional[str]=None):
+        with self._lock:
+            if prompt_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(prompt_name, None)
+
+    def watch(self, db: Any, collection: str, prompt_name: str):
+        from google.cloud.firestore_v1 import FieldFilter
+
+        def on_change(docs, changes, read_time):
+            logger.info(f'Prompt {prompt_name} changed, refreshing')
+            self._revalidate(prompt_name)
+        query = db.collection(collection).where(filter=FieldFilter('prompt_name', '==', prompt_name))
+        self._watches.append(query.on_snapshot(on_change))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries))
+_prompt_registry: Optional[PromptRegistry] = None
+
+def get_prompt_registry() -> PromptRegistry:
+    global _prompt_registry
+    if _prompt_registry is None:
+        _prompt_registry = PromptRegistry(lambda name: get_prompt_repository().get_active_prompt(name), fresh_for=float(os.environ.get('PROMPT_CACHE_TTL', '60')), max_stale=float(os.environ.get('PROMPT_CACHE_MAX_STALE', '600')))
+        watched = os.environ.get('PROMPT_REGISTRY_WATCH', '')
+        if watched:
+            repo = get_prompt_repository()
+            for name in watched.split(','):
+                try:
+                    _prompt_registry.watch(repo.db.db, repo.collection, name.strip())
+                except Exception as e:
+                    logger.error(f'Error watching prompt {name}: {str(e)}')
+    return _prompt_registry
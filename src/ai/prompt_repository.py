@@ -1,43 +1,132 @@
 import logging
-from typing import Dict, List, Optional, Any
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple
+from src.ai.prompt_text_store import PromptTextStore
 from src.database.firestore import get_client
-from src.database.models import AIPrompt, PromptStatus
+from src.database.models import AIPrompt, AIPromptHead, PromptMode, PromptStatus
 logger = logging.getLogger(__name__)
+CATALOG_VERSION = 1
 
 class PromptRepository:
+    HEAD_FIELDS = ['prompt_name', 'version', 'status', 'mode', 'createdAt']
+    LIST_FIELDS = ['prompt_name', 'version', 'status', 'mode', 'textHash', 'createdAt', 'updatedAt']
 
     def __init__(self):
         self.collection = 'AI_prompts'
+        self.heads = 'AI_prompt_heads'
+        self.meta = 'AI_prompt_meta'
         self.db = get_client()
+        self._catalog_ready = False
+        self.texts = PromptTextStore(self.db, use_delta=os.environ.get('PROMPT_TEXT_DELTA', '').lower() in ('1', 'true', 'yes'))
+
+    def _hydrate(self, prompts: List[AIPrompt]) -> List[AIPrompt]:
+        lazy = [p for p in prompts if p.text is None and p.text_hash]
+        if lazy:
+            texts = self.texts.get_many([p.text_hash for p in lazy])
+            for prompt in lazy:
+                prompt.text = texts[prompt.text_hash]
+        return prompts
+
+    def _entry(self, prompt_id: str, version: int, mode: str, created_at: Any=None) -> Dict[str, Any]:
+        return {'id': prompt_id, 'version': version, 'mode': mode or PromptMode.TWO_PASS, 'createdAt': created_at or datetime.now()}
+
+    def _set_latest(self, head: AIPromptHead):
+        head.versions.sort(key=lambda v: v.get('version', 0), reverse=True)
+        head.latest_id = head.versions[0]['id'] if head.versions else None
+        head.latest_version = head.versions[0]['version'] if head.versions else None
+
+    def _set_active(self, head: AIPromptHead, prompt: Optional[AIPrompt]):
+        head.active = prompt
+        head.active_id = prompt.id if prompt else None
+        head.active_version = prompt.version if prompt else None
+
+    def _build_head(self, prompt_name: str, rows: List[Dict[str, Any]]) -> Tuple[AIPromptHead, List[str]]:
+        head = AIPromptHead(prompt_name=prompt_name, versions=[self._entry(r['id'], r.get('version', 1), r.get('mode'), r.get('createdAt')) for r in rows])
+        self._set_latest(head)
+        actives = [r for r in rows if r.get('status') == PromptStatus.ACTIVE]
+        if actives:
+            newest = max(actives, key=lambda r: r.get('version', 0))
+            self._set_active(head, self.get_prompt(newest['id']))
+        return (head, [r['id'] for r in actives])
+
+    def _load_head(self, prompt_name: str) -> Tuple[Optional[AIPromptHead], List[str]]:
+        return self._resolve_head(prompt_name, self.db.read(self.heads, prompt_name))
+
+    def _resolve_head(self, prompt_name: str, data: Optional[Dict[str, Any]]) -> Tuple[Optional[AIPromptHead], List[str]]:
+        if self._complete(data):
+            head = AIPromptHead.from_dict(data)
+            return (head, [head.active_id] if head.active_id else [])
+        rows = self.db.query(self.collection, filters=[('prompt_name', '==', prompt_name)], fields=self.HEAD_FIELDS)
+        if not rows:
+            return (None, [])
+        logger.info(f'Building catalog head for legacy prompt {prompt_name}')
+        return self._build_head(prompt_name, rows)
+
+    def _complete(self, head: Optional[Dict[str, Any]]) -> bool:
+        return bool(head and head.get('versions') and head.get('latestId'))
 
     def get_active_prompt(self, prompt_name: str) -> Optional[AIPrompt]:
         try:
+            head = self.db.read(self.heads, prompt_name)
+            if head and head.get('prompt'):
+                return AIPrompt.from_dict(dict(head['prompt'], id=head.get('activeId')))
             filters = [('prompt_name', '==', prompt_name), ('status', '==', PromptStatus.ACTIVE)]
             prompts_data = self.db.query(self.collection, filters=filters, order_by='version', direction='DESCENDING', limit=1)
             if not prompts_data:
                 logger.warning(f'No active prompt found with name: {prompt_name}')
                 return None
-            return AIPrompt.from_dict(prompts_data[0])
+            return self._hydrate([AIPrompt.from_dict(prompts_data[0])])[0]
         except Exception as e:
             logger.error(f'Error getting active prompt {prompt_name}: {str(e)}')
             raise
 
+    def get_catalog(self) -> List[AIPromptHead]:
+        try:
+            if not self._catalog_ready:
+                marker = self.db.read(self.meta, 'catalog')
+                if not marker or marker.get('version', 0) < CATALOG_VERSION:
+                    return self.rebuild_catalog()
+                self._catalog_ready = True
+            rows = self.db.query(self.heads, order_by='prompt_name', direction='ASCENDING')
+            if not all((self._complete(r) for r in rows)):
+                return self.rebuild_catalog()
+            return [AIPromptHead.from_dict(r) for r in rows]
+        except Exception as e:
+            logger.error(f'Error getting prompt catalog: {str(e)}')
+            raise
+
+    def rebuild_catalog(self) -> List[AIPromptHead]:
+        try:
+            grouped: Dict[str, List[Dict[str, Any]]] = {}
+            for row in self.db.query(self.collection, fields=self.HEAD_FIELDS):
+                if row.get('prompt_name'):
+                    grouped.setdefault(row['prompt_name'], []).append(row)
+            heads = [self._build_head(name, rows)[0] for name, rows in sorted(grouped.items())]
+            writes = [('set', self.heads, head.prompt_name, head.to_dict()) for head in heads]
+            self.db.batch_write(writes + [('set', self.meta, 'catalog', {'version': CATALOG_VERSION, 'heads': len(heads)})])
+            self._catalog_ready = True
+            logger.info(f'Rebuilt prompt catalog with {len(heads)} heads')
+            return heads
+        except Exception as e:
+            logger.error(f'Error rebuilding prompt catalog: {str(e)}')
+            raise
+
+    def get_prompt(self, prompt_id: str) -> Optional[AIPrompt]:
+        data = self.db.read(self.collection, prompt_id)
+        return self._hydrate([AIPrompt.from_dict(data)])[0] if data else None
+
     def get_latest_prompts(self) -> List[AIPrompt]:
         try:
-            prompts_data = self.db.query(self.collection, order_by='version', direction='DESCENDING')
-            latest = {}
-            for data in prompts_data:
-                name = data.get('prompt_name')
-                if name and name not in latest:
-                    latest[name] = AIPrompt.from_dict(data)
-            return list(latest.values())
+            found = self.db.get_many(self.collection, [h.latest_id for h in self.get_catalog() if h.latest_id])
+            return self._hydrate([AIPrompt.from_dict(d) for d in found.values() if d])
         except Exception as e:
             logger.error(f'Error getting latest prompts: {str(e)}')
             raise
 
     def get_all_prompts(self) -> List[AIPrompt]:
         try:
-            prompts_data = self.db.query(self.collection, order_by='prompt_name', direction='ASCENDING')
+            prompts_data = self.db.query(self.collection, order_by='prompt_name', direction='ASCENDING', fields=self.LIST_FIELDS)
             return [AIPrompt.from_dict(d) for d in prompts_data]
         except Exception as e:
             logger.error(f'Error getting all prompts: {str(e)}')
@@ -49,7 +138,7 @@ class PromptRepository:
             data = self.db.query(self.collection, filters=filters, limit=1)
             if not data:
                 return None
-            return AIPrompt.from_dict(data[0])
+            return self._hydrate([AIPrompt.from_dict(data[0])])[0]
         except Exception as e:
             logger.error(f'Error getting prompt {name} v{version}: {str(e)}')
             raise
@@ -57,46 +146,91 @@ class PromptRepository:
     def create_prompt(self, prompt: AIPrompt) -> str:
         try:
             prompt.validate()
-            prompt_data = prompt.to_dict()
-            prompt_id = self.db.create(self.collection, prompt_data)
+            prompt_id = self.db.transact(self.heads, prompt.prompt_name, lambda data: self._create(prompt, *self._resolve_head(prompt.prompt_name, data)))
             logger.info(f'Prompt created with ID: {prompt_id}')
             return prompt_id
         except Exception as e:
             logger.error(f'Error creating prompt: {str(e)}')
             raise
 
+    def _create(self, prompt: AIPrompt, head: Optional[AIPromptHead], actives: List[str], base_hash: Optional[str]=None) -> Tuple[List[tuple], str]:
+        head = head or AIPromptHead(prompt_name=prompt.prompt_name)
+        prompt.id = self.db.new_id(self.collection)
+        prompt.text_hash, text_write = self.texts.put(prompt.text, base_hash)
+        data = prompt.to_dict()
+        data.pop('text')
+        writes = ([text_write] if text_write else []) + [('set', self.collection, prompt.id, data)]
+        head.versions.append(self._entry(prompt.id, prompt.version, prompt.mode))
+        self._set_latest(head)
+        if prompt.status == PromptStatus.ACTIVE:
+            writes.extend((('update', self.collection, prompt_id, {'status': PromptStatus.INACTIVE}) for prompt_id in actives))
+            self._set_active(head, prompt)
+        writes.append(('set', self.heads, prompt.prompt_name, head.to_dict()))
+        return (writes, prompt.id)
+
     def create_prompt_version(self, prompt_id: str, prompt_data: Dict[str, Any]) -> str:
         try:
             original = self.db.read(self.collection, prompt_id)
             if not original:
                 raise ValueError(f'Prompt {prompt_id} not found')
-            version = original.get('version', 1) + 1
-            new_prompt = AIPrompt(prompt_name=original.get('prompt_name'), text=prompt_data.get('text', original.get('text')), status=PromptStatus.INACTIVE, version=version)
-            new_prompt.validate()
-            return self.create_prompt(new_prompt)
+            text = prompt_data.get('text') or original.get('text')
+            if not text:
+                if not original.get('textHash'):
+                    raise ValueError(f'Prompt {prompt_id} has neither text nor textHash')
+                text = self.texts.get(original['textHash'])
+
+            def build(data):
+                head, actives = self._resolve_head(original.get('prompt_name'), data)
+                version = max(original.get('version', 1), (head.latest_version or 0) if head else 0) + 1
+                new_prompt = AIPrompt(prompt_name=original.get('prompt_name'), text=text, status=PromptStatus.INACTIVE, version=version, mode=prompt_data.get('mode', original.get('mode', PromptMode.TWO_PASS)))
+                new_prompt.validate()
+                return self._create(new_prompt, head, actives, original.get('textHash'))
+            prompt_id = self.db.transact(self.heads, original.get('prompt_name'), build)
+            logger.info(f'Prompt created with ID: {prompt_id}')
+            return prompt_id
         except Exception as e:
             logger.error(f'Error creating new version for {prompt_id}: {str(e)}')
             raise
 
     def set_active_version(self, prompt_name: str, version: int) -> bool:
         try:
-            prompts = self.db.query(self.collection, filters=[('prompt_name', '==', prompt_name)])
-            if not prompts:
-                raise ValueError(f'Prompt {prompt_name} not found')
-            found = False
-            for p in prompts:
-                status = PromptStatus.ACTIVE if p.get('version') == version else PromptStatus.INACTIVE
-                if p.get('version') == version:
-                    found = True
-                self.db.update(self.collection, p['id'], {'status': status})
-            return found
+            activated = self.db.transact(self.heads, prompt_name, lambda data: self._activate(prompt_name, version, data))
+            if activated:
+                logger.info(f'Activated {prompt_name} v{version}')
+            else:
+                logger.warning(f'Prompt {prompt_name} v{version} not found, active version unchanged')
+            return activated
         except Exception as e:
             logger.error(f'Error setting active version {prompt_name} v{version}: {str(e)}')
             raise
 
+    def _activate(self, prompt_name: str, version: int, data: Optional[Dict[str, Any]]) -> Tuple[List[tuple], bool]:
+        head, actives = self._resolve_head(prompt_name, data)
+        if head is None:
+            raise ValueError(f'Prompt {prompt_name} not found')
+        entry = next((v for v in head.versions if v.get('version') == version), None)
+        target = self.get_prompt(entry['id']) if entry else None
+        if not target:
+            return ([], False)
+        writes = [('update', self.collection, prompt_id, {'status': PromptStatus.INACTIVE}) for prompt_id in actives if prompt_id != target.id]
+        writes.append(('update', self.collection, target.id, {'status': PromptStatus.ACTIVE}))
+        target.status = PromptStatus.ACTIVE
+        self._set_active(head, target)
+        writes.append(('set', self.heads, prompt_name, head.to_dict()))
+        return (writes, True)
+
     def delete_prompt(self, prompt_id: str) -> bool:
         try:
-            result = self.db.delete(self.collection, prompt_id)
+            data = self.db.read(self.collection, prompt_id)
+            head = self._load_head(data['prompt_name'])[0] if data and data.get('prompt_name') else None
+            if head is None:
+                return self.db.delete(self.collection, prompt_id)
+            head.versions = [v for v in head.versions if v.get('id') != prompt_id]
+            self._set_latest(head)
+            if head.active_id == prompt_id:
+                self._set_active(head, None)
+            head_write = ('set', self.heads, head.prompt_name, head.to_dict()) if head.versions else ('delete', self.heads, head.prompt_name, None)
+            result = self.db.batch_write([('delete', self.collection, prompt_id, None), head_write])
             logger.info(f'Prompt {prompt_id} deleted')
             return result
         except Exception as e:
@@ -1,26 +1,38 @@
 import logging
 from typing import List, Dict, Any, Optional
+from src.ai.prompt_registry import get_prompt_registry
 from src.ai.prompt_repository import get_prompt_repository
-from src.database.models import AIPrompt
+from src.database.models import AIPrompt, AIPromptHead
 logger = logging.getLogger(__name__)
 
 class PromptService:
 
     def __init__(self):
         self.repository = get_prompt_repository()
+        self.registry = get_prompt_registry()
 
     def get_all_prompts(self) -> List[AIPrompt]:
         logger.info('Getting all prompts')
         return self.repository.get_all_prompts()
 
+    def get_catalog(self) -> List[AIPromptHead]:
+        logger.info('Getting prompt catalog')
+        return self.repository.get_catalog()
+
+    def get_prompt(self, prompt_id: str) -> Optional[AIPrompt]:
+        return self.repository.get_prompt(prompt_id)
+
     def update_prompt(self, prompt_id: str, prompt_data: Dict[str, Any]) -> bool:
         logger.info(f'Creating new version for prompt {prompt_id}')
         self.repository.create_prompt_version(prompt_id, prompt_data)
+        self.registry.invalidate()
         return True
 
     def set_active_version(self, prompt_name: str, version: int) -> bool:
         logger.info(f'Setting {prompt_name} v{version} as active')
-        return self.repository.set_active_version(prompt_name, version)
+        result = self.repository.set_active_version(prompt_name, version)
+        self.registry.refresh(prompt_name)
+        return result
 _prompt_service: Optional[PromptService] = None
 
 def get_prompt_service() -> PromptService:
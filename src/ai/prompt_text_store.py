@@ -0,0 +1,95 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Tuple
+logger = logging.getLogger(__name__)
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def encode_delta(base: str, text: str) -> List[Dict[str, Any]]:
+    base_lines = base.splitlines(keepends=True)
+    lines = text.splitlines(keepends=True)
+    ops = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, base_lines, lines, autojunk=False).get_opcodes():
+        if tag == 'equal':
+            ops.append({'op': 'copy', 'start': i1, 'end': i2})
+        elif j2 > j1:
+            ops.append({'op': 'insert', 'text': ''.join(lines[j1:j2])})
+    return ops
+
+def apply_delta(base: str, delta: List[Dict[str, Any]]) -> str:
+    base_lines = base.splitlines(keepends=True)
+    return ''.join((''.join(base_lines[op['start']:op['end']]) if op['op'] == 'copy' else op['text'] for op in delta))
+
+def _delta_size(delta: List[Dict[str, Any]]) -> int:
+    return sum((len(op['text']) if op['op'] == 'insert' else 16 for op in delta))
+
+class PromptTextStore:
+
+    def __init__(self, db: Any, collection: str='AI_prompt_texts', use_delta: bool=False, max_depth: int=8, cache_size: int=256):
+        self.db = db
+        self.collection = collection
+        self.use_delta = use_delta
+        self.max_depth = max_depth
+        self.cache_size = cache_size
+        self._texts: 'OrderedDict[str, Tuple[str, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, digest: str, text: str, depth: int):
+        with self._lock:
+            self._texts[digest] = (text, depth)
+            self._texts.move_to_end(digest)
+            while len(self._texts) > self.cache_size:
+                self._texts.popitem(last=False)
+
+    def _cached(self, digest: str) -> Optional[Tuple[str, int]]:
+        with self._lock:
+            entry = self._texts.get(digest)
+            if entry is not None:
+                self._texts.move_to_end(digest)
+            return entry
+
+    def _resolve(self, digest: str, doc: Optional[Dict[str, Any]]) -> Tuple[str, int]:
+        if doc is None:
+            raise ValueError(f'Prompt text {digest} not found')
+        if 'text' in doc:
+            text, depth = (doc['text'], 0)
+        else:
+            base, base_depth = self._load(doc['base'])
+            text, depth = (apply_delta(base, doc['delta']), base_depth + 1)
+        if text_hash(text) != digest:
+            raise ValueError(f'Prompt text {digest} failed its hash check')
+        self._remember(digest, text, depth)
+        return (text, depth)
+
+    def _load(self, digest: str) -> Tuple[str, int]:
+        return self._cached(digest) or self._resolve(digest, self.db.read(self.collection, digest))
+
+    def get(self, digest: str) -> str:
+        return self._load(digest)[0]
+
+    def get_many(self, digests: List[str]) -> Dict[str, str]:
+        missing = [d for d in dict.fromkeys(digests) if self._cached(d) is None]
+        docs = self.db.get_many(self.collection, missing) if missing else {}
+        for digest, doc in docs.items():
+            self._resolve(digest, doc)
+        return {d: self._load(d)[0] for d in digests}
+
+    def put(self, text: str, base_hash: Optional[str]=None) -> Tuple[str, Optional[tuple]]:
+        digest = text_hash(text)
+        if self._cached(digest) is not None or self.db.read(self.collection, digest):
+            return (digest, None)
+        doc: Dict[str, Any] = {'text': text}
+        if self.use_delta and base_hash and base_hash != digest:
+            try:
+                base, base_depth = self._load(base_hash)
+                delta = encode_delta(base, text)
+                if base_depth < self.max_depth and _delta_size(delta) < len(text) // 2:
+                    doc = {'base': base_hash, 'delta': delta}
+            except ValueError as e:
+                logger.warning(f'Storing full prompt text, base unavailable: {str(e)}')
+        logger.info(f"Prompt text {digest[:12]} stored {('as delta' if 'delta' in doc else 'in full')}")
+        return (digest, ('set', self.collection, digest, doc))
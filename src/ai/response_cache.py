@@ -0,0 +1,104 @@
+import logging
+import math
+import os
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from src.utils.ttl_cache import TTLCache
+logger = logging.getLogger(__name__)
+_PUNCT = re.compile('[^\\w\\s]')
+
+def normalize_input(text: str) -> str:
+    return ' '.join(_PUNCT.sub(' ', (text or '').lower()).split())
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+class ResponseCache:
+
+    def __init__(self, ttl: float=600, max_entries: int=512, similarity_threshold: Optional[float]=None, embedder: Optional[Callable[[str], List[float]]]=None):
+        self.entries = TTLCache(ttl, max_entries)
+        self.similarity_threshold = similarity_threshold
+        self.embedder = embedder
+        self._vectors = TTLCache(ttl, max_entries)
+        self._hashes: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'similar_hits': 0, 'misses': 0, 'invalidations': 0}
+
+    def _scope(self, user_id: str, prompt: Any, snapshot_hash: str) -> Tuple:
+        return (user_id, prompt.prompt_name, prompt.version, getattr(prompt, 'mode', None), snapshot_hash)
+
+    def _check_snapshot(self, user_id: str, snapshot_hash: str):
+        with self._lock:
+            previous = self._hashes.get(user_id)
+            self._hashes[user_id] = snapshot_hash
+        if previous is not None and previous != snapshot_hash:
+            self.entries.discard_where(lambda key, value: key[0][0] == user_id and key[0][-1] != snapshot_hash)
+            self.stats['invalidations'] += 1
+
+    def _embed(self, text: str) -> Optional[List[float]]:
+        if self.embedder is None or self.similarity_threshold is None:
+            return None
+        vector = self._vectors.get(text)
+        if vector is not None:
+            return vector
+        try:
+            vector = self.embedder(text)
+            self._vectors.put(text, vector)
+            return vector
+        except Exception as e:
+            logger.warning(f'Response cache embedding failed: {str(e)}')
+            return None
+
+    def get(self, user_id: str, prompt: Any, input_text: str, snapshot_hash: str) -> Optional[Any]:
+        self._check_snapshot(user_id, snapshot_hash)
+        scope = self._scope(user_id, prompt, snapshot_hash)
+        normalized = normalize_input(input_text)
+        entry = self.entries.get((scope, normalized))
+        if entry is not None:
+            self.stats['hits'] += 1
+            return entry[0]
+        vector = self._embed(normalized)
+        if vector is not None:
+            best, best_score = (None, self.similarity_threshold)
+            for key, (response, other) in self.entries.items():
+                if key[0] != scope or other is None:
+                    continue
+                score = _cosine(vector, other)
+                if score >= best_score:
+                    best, best_score = (response, score)
+            if best is not None:
+                self.stats['similar_hits'] += 1
+                logger.info(f'Response cache similarity hit for {user_id} (score {best_score:.3f})')
+                return best
+        self.stats['misses'] += 1
+        return None
+
+    def put(self, user_id: str, prompt: Any, input_text: str, snapshot_hash: str, response: Any):
+        normalized = normalize_input(input_text)
+        self.entries.put((self._scope(user_id, prompt, snapshot_hash), normalized), (response, self._embed(normalized)))
+
+    def invalidate(self, user_id: Optional[str]=None):
+        if user_id is None:
+            self.entries.clear()
+        else:
+            self.entries.discard_where(lambda key, value: key[0][0] == user_id)
+_response_cache: Optional[ResponseCache] = None
+
+def _default_embedder() -> Optional[Callable[[str], List[float]]]:
+    try:
+        from langchain_openai import OpenAIEmbeddings
+        return OpenAIEmbeddings(model=os.environ.get('AI_RESPONSE_CACHE_EMBEDDING_MODEL', 'text-embedding-3-small')).embed_query
+    except Exception as e:
+        logger.warning(f'Embeddings unavailable, response cache is exact-match only: {str(e)}')
+        return None
+
+def get_response_cache() -> ResponseCache:
+    global _response_cache
+    if _response_cache is None:
+        threshold = os.environ.get('AI_RESPONSE_CACHE_SIMILARITY')
+        embedder = _default_embedder() if threshold else None
+        _response_cache = ResponseCache(ttl=float(os.environ.get('AI_RESPONSE_CACHE_TTL', '600')), similarity_threshold=float(threshold) if threshold else None, embedder=embedder)
+    return _response_cache
@@ -0,0 +1,99 @@
+import hashlib
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional
+from src.ai.llm_models import FirestoreEncoder
+logger = logging.getLogger(__name__)
+_WORD = re.compile('[a-z0-9]+')
+_encoding = None
+
+def count_tokens(text: str) -> int:
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding('o200k_base')
+        except Exception:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+def _date(value: Any) -> Optional[str]:
+    if not value:
+        return None
+    if hasattr(value, 'strftime'):
+        return value.strftime('%Y-%m-%d')
+    return str(value)[:10]
+
+def compact_task(task: Dict[str, Any]) -> Dict[str, Any]:
+    data = {'id': task.get('id'), 'title': task.get('title'), 'due': _date(task.get('dueDate')), 'status': task.get('status'), 'tags': task.get('tags')}
+    return {k: v for k, v in data.items() if v}
+
+def _terms(text: str) -> set:
+    return {w for w in _WORD.findall((text or '').lower()) if len(w) > 2}
+
+def _score(task: Dict[str, Any], query: set) -> float:
+    if not query:
+        return 0.0
+    terms = _terms(' '.join([task.get('title') or '', task.get('description') or '', ' '.join(task.get('tags') or [])]))
+    if not terms:
+        return 0.0
+    return len(terms & query) / len(terms | query)
+
+class TaskContext:
+
+    def __init__(self, text: str, tokens: int, full_tokens: int, active: int, completed: int, dropped: int, snapshot_hash: str=''):
+        self.text = text
+        self.snapshot_hash = snapshot_hash
+        self.tokens = tokens
+        self.full_tokens = full_tokens
+        self.active = active
+        self.completed = completed
+        self.dropped = dropped
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(self.full_tokens - self.tokens, 0)
+
+    def stats(self) -> Dict[str, int]:
+        return {'contextTokens': self.tokens, 'contextTokensSaved': self.tokens_saved, 'contextTasksDropped': self.dropped}
+
+def full_context_text(task_list: Dict[str, Any]) -> str:
+    active = json.dumps(task_list.get('active', []), indent=2, cls=FirestoreEncoder)
+    completed = json.dumps(task_list.get('completed', []), indent=2, cls=FirestoreEncoder)
+    return f'Current active tasks:\n{active}\nCompleted tasks:\n{completed}'
+
+def _line(task: Dict[str, Any]) -> str:
+    return json.dumps(compact_task(task), separators=(',', ':'), ensure_ascii=False, cls=FirestoreEncoder)
+
+def _take(lines: List[str], budget: int) -> List[str]:
+    taken = []
+    for line in lines:
+        cost = count_tokens(line) + 1
+        if cost > budget:
+            break
+        taken.append(line)
+        budget -= cost
+    return taken
+
+def snapshot_hash(task_list: Dict[str, Any]) -> str:
+    lines = sorted(_line(t) for key in ('active', 'completed') for t in task_list.get(key, []))
+    return hashlib.sha1('\n'.join(lines).encode('utf-8')).hexdigest()
+
+def build_task_context(user_input: str, task_list: Dict[str, Any], token_budget: int=1500, max_completed: int=10) -> TaskContext:
+    query = _terms(user_input)
+    active = list(task_list.get('active', []))
+    active.sort(key=lambda t: (-_score(t, query), _date(t.get('dueDate')) or '9999'))
+    completed = sorted(task_list.get('completed', []), key=lambda t: str(t.get('completionDate') or t.get('updatedAt') or ''), reverse=True)[:max_completed]
+    header = 'Current active tasks:\nCompleted tasks:\n'
+    budget = token_budget - count_tokens(header)
+    active_lines = _take([_line(t) for t in active], budget)
+    budget -= sum(count_tokens(line) + 1 for line in active_lines)
+    completed_lines = _take([_line(t) for t in completed], budget)
+    text = 'Current active tasks:\n' + '\n'.join(active_lines) + '\nCompleted tasks:\n' + '\n'.join(completed_lines)
+    dropped = len(task_list.get('active', [])) + len(task_list.get('completed', [])) - len(active_lines) - len(completed_lines)
+    context = TaskContext(text, count_tokens(text), count_tokens(full_context_text(task_list)), len(active_lines), len(completed_lines), dropped, snapshot_hash(task_list))
+    logger.info(f'Task context: {context.tokens} tokens, {context.tokens_saved} saved, {dropped} tasks dropped')
+    return context
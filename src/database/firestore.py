@@ -2,8 +2,8 @@ import os
 import json
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Union
-from google.cloud.firestore_v1 import FieldFilter
+from typing import Callable, Dict, List, Optional, Any, Tuple, Union
+from google.cloud.firestore_v1 import ArrayUnion, FieldFilter
 import firebase_admin
 from firebase_admin import credentials, firestore
 from firebase_admin.firestore import SERVER_TIMESTAMP
@@ -69,11 +69,64 @@ class FirestoreClient:
             logger.error(f'DB ERROR [CREATE] - Collection: {collection} - Error: {str(e)}')
             raise
 
-    def read(self, collection: str, doc_id: str) -> Optional[Dict[str, Any]]:
+    def new_id(self, collection: str) -> str:
+        return self.db.collection(collection).document().id
+
+    def batch_write(self, writes: List[tuple]) -> bool:
+        try:
+            logger.debug(f'DB REQUEST [BATCH] - Writes: {[(w[0], w[1], w[2]) for w in writes]}')
+            for start in range(0, len(writes), 500):
+                batch = self.db.batch()
+                for write in writes[start:start + 500]:
+                    self._stage(batch, *write)
+                batch.commit()
+            logger.info(f'DB RESPONSE [BATCH] - Writes: {len(writes)} - Success')
+            return True
+        except Exception as e:
+            logger.error(f'DB ERROR [BATCH] - Writes: {len(writes)} - Error: {str(e)}')
+            raise
+
+    def _stage(self, target: Any, op: str, collection: str, doc_id: str, data: Optional[Dict[str, Any]]):
+        doc_ref = self.db.collection(collection).document(doc_id)
+        if op == 'set':
+            data.setdefault('createdAt', SERVER_TIMESTAMP)
+            data.setdefault('updatedAt', SERVER_TIMESTAMP)
+            target.set(doc_ref, data)
+        elif op == 'update':
+            data['updatedAt'] = SERVER_TIMESTAMP
+            target.update(doc_ref, data)
+        elif op == 'delete':
+            target.delete(doc_ref)
+        else:
+            raise ValueError(f'Unknown batch operation: {op}')
+
+    def transact(self, collection: str, doc_id: str, build: Callable[[Optional[Dict[str, Any]]], Tuple[List[tuple], Any]]) -> Any:
+        try:
+            logger.debug(f'DB REQUEST [TRANSACTION] - Collection: {collection} - Document ID: {doc_id}')
+            doc_ref = self.db.collection(collection).document(doc_id)
+
+            @firestore.transactional
+            def run(transaction):
+                doc = doc_ref.get(transaction=transaction)
+                data = doc.to_dict() if doc.exists else None
+                if data is not None:
+                    data['id'] = doc.id
+                writes, result = build(data)
+                for write in writes:
+                    self._stage(transaction, *write)
+                return result
+            result = run(self.db.transaction())
+            logger.info(f'DB RESPONSE [TRANSACTION] - Collection: {collection} - Document ID: {doc_id} - Success')
+            return result
+        except Exception as e:
+            logger.error(f'DB ERROR [TRANSACTION] - Collection: {collection} - Document ID: {doc_id} - Error: {str(e)}')
+            raise
+
+    def read(self, collection: str, doc_id: str, fields: List[str]=None) -> Optional[Dict[str, Any]]:
         try:
             logger.debug(f'DB REQUEST [READ] - Collection: {collection} - Document ID: {doc_id}')
             doc_ref = self.db.collection(collection).document(doc_id)
-            doc = doc_ref.get()
+            doc = doc_ref.get(field_paths=fields) if fields else doc_ref.get()
             if doc.exists:
                 data = doc.to_dict()
                 data['id'] = doc.id
@@ -87,6 +140,27 @@ class FirestoreClient:
             logger.error(f'DB ERROR [READ] - Collection: {collection} - Document ID: {doc_id} - Error: {str(e)}')
             raise
 
+    def get_many(self, collection: str, doc_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        try:
+            logger.debug(f'DB REQUEST [GET MANY] - Collection: {collection} - Document IDs: {doc_ids}')
+            results: Dict[str, Optional[Dict[str, Any]]] = {doc_id: None for doc_id in doc_ids}
+            if not doc_ids:
+                return results
+            refs = [self.db.collection(collection).document(doc_id) for doc_id in dict.fromkeys(doc_ids)]
+            for doc in self.db.get_all(refs):
+                if doc.exists:
+                    data = doc.to_dict()
+                    data['id'] = doc.id
+                    results[doc.id] = data
+            logger.info(f'DB RESPONSE [GET MANY] - Collection: {collection} - Found {sum(1 for v in results.values() if v)} of {len(results)}')
+            return results
+        except Exception as e:
+            logger.error(f'DB ERROR [GET MANY] - Collection: {collection} - Error: {str(e)}')
+            raise
+
+    def array_union(self, values: List[Any]) -> Any:
+        return ArrayUnion(values)
+
     def get_all(self, collection: str):
         try:
             docs = self.db.collection(collection).stream()
@@ -138,7 +212,7 @@ class FirestoreClient:
             logger.error(f'DB ERROR [DELETE ALL] - Collection: {collection} - Error: {str(e)}')
             raise
 
-    def query(self, collection: str, filters: List[tuple]=None, order_by: str=None, direction: str='ASCENDING', limit: int=None) -> List[Dict[str, Any]]:
+    def query(self, collection: str, filters: List[tuple]=None, order_by: str=None, direction: str='ASCENDING', limit: int=None, fields: List[str]=None, start_after: str=None) -> List[Dict[str, Any]]:
         try:
             filter_str = ', '.join([f'{f[0]} {f[1]} {f[2]}' for f in filters]) if filters else 'None'
             limit_str = str(limit) if limit else 'None'
@@ -150,8 +224,15 @@ class FirestoreClient:
             if order_by:
                 direction_obj = firestore.Query.ASCENDING if direction == 'ASCENDING' else firestore.Query.DESCENDING
                 query_ref = query_ref.order_by(order_by, direction=direction_obj)
+            if start_after:
+                cursor = self.db.collection(collection).document(start_after).get()
+                if not cursor.exists:
+                    raise ValueError(f'Cursor document {start_after} not found')
+                query_ref = query_ref.start_after(cursor)
             if limit:
                 query_ref = query_ref.limit(limit)
+            if fields:
+                query_ref = query_ref.select(fields)
             logger.debug(f'DB REQUEST [QUERY] - Constructed query_ref: {{str(query_ref)}}')
             docs = query_ref.stream()
             results = []
@@ -11,6 +11,16 @@ class PromptStatus(str, Enum):
     ACTIVE = 'active'
     INACTIVE = 'inactive'
 
+class ChatJobStatus(str, Enum):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+class PromptMode(str, Enum):
+    TWO_PASS = 'two_pass'
+    SINGLE_PASS = 'single_pass'
+
 class Task:
 
     def __init__(self, id: Optional[str]=None, user_id: str=None, title: str=None, description: str=None, due_date: Optional[datetime]=None, status: str=TaskStatus.ACTIVE, created_at: Optional[datetime]=None, updated_at: Optional[datetime]=None, completion_date: Optional[datetime]=None, deletion_date: Optional[datetime]=None, notes: str=None, updates: List[Dict[str, Any]]=None, owner_id: Optional[str]=None, owner_email: Optional[str]=None, owner_name: Optional[str]=None, tags: Optional[List[str]]=None):
@@ -113,33 +123,63 @@ class AIChat:
 
 class AIPrompt:
 
-    def __init__(self, id: Optional[str]=None, prompt_name: str=None, text: str=None, status: str=PromptStatus.ACTIVE, version: int=1, created_at: Optional[datetime]=None, updated_at: Optional[datetime]=None):
+    def __init__(self, id: Optional[str]=None, prompt_name: str=None, text: str=None, status: str=PromptStatus.ACTIVE, version: int=1, created_at: Optional[datetime]=None, updated_at: Optional[datetime]=None, mode: str=PromptMode.TWO_PASS, text_hash: Optional[str]=None):
         self.id = id
         self.prompt_name = prompt_name
         self.text = text
+        self.text_hash = text_hash
         self.status = status
         self.version = version
+        self.mode = mode
         self.created_at = created_at
         self.updated_at = updated_at
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'AIPrompt':
-        return cls(id=data.get('id'), prompt_name=data.get('prompt_name'), text=data.get('text'), status=data.get('status', PromptStatus.ACTIVE), version=data.get('version', 1), created_at=data.get('createdAt'), updated_at=data.get('updatedAt'))
+        return cls(id=data.get('id'), prompt_name=data.get('prompt_name'), text=data.get('text'), status=data.get('status', PromptStatus.ACTIVE), version=data.get('version', 1), created_at=data.get('createdAt'), updated_at=data.get('updatedAt'), mode=data.get('mode', PromptMode.TWO_PASS), text_hash=data.get('textHash'))
 
     def to_dict(self) -> Dict[str, Any]:
-        return {'prompt_name': self.prompt_name, 'text': self.text, 'status': self.status, 'version': self.version}
+        data = {'prompt_name': self.prompt_name, 'text': self.text, 'status': self.status, 'version': self.version, 'mode': self.mode}
+        if self.text_hash is not None:
+            data['textHash'] = self.text_hash
+        return data
 
     def validate(self) -> bool:
         if not self.prompt_name:
             raise ValueError('Prompt name is required')
-        if not self.text:
+        if not self.text and not self.text_hash:
             raise ValueError('Prompt text is required')
         if self.status not in [s.value for s in PromptStatus]:
             raise ValueError(f'Invalid status: {self.status}')
         if self.version < 1:
             raise ValueError('Version must be >= 1')
+        if self.mode not in [m.value for m in PromptMode]:
+            raise ValueError(f'Invalid mode: {self.mode}')
         return True
 
+class AIPromptHead:
+
+    def __init__(self, prompt_name: str=None, active_id: Optional[str]=None, active_version: Optional[int]=None, latest_id: Optional[str]=None, latest_version: Optional[int]=None, versions: Optional[List[Dict[str, Any]]]=None, active: Optional[AIPrompt]=None):
+        self.prompt_name = prompt_name
+        self.active_id = active_id
+        self.active_version = active_version
+        self.latest_id = latest_id
+        self.latest_version = latest_version
+        self.versions = versions or []
+        self.active = active
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'AIPromptHead':
+        active = AIPrompt.from_dict(dict(data['prompt'], id=data.get('activeId'))) if data.get('prompt') else None
+        versions = sorted(data.get('versions', []), key=lambda v: v.get('version', 0), reverse=True)
+        return cls(prompt_name=data.get('prompt_name', data.get('id')), active_id=data.get('activeId'), active_version=data.get('activeVersion'), latest_id=data.get('latestId'), latest_version=data.get('latestVersion'), versions=versions, active=active)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {'prompt_name': self.prompt_name, 'activeId': self.active_id, 'activeVersion': self.active_version, 'latestId': self.latest_id, 'latestVersion': self.latest_version, 'versions': self.versions, 'prompt': None}
+        if self.active is not None:
+            data['prompt'] = dict(self.active.to_dict(), status=PromptStatus.ACTIVE)
+        return data
+
 class EvalStatus(str, Enum):
     ACTIVE = 'active'
     ARCHIVED = 'archived'
@@ -179,8 +219,10 @@ class AIEvalInput:
 
 class AIEvalResult:
 
-    def __init__(self, id: Optional[str]=None, eval_input_id: str | None=None, prompt_name: str | None=None, prompt_version: int | None=None, result: str | None=None, llm_judge_says: str | None=None, input_text: str | None=None, created_at: Optional[datetime]=None):
+    def __init__(self, id: Optional[str]=None, eval_input_id: str | None=None, prompt_name: str | None=None, prompt_version: int | None=None, result: str | None=None, llm_judge_says: str | None=None, input_text: str | None=None, created_at: Optional[datetime]=None, input_hash: str | None=None, run_id: str | None=None):
         self.id = id
+        self.input_hash = input_hash
+        self.run_id = run_id
         self.eval_input_id = eval_input_id
         self.prompt_name = prompt_name
         self.prompt_version = prompt_version
@@ -191,7 +233,7 @@ class AIEvalResult:
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'AIEvalResult':
-        return cls(id=data.get('id'), eval_input_id=data.get('eval_input_id'), prompt_name=data.get('prompt_name'), prompt_version=data.get('prompt_version'), result=data.get('result'), llm_judge_says=data.get('LLMJudgeSays'), input_text=data.get('inputText'), created_at=data.get('createdAt'))
+        return cls(id=data.get('id'), eval_input_id=data.get('eval_input_id'), prompt_name=data.get('prompt_name'), prompt_version=data.get('prompt_version'), result=data.get('result'), llm_judge_says=data.get('LLMJudgeSays'), input_text=data.get('inputText'), created_at=data.get('createdAt'), input_hash=data.get('inputHash'), run_id=data.get('runId'))
 
     def to_dict(self) -> Dict[str, Any]:
         data = {'eval_input_id': self.eval_input_id, 'prompt_name': self.prompt_name, 'prompt_version': self.prompt_version, 'result': self.result}
@@ -199,4 +241,45 @@ class AIEvalResult:
             data['LLMJudgeSays'] = self.llm_judge_says
         if self.input_text is not None:
             data['inputText'] = self.input_text
+        if self.input_hash is not None:
+            data['inputHash'] = self.input_hash
+        if self.run_id is not None:
+            data['runId'] = self.run_id
+        return data
+
+class EvalRunStatus(str, Enum):
+    RUNNING = 'running'
+    JUDGING = 'judging'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+class AIEvalRun:
+
+    def __init__(self, id: Optional[str]=None, prompt_name: str | None=None, prompt_version: int | None=None, input_ids: List[str] | None=None, status: str=EvalRunStatus.RUNNING, completed: int=0, skipped: int=0, failed: int=0, created_at: Optional[datetime]=None, updated_at: Optional[datetime]=None, judge_batch_id: str | None=None, judge_result_ids: List[str] | None=None, judge_chunks: Dict[str, List[int]] | None=None):
+        self.id = id
+        self.judge_batch_id = judge_batch_id
+        self.judge_result_ids = judge_result_ids or []
+        self.judge_chunks = judge_chunks or {}
+        self.prompt_name = prompt_name
+        self.prompt_version = prompt_version
+        self.input_ids = input_ids or []
+        self.status = status
+        self.completed = completed
+        self.skipped = skipped
+        self.failed = failed
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    @property
+    def total(self) -> int:
+        return len(self.input_ids)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'AIEvalRun':
+        return cls(id=data.get('id'), prompt_name=data.get('prompt_name'), prompt_version=data.get('prompt_version'), input_ids=data.get('inputIds', []), status=data.get('status', EvalRunStatus.RUNNING), completed=data.get('completed', 0), skipped=data.get('skipped', 0), failed=data.get('failed', 0), created_at=data.get('createdAt'), updated_at=data.get('updatedAt'), judge_batch_id=data.get('judgeBatchId'), judge_result_ids=data.get('judgeResultIds'), judge_chunks=data.get('judgeChunks'))
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {'prompt_name': self.prompt_name, 'prompt_version': self.prompt_version, 'inputIds': self.input_ids, 'total': self.total, 'status': self.status, 'completed': self.completed, 'skipped': self.skipped, 'failed': self.failed}
+        if self.judge_batch_id:
+            data.update({'judgeBatchId': self.judge_batch_id, 'judgeResultIds': self.judge_result_ids, 'judgeChunks': self.judge_chunks})
         return data
@@ -14,6 +14,10 @@ class EvalInputRepository:
         docs = self.db.query(self.collection, order_by='createdAt', direction='DESCENDING', limit=limit)
         return [AIEvalInput.from_dict(d) for d in docs]
 
+    def get_inputs(self, ids: List[str]) -> List[AIEvalInput]:
+        found = self.db.get_many(self.collection, ids)
+        return [AIEvalInput.from_dict(found[i]) for i in ids if found.get(i)]
+
     def create_from_chat(self, chat_data: Dict[str, Any], eval_prompt: str) -> str:
         data = {'user_id': chat_data.get('user_id'), 'inputText': chat_data.get('inputText'), 'Response': chat_data.get('Response'), 'evalPrompt': eval_prompt, 'status': EvalStatus.ACTIVE}
         return self.db.create(self.collection, data)
@@ -1,9 +1,19 @@
+import hashlib
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from src.database.firestore import get_client
 from src.database.models import AIEvalResult
 logger = logging.getLogger(__name__)
 
+def input_hash(eval_input: Any) -> str:
+    return hashlib.sha256(f'{eval_input.input_text or ""}\n{eval_input.eval_prompt or ""}'.encode('utf-8')).hexdigest()
+
+SWEEP_VARIANT = 'sweep-verdict'
+
+def result_id(eval_input_id: str, prompt_name: str, prompt_version: int, digest: str, variant: Optional[str]=None) -> str:
+    key = f'{eval_input_id}|{prompt_name}|{prompt_version}|{digest}' + (f'|{variant}' if variant else '')
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
 class EvalResultRepository:
 
     def __init__(self):
@@ -13,6 +23,25 @@ class EvalResultRepository:
     def create_result(self, result: AIEvalResult) -> str:
         data = result.to_dict()
         return self.db.create(self.collection, data)
+
+    def get_existing(self, ids: List[str]) -> Dict[str, AIEvalResult]:
+        try:
+            found = self.db.get_many(self.collection, ids)
+            return {doc_id: AIEvalResult.from_dict(data) for doc_id, data in found.items() if data}
+        except Exception as e:
+            logger.error(f'Error reading eval results: {str(e)}')
+            raise
+
+    def create_results(self, results: List[AIEvalResult], ids: Optional[List[str]]=None, extra_writes: Optional[List[tuple]]=None) -> List[str]:
+        try:
+            ids = ids or [self.db.new_id(self.collection) for _ in results]
+            writes = [('set', self.collection, doc_id, result.to_dict()) for doc_id, result in zip(ids, results)]
+            self.db.batch_write(writes + list(extra_writes or []))
+            logger.info(f'Wrote {len(ids)} eval results')
+            return ids
+        except Exception as e:
+            logger.error(f'Error writing eval results: {str(e)}')
+            raise
 _eval_result_repo: EvalResultRepository | None = None
 
 def get_eval_result_repository() -> EvalResultRepository:
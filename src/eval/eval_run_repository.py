@@ -0,0 +1,45 @@
+import logging
+from typing import Any, Dict, List, Optional
+from src.database.firestore import get_client
+from src.database.models import AIEvalRun
+logger = logging.getLogger(__name__)
+
+class EvalRunRepository:
+
+    def __init__(self):
+        self.collection = 'Eval_Runs'
+        self.db = get_client()
+
+    def create_run(self, run: AIEvalRun) -> str:
+        try:
+            run_id = self.db.create(self.collection, run.to_dict())
+            logger.info(f'Eval run created with ID: {run_id}')
+            return run_id
+        except Exception as e:
+            logger.error(f'Error creating eval run: {str(e)}')
+            raise
+
+    def get_run(self, run_id: str) -> Optional[AIEvalRun]:
+        data = self.db.read(self.collection, run_id)
+        return AIEvalRun.from_dict(data) if data else None
+
+    def get_runs(self, limit: int=20) -> List[AIEvalRun]:
+        docs = self.db.query(self.collection, order_by='createdAt', direction='DESCENDING', limit=limit)
+        return [AIEvalRun.from_dict(d) for d in docs]
+
+    def checkpoint(self, run_id: str, data: Dict[str, Any]) -> tuple:
+        return ('update', self.collection, run_id, dict(data))
+
+    def update_run(self, run_id: str, data: Dict[str, Any]) -> bool:
+        try:
+            return self.db.update(self.collection, run_id, data)
+        except Exception as e:
+            logger.error(f'Error updating eval run {run_id}: {str(e)}')
+            raise
+_eval_run_repo: EvalRunRepository | None = None
+
+def get_eval_run_repository() -> EvalRunRepository:
+    global _eval_run_repo
+    if _eval_run_repo is None:
+        _eval_run_repo = EvalRunRepository()
+    return _eval_run_repo
@@ -0,0 +1,262 @@
+import logging
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from langchain_core.messages import HumanMessage, SystemMessage
+from src.ai.task_context import count_tokens
+from src.database.models import AIEvalInput, AIEvalResult
+from src.eval.eval_result_repository import SWEEP_VARIANT, input_hash, result_id
+logger = logging.getLogger(__name__)
+JUDGE_PROMPT = 'Please evaluate this result as per the criteria provided'
+VERDICT_PROMPT = 'Finish your evaluation with a final line containing only PASS or FAIL.'
+
+def verdict(text: Optional[str]) -> Optional[bool]:
+    matches = re.findall('\\b(PASS|FAIL)\\b', text or '', re.IGNORECASE)
+    return matches[-1].upper() == 'PASS' if matches else None
+
+class TokenBucket:
+
+    def __init__(self, per_minute: float, capacity: Optional[float]=None, clock: Callable[[], float]=time.monotonic, sleep: Callable[[float], None]=time.sleep):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = self.capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount: float=1) -> float:
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate
+            self.sleep(delay)
+            waited += delay
+
+class RateLimiter:
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+    def acquire(self, tokens: int):
+        self.requests.acquire(1)
+        self.tokens.acquire(tokens)
+
+class EvalProgress:
+
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.retries = 0
+        self.written = 0
+        self.reused = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def retried(self):
+        with self._lock:
+            self.retries += 1
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def throughput(self) -> float:
+        return self.done / self.elapsed if self.elapsed > 0 else 0.0
+
+class SweepStats:
+
+    def __init__(self, prompt: Any):
+        self.prompt_name = prompt.prompt_name
+        self.version = prompt.version
+        self.ok = 0
+        self.errors = 0
+        self.passed = 0
+        self.graded = 0
+        self.latency = 0.0
+        self.tokens = 0
+
+    def add(self, passed: Optional[bool], latency: float, tokens: int):
+        self.ok += 1
+        self.latency += latency
+        self.tokens += tokens
+        if passed is not None:
+            self.graded += 1
+            self.passed += int(passed)
+
+    def row(self) -> Dict[str, Any]:
+        return {'prompt_name': self.prompt_name, 'version': self.version, 'outputs': self.ok, 'errors': self.errors, 'pass_rate': self.passed / self.graded if self.graded else None, 'avg_latency': self.latency / self.ok if self.ok else None, 'tokens': self.tokens, 'avg_tokens': self.tokens / self.ok if self.ok else None}
+
+class EvalRunner:
+
+    def __init__(self, chat: Any, repo: Any, limiter: Optional[RateLimiter]=None, max_workers: int=8, max_retries: int=3, backoff: float=1.0, batch_size: int=20, max_output_tokens: int=800, sleep: Callable[[float], None]=time.sleep, judge: Any=None, defer_judge: bool=False):
+        self.chat = chat
+        self.defer_judge = defer_judge
+        self.repo = repo
+        self.limiter = limiter
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.batch_size = batch_size
+        self.max_output_tokens = max_output_tokens
+        self.sleep = sleep
+        self.judge = judge
+
+    def _invoke(self, messages: List[Any], progress: EvalProgress) -> str:
+        return self._call(messages, progress)[0]
+
+    def _call(self, messages: List[Any], progress: EvalProgress) -> Tuple[str, int, float]:
+        prompt_tokens = sum(count_tokens(m.content) for m in messages)
+        for attempt in range(self.max_retries + 1):
+            if self.limiter is not None:
+                self.limiter.acquire(prompt_tokens + self.max_output_tokens)
+            try:
+                started = time.monotonic()
+                response = self.chat.invoke(messages)
+                latency = time.monotonic() - started
+                content = getattr(response, 'content', str(response))
+                usage = getattr(response, 'usage_metadata', None) or {}
+                return (content, usage.get('total_tokens') or prompt_tokens + count_tokens(content), latency)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                progress.retried()
+                delay = self.backoff * 2 ** attempt
+                logger.warning(f'Eval call failed ({str(e)}), retrying in {delay:.1f}s')
+                self.sleep(delay)
+
+    def _evaluate(self, prompt: Any, ev: AIEvalInput, progress: EvalProgress, run_id: Optional[str]=None) -> AIEvalResult:
+        result = self._invoke([SystemMessage(content=prompt.text), HumanMessage(content=ev.input_text)], progress)
+        if self.judge is not None or self.defer_judge:
+            return AIEvalResult(eval_input_id=ev.id, prompt_name=prompt.prompt_name, prompt_version=prompt.version, result=result, input_text=ev.input_text, input_hash=input_hash(ev), run_id=run_id)
+        judge = self._invoke([SystemMessage(content=JUDGE_PROMPT), SystemMessage(content=ev.eval_prompt or ''), HumanMessage(content=result)], progress)
+        return AIEvalResult(eval_input_id=ev.id, prompt_name=prompt.prompt_name, prompt_version=prompt.version, result=result, llm_judge_says=judge, input_text=ev.input_text, input_hash=input_hash(ev), run_id=run_id)
+
+    def run(self, prompt: Any, eval_inputs: List[AIEvalInput], on_progress: Optional[Callable[[EvalProgress], None]]=None, ids: Optional[List[str]]=None, run_id: Optional[str]=None, checkpoint: Optional[Callable[[EvalProgress], List[tuple]]]=None) -> Dict[str, Any]:
+        progress = EvalProgress(len(eval_inputs))
+        result_ids: List[Optional[str]] = [None] * len(eval_inputs)
+        pending: List[tuple] = []
+        errors: Dict[str, str] = {}
+
+        def judge_pending():
+            try:
+                verdicts = self.judge.judge([(eval_inputs[i].eval_prompt or '', r.result) for i, r in pending])
+            except Exception as e:
+                logger.error(f'Batched judge failed for {len(pending)} outputs: {str(e)}')
+                verdicts = [None] * len(pending)
+            judged = []
+            for (index, result), text in zip(pending, verdicts):
+                if text is None:
+                    progress.failed += 1
+                    errors[eval_inputs[index].id or str(index)] = 'Judge returned no verdict'
+                    continue
+                result.llm_judge_says = text
+                judged.append((index, result))
+            pending[:] = judged
+
+        def flush():
+            if pending and self.judge is not None:
+                judge_pending()
+            if not pending:
+                return
+            progress.written += len(pending)
+            written = self.repo.create_results([r for _, r in pending], [ids[i] for i, _ in pending] if ids else None, checkpoint(progress) if checkpoint else None)
+            for (index, _), result_id in zip(pending, written):
+                result_ids[index] = result_id
+            pending.clear()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='eval') as pool:
+            futures = {pool.submit(self._evaluate, prompt, ev, progress, run_id): index for index, ev in enumerate(eval_inputs)}
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    pending.append((index, future.result()))
+                except Exception as e:
+                    progress.failed += 1
+                    errors[eval_inputs[index].id or str(index)] = str(e)
+                    logger.error(f'Eval input {eval_inputs[index].id} failed: {str(e)}')
+                progress.done += 1
+                if len(pending) >= self.batch_size:
+                    flush()
+                if on_progress is not None:
+                    on_progress(progress)
+        flush()
+        logger.info(f'Eval run finished: {progress.done - progress.failed}/{progress.total} ok in {progress.elapsed:.1f}s ({progress.throughput:.2f}/s, {progress.retries} retries)')
+        return {'result_ids': [r for r in result_ids if r], 'errors': errors, 'progress': progress}
+
+    def _judge(self, ev: AIEvalInput, output: str, progress: EvalProgress, judged: Dict[Tuple[str, str], Future], lock: threading.Lock) -> Tuple[str, int]:
+        key = (ev.eval_prompt or '', output)
+        with lock:
+            future = judged.get(key)
+            owner = future is None
+            if owner:
+                future = judged[key] = Future()
+            else:
+                progress.reused += 1
+        if not owner:
+            return (future.result(), 0)
+        try:
+            text, tokens, _ = self._call([SystemMessage(content=JUDGE_PROMPT), SystemMessage(content=f"{ev.eval_prompt or ''}\n{VERDICT_PROMPT}"), HumanMessage(content=output)], progress)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        future.set_result(text)
+        return (text, tokens)
+
+    def _sweep_one(self, prompt: Any, ev: AIEvalInput, progress: EvalProgress, judged: Dict[Tuple[str, str], Future], lock: threading.Lock) -> Tuple[AIEvalResult, float, int]:
+        output, tokens, latency = self._call([SystemMessage(content=prompt.text), HumanMessage(content=ev.input_text)], progress)
+        judge, judge_tokens = self._judge(ev, output, progress, judged, lock)
+        result = AIEvalResult(eval_input_id=ev.id, prompt_name=prompt.prompt_name, prompt_version=prompt.version, result=output, llm_judge_says=judge, input_text=ev.input_text, input_hash=input_hash(ev))
+        return (result, latency, tokens + judge_tokens)
+
+    def sweep(self, prompts: List[Any], eval_inputs: List[AIEvalInput], on_progress: Optional[Callable[[EvalProgress], None]]=None) -> Dict[str, Any]:
+        progress = EvalProgress(len(prompts) * len(eval_inputs))
+        stats = [SweepStats(prompt) for prompt in prompts]
+        judged: Dict[Tuple[str, str], Future] = {}
+        lock = threading.Lock()
+        pending: List[Tuple[AIEvalResult, str]] = []
+        errors: Dict[str, str] = {}
+
+        def flush():
+            if not pending:
+                return
+            progress.written += len(pending)
+            self.repo.create_results([r for r, _ in pending], [key for _, key in pending])
+            pending.clear()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='eval-sweep') as pool:
+            futures = {pool.submit(self._sweep_one, prompt, ev, progress, judged, lock): (index, ev) for ev in eval_inputs for index, prompt in enumerate(prompts)}
+            for future in as_completed(futures):
+                index, ev = futures[future]
+                prompt = prompts[index]
+                try:
+                    result, latency, tokens = future.result()
+                    stats[index].add(verdict(result.llm_judge_says), latency, tokens)
+                    pending.append((result, result_id(ev.id, prompt.prompt_name, prompt.version, result.input_hash, SWEEP_VARIANT)))
+                except Exception as e:
+                    stats[index].errors += 1
+                    progress.failed += 1
+                    errors[f'{prompt.prompt_name} v{prompt.version}/{ev.id}'] = str(e)
+                    logger.error(f'Sweep of {prompt.prompt_name} v{prompt.version} on {ev.id} failed: {str(e)}')
+                progress.done += 1
+                if len(pending) >= self.batch_size:
+                    flush()
+                if on_progress is not None:
+                    on_progress(progress)
+        flush()
+        judge_calls = len(judged)
+        logger.info(f'Eval sweep of {len(prompts)} versions finished in {progress.elapsed:.1f}s with {judge_calls} judge calls for {progress.done - progress.failed} outputs')
+        return {'table': [s.row() for s in stats], 'errors': errors, 'progress': progress, 'judge_calls': judge_calls, 'judge_reused': progress.reused}
@@ -1,12 +1,14 @@
 import os
 import logging
-from typing import List, Optional
-from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_openai import ChatOpenAI
-from langchain.callbacks.tracers import LangChainTracer
-from src.eval.eval_result_repository import get_eval_result_repository
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.ai.llm_clients import get_llm_clients
+from src.eval.eval_input_repository import get_eval_input_repository
+from src.eval.eval_result_repository import get_eval_result_repository, input_hash, result_id
+from src.eval.eval_run_repository import get_eval_run_repository
+from src.eval.eval_runner import EvalProgress, EvalRunner, RateLimiter
+from src.eval.judge import BatchJudge, JudgeVerdicts, OfflineJudge, OpenAIBatchProvider
 from src.ai.prompt_repository import get_prompt_repository
-from src.database.models import AIEvalInput, AIEvalResult
+from src.database.models import AIEvalInput, AIEvalRun, AIPrompt, EvalRunStatus
 logger = logging.getLogger(__name__)
 
 class EvalService:
@@ -14,24 +16,122 @@ class EvalService:
     def __init__(self):
         self.repo = get_eval_result_repository()
         self.prompt_repo = get_prompt_repository()
+        self.run_repo = get_eval_run_repository()
+        self.input_repo = get_eval_input_repository()
         self.api_key = os.environ.get('OPENAI_API_KEY')
         self.model = os.environ.get('OPENAI_MODEL', 'gpt-4.1-mini')
+        self.max_workers = int(os.environ.get('EVAL_MAX_WORKERS', '8'))
+        self.limiter = RateLimiter(float(os.environ.get('EVAL_RPM', '500')), float(os.environ.get('EVAL_TPM', '200000')))
+        self.judge_mode = os.environ.get('EVAL_JUDGE_MODE', 'inline')
+        self.judge_batch_size = int(os.environ.get('EVAL_JUDGE_BATCH_SIZE', '10'))
+        self.last_run = None
+        self.last_sweep = None
 
-    def run_evals(self, prompt_name: str, version: int, eval_inputs: List[AIEvalInput]) -> List[str]:
+    def run_evals(self, prompt_name: str, version: int, eval_inputs: List[AIEvalInput], on_progress: Optional[Callable[[EvalProgress], None]]=None) -> List[str]:
         prompt = self.prompt_repo.get_prompt_by_name_version(prompt_name, version)
         if not prompt:
             raise ValueError(f'Prompt {prompt_name} v{version} not found')
-        chat = ChatOpenAI(api_key=self.api_key, model=self.model, temperature=0)
-        result_ids = []
-        for ev in eval_inputs:
-            messages = [SystemMessage(content=prompt.text), HumanMessage(content=ev.input_text)]
-            response = chat.invoke(messages)
-            judge_msgs = [SystemMessage(content='Please evaluate this result as per the criteria provided'), SystemMessage(content=ev.eval_prompt or ''), HumanMessage(content=getattr(response, 'content', str(response)))]
-            judge = chat.invoke(judge_msgs)
-            result = AIEvalResult(eval_input_id=ev.id, prompt_name=prompt_name, prompt_version=version, result=getattr(response, 'content', str(response)), llm_judge_says=getattr(judge, 'content', str(judge)), input_text=ev.input_text)
-            res_id = self.repo.create_result(result)
-            result_ids.append(res_id)
-        return result_ids
+        run_id = self.run_repo.create_run(AIEvalRun(prompt_name=prompt_name, prompt_version=version, input_ids=[ev.id for ev in eval_inputs]))
+        return self._execute(prompt, run_id, eval_inputs, on_progress)
+
+    def resume_run(self, run_id: str, on_progress: Optional[Callable[[EvalProgress], None]]=None) -> List[str]:
+        run = self.run_repo.get_run(run_id)
+        if not run:
+            raise ValueError(f'Eval run {run_id} not found')
+        prompt = self.prompt_repo.get_prompt_by_name_version(run.prompt_name, run.prompt_version)
+        if not prompt:
+            raise ValueError(f'Prompt {run.prompt_name} v{run.prompt_version} not found')
+        if run.status == EvalRunStatus.JUDGING and run.judge_batch_id:
+            return self._collect_verdicts(run)
+        logger.info(f'Resuming eval run {run_id} at {run.completed}/{run.total}')
+        return self._execute(prompt, run_id, self.input_repo.get_inputs(run.input_ids), on_progress)
+
+    def run_sweep(self, versions: List[Tuple[str, int]], eval_inputs: List[AIEvalInput], on_progress: Optional[Callable[[EvalProgress], None]]=None) -> Dict[str, Any]:
+        prompts = []
+        for prompt_name, version in versions:
+            prompt = self.prompt_repo.get_prompt_by_name_version(prompt_name, version)
+            if not prompt:
+                raise ValueError(f'Prompt {prompt_name} v{version} not found')
+            prompts.append(prompt)
+        chat = get_llm_clients().get_chat(self.api_key, self.model, 0)
+        runner = EvalRunner(chat, self.repo, limiter=self.limiter, max_workers=self.max_workers)
+        self.last_sweep = runner.sweep(prompts, eval_inputs, on_progress)
+        return self.last_sweep
+
+    def _runner(self) -> EvalRunner:
+        chat = get_llm_clients().get_chat(self.api_key, self.model, 0)
+        if self.judge_mode == 'batched':
+            judge = BatchJudge(get_llm_clients().get_chat(self.api_key, self.model, 0, JudgeVerdicts), self.judge_batch_size)
+            return EvalRunner(chat, self.repo, limiter=self.limiter, max_workers=self.max_workers, batch_size=max(20, self.judge_batch_size), judge=judge)
+        if self.judge_mode == 'offline':
+            return EvalRunner(chat, self.repo, limiter=self.limiter, max_workers=self.max_workers, defer_judge=True)
+        return EvalRunner(chat, self.repo, limiter=self.limiter, max_workers=self.max_workers)
+
+    def _offline_judge(self) -> OfflineJudge:
+        return OfflineJudge(OpenAIBatchProvider(self.api_key), self.model, self.judge_batch_size)
+
+    def _submit_judging(self, prompt: AIPrompt, run_id: str, eval_inputs: List[AIEvalInput]) -> Optional[str]:
+        keyed = {result_id(ev.id, prompt.prompt_name, prompt.version, input_hash(ev)): ev for ev in eval_inputs}
+        unjudged = [(key, r) for key, r in self.repo.get_existing(list(keyed)).items() if r.llm_judge_says is None]
+        if not unjudged:
+            return None
+        batch_id, chunks = self._offline_judge().submit([(keyed[key].eval_prompt or '', r.result or '') for key, r in unjudged])
+        self.run_repo.update_run(run_id, {'status': EvalRunStatus.JUDGING, 'judgeBatchId': batch_id, 'judgeResultIds': [key for key, _ in unjudged], 'judgeChunks': chunks})
+        logger.info(f'Eval run {run_id}: {len(unjudged)} outputs saved, verdicts pending in judge batch {batch_id}')
+        return batch_id
+
+    def _collect_verdicts(self, run: AIEvalRun) -> List[str]:
+        ids = run.judge_result_ids
+        progress = EvalProgress(len(ids))
+        self.last_run = {'result_ids': [], 'errors': {}, 'progress': progress, 'run_id': run.id, 'skipped': 0, 'judging': run.judge_batch_id}
+        try:
+            verdicts = self._offline_judge().collect(run.judge_batch_id, run.judge_chunks, len(ids))
+        except RuntimeError as e:
+            logger.warning(f'Eval run {run.id}: {str(e)}, resubmitting')
+            prompt = self.prompt_repo.get_prompt_by_name_version(run.prompt_name, run.prompt_version)
+            self.last_run['judging'] = self._submit_judging(prompt, run.id, self.input_repo.get_inputs(run.input_ids))
+            return []
+        if verdicts is None:
+            logger.info(f'Eval run {run.id}: judge batch {run.judge_batch_id} still running')
+            return []
+        existing = self.repo.get_existing(ids)
+        judged = []
+        for key, text in zip(ids, verdicts):
+            if text is None or key not in existing:
+                progress.failed += 1
+                self.last_run['errors'][key] = 'Judge returned no verdict'
+                continue
+            existing[key].llm_judge_says = text
+            judged.append(key)
+        progress.done = progress.written = len(ids)
+        status = EvalRunStatus.FAILED if progress.failed or run.failed else EvalRunStatus.COMPLETED
+        done = self.run_repo.checkpoint(run.id, {'status': status, 'failed': run.failed + progress.failed, 'judgeBatchId': None, 'judgeResultIds': [], 'judgeChunks': {}})
+        self.repo.create_results([existing[key] for key in judged], judged, [done])
+        self.last_run.update({'result_ids': judged, 'judging': None})
+        return judged
+
+    def get_unfinished_runs(self, limit: int=20) -> List[AIEvalRun]:
+        return [r for r in self.run_repo.get_runs(limit) if r.status != EvalRunStatus.COMPLETED]
+
+    def _execute(self, prompt: AIPrompt, run_id: str, eval_inputs: List[AIEvalInput], on_progress: Optional[Callable[[EvalProgress], None]]) -> List[str]:
+        keys = [result_id(ev.id, prompt.prompt_name, prompt.version, input_hash(ev)) for ev in eval_inputs]
+        existing = self.repo.get_existing(keys)
+        todo = [(ev, key) for ev, key in zip(eval_inputs, keys) if key not in existing]
+        skipped = len(eval_inputs) - len(todo)
+        if skipped:
+            logger.info(f'Eval run {run_id}: {skipped} results already exist, skipping')
+
+        def checkpoint(progress: EvalProgress) -> List[tuple]:
+            return [self.run_repo.checkpoint(run_id, {'completed': skipped + progress.written, 'skipped': skipped, 'failed': progress.failed})]
+        run = self._runner().run(prompt, [ev for ev, _ in todo], on_progress, ids=[key for _, key in todo], run_id=run_id, checkpoint=checkpoint)
+        progress = run['progress']
+        judging = self._submit_judging(prompt, run_id, eval_inputs) if self.judge_mode == 'offline' else None
+        status = EvalRunStatus.JUDGING if judging else EvalRunStatus.FAILED if progress.failed else EvalRunStatus.COMPLETED
+        self.run_repo.update_run(run_id, {'status': status, 'completed': skipped + progress.written, 'skipped': skipped, 'failed': progress.failed})
+        run.update({'run_id': run_id, 'skipped': skipped, 'judging': judging})
+        self.last_run = run
+        written = set(run['result_ids'])
+        return [key for key in keys if key in existing or key in written]
 _eval_service: Optional[EvalService] = None
 
 def get_eval_service() -> EvalService:
@@ -0,0 +1,158 @@
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from pydantic import BaseModel
+from langchain_core.messages import HumanMessage, SystemMessage
+logger = logging.getLogger(__name__)
+BATCH_JUDGE_PROMPT = 'Please evaluate each numbered result as per the criteria provided. Return one verdict per result, using its index, with a short evaluation and PASS or FAIL.'
+FINISHED_STATUSES = ('completed', 'failed', 'expired', 'cancelled')
+
+class JudgeVerdict(BaseModel):
+    index: int
+    evaluation: str
+    verdict: str
+
+class JudgeVerdicts(BaseModel):
+    verdicts: List[JudgeVerdict]
+
+def judge_text(verdict: JudgeVerdict) -> str:
+    return f'{verdict.evaluation}\n{verdict.verdict.upper()}'
+
+def chunk_items(items: List[Tuple[str, str]], batch_size: int) -> List[Tuple[str, List[int]]]:
+    groups: Dict[str, List[int]] = {}
+    for index, (eval_prompt, _) in enumerate(items):
+        groups.setdefault(eval_prompt or '', []).append(index)
+    return [(eval_prompt, indices[i:i + batch_size]) for eval_prompt, indices in groups.items() for i in range(0, len(indices), batch_size)]
+
+def batch_messages(eval_prompt: str, outputs: List[str]) -> List[Dict[str, str]]:
+    numbered = '\n\n'.join((f'### Result {i}\n{output}' for i, output in enumerate(outputs)))
+    return [{'role': 'system', 'content': BATCH_JUDGE_PROMPT}, {'role': 'system', 'content': eval_prompt}, {'role': 'user', 'content': numbered}]
+
+def _assign(results: List[Optional[str]], indices: List[int], verdicts: List[JudgeVerdict]):
+    for verdict in verdicts:
+        if 0 <= verdict.index < len(indices):
+            results[indices[verdict.index]] = judge_text(verdict)
+
+class BatchJudge:
+
+    def __init__(self, chat: Any, batch_size: int=10):
+        self.chat = chat
+        self.batch_size = batch_size
+
+    def judge(self, items: List[Tuple[str, str]]) -> List[Optional[str]]:
+        results: List[Optional[str]] = [None] * len(items)
+        chunks = chunk_items(items, self.batch_size)
+        for eval_prompt, indices in chunks:
+            messages = batch_messages(eval_prompt, [items[i][1] for i in indices])
+            response = self.chat.invoke([SystemMessage(content=messages[0]['content']), SystemMessage(content=messages[1]['content']), HumanMessage(content=messages[2]['content'])])
+            _assign(results, indices, response.verdicts)
+        logger.info(f'Judged {len(items)} outputs in {len(chunks)} batched calls')
+        return results
+
+def write_batch_file(items: List[Tuple[str, str]], path: str, model: str, batch_size: int=10) -> Dict[str, List[int]]:
+    chunks = {}
+    with open(path, 'w', encoding='utf-8') as f:
+        for n, (eval_prompt, indices) in enumerate(chunk_items(items, batch_size)):
+            custom_id = f'judge-{n}'
+            chunks[custom_id] = indices
+            body = {'model': model, 'temperature': 0, 'messages': batch_messages(eval_prompt, [items[i][1] for i in indices]), 'response_format': {'type': 'json_schema', 'json_schema': {'name': 'JudgeVerdicts', 'schema': JudgeVerdicts.model_json_schema()}}}
+            f.write(json.dumps({'custom_id': custom_id, 'method': 'POST', 'url': '/v1/chat/completions', 'body': body}) + '\n')
+    return chunks
+
+def read_batch_results(path: str, chunks: Dict[str, List[int]], total: int) -> List[Optional[str]]:
+    results: List[Optional[str]] = [None] * total
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+                response = row.get('response') or {}
+                if row.get('error') or response.get('status_code') != 200:
+                    logger.error(f"Batch judge request {row.get('custom_id')} failed: {row.get('error') or response.get('status_code')}")
+                    continue
+                content = response['body']['choices'][0]['message']['content']
+                verdicts = JudgeVerdicts.model_validate_json(content).verdicts
+            except (AttributeError, KeyError, IndexError, TypeError, ValueError) as e:
+                logger.error(f'Skipping unreadable batch judge result: {str(e)}')
+                continue
+            _assign(results, chunks.get(row['custom_id'], []), verdicts)
+    return results
+
+class OpenAIBatchProvider:
+
+    def __init__(self, api_key: str):
+        from openai import OpenAI
+        self.client = OpenAI(api_key=api_key)
+
+    def submit(self, path: str) -> str:
+        with open(path, 'rb') as f:
+            uploaded = self.client.files.create(file=f, purpose='batch')
+        return self.client.batches.create(input_file_id=uploaded.id, endpoint='/v1/chat/completions', completion_window='24h').id
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def download(self, batch_id: str, path: str):
+        batch = self.client.batches.retrieve(batch_id)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.client.files.content(batch.output_file_id).text if batch.output_file_id else '')
+
+class LocalBatchProvider:
+
+    def __init__(self, respond: Callable[[Dict[str, Any]], str]):
+        self.respond = respond
+        self.batches: Dict[str, List[Dict[str, Any]]] = {}
+
+    def submit(self, path: str) -> str:
+        with open(path, encoding='utf-8') as f:
+            requests = [json.loads(line) for line in f if line.strip()]
+        batch_id = f'local-{len(self.batches)}'
+        self.batches[batch_id] = [{'custom_id': r['custom_id'], 'response': {'status_code': 200, 'body': {'choices': [{'message': {'content': self.respond(r['body'])}}]}}, 'error': None} for r in requests]
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        return 'completed'
+
+    def download(self, batch_id: str, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.writelines((json.dumps(row) + '\n' for row in self.batches[batch_id]))
+
+class OfflineJudge:
+
+    def __init__(self, provider: Any, model: str, batch_size: int=10, workdir: Optional[str]=None, poll_interval: float=30, sleep: Callable[[float], None]=time.sleep):
+        self.provider = provider
+        self.model = model
+        self.batch_size = batch_size
+        self.workdir = workdir
+        self.poll_interval = poll_interval
+        self.sleep = sleep
+
+    def submit(self, items: List[Tuple[str, str]]) -> Tuple[str, Dict[str, List[int]]]:
+        workdir = self.workdir or tempfile.mkdtemp(prefix='eval_judge_')
+        request_path = os.path.join(workdir, 'judge_requests.jsonl')
+        chunks = write_batch_file(items, request_path, self.model, self.batch_size)
+        batch_id = self.provider.submit(request_path)
+        logger.info(f'Submitted judge batch {batch_id} with {len(chunks)} requests for {len(items)} outputs')
+        return (batch_id, chunks)
+
+    def collect(self, batch_id: str, chunks: Dict[str, List[int]], total: int) -> Optional[List[Optional[str]]]:
+        status = self.provider.status(batch_id)
+        if status not in FINISHED_STATUSES:
+            return None
+        if status != 'completed':
+            raise RuntimeError(f'Judge batch {batch_id} ended with status {status}')
+        result_path = os.path.join(self.workdir or tempfile.mkdtemp(prefix='eval_judge_'), f'{batch_id}_results.jsonl')
+        self.provider.download(batch_id, result_path)
+        return read_batch_results(result_path, chunks, total)
+
+    def judge(self, items: List[Tuple[str, str]]) -> List[Optional[str]]:
+        batch_id, chunks = self.submit(items)
+        results = self.collect(batch_id, chunks, len(items))
+        while results is None:
+            self.sleep(self.poll_interval)
+            results = self.collect(batch_id, chunks, len(items))
+        return results
@@ -1,14 +1,16 @@
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any, Tuple
 from src.database.firestore import get_client
 from src.database.models import Task, TaskStatus
 logger = logging.getLogger(__name__)
+UPDATE_TEXT = {'update': 'Task updated', 'complete': 'Task completed', 'delete': 'Task deleted'}
 
 class TaskRepository:
 
     def __init__(self):
         self.collection = 'tasks'
+        self.removals = 'task_removals'
         self.db = get_client()
 
     def get_all_tasks(self) -> List[Task]:
@@ -28,6 +30,71 @@ class TaskRepository:
             logger.error(f'Error getting all tasks for user {user_id}: {str(e)}')
             raise
 
+    def query_tasks(self, user_id: str, status: Optional[str]=None, tag: Optional[str]=None, due_before: Optional[datetime]=None, due_after: Optional[datetime]=None, since: Optional[datetime]=None, fields: Optional[List[str]]=None, limit: int=100, cursor: Optional[str]=None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        try:
+            filters = [('userId', '==', user_id)]
+            if status:
+                filters.append(('status', '==', status))
+            if tag:
+                filters.append(('tags', 'array_contains', tag))
+            if due_after:
+                filters.append(('dueDate', '>=', due_after))
+            if due_before:
+                filters.append(('dueDate', '<', due_before))
+            if since:
+                filters.append(('updatedAt', '>', since))
+                order_by, direction = ('updatedAt', 'ASCENDING')
+            elif due_after or due_before:
+                order_by, direction = ('dueDate', 'ASCENDING')
+            else:
+                order_by, direction = ('updatedAt', 'DESCENDING')
+            select = sorted(set(fields) | {'updatedAt', 'dueDate'}) if fields else None
+            rows = self.db.query(self.collection, filters=filters, order_by=order_by, direction=direction, limit=limit + 1, fields=select, start_after=cursor)
+            next_cursor = rows[limit - 1]['id'] if len(rows) > limit else None
+            rows = rows[:limit]
+            if since and cursor is None:
+                rows = sorted(self.get_removed_since(user_id, since) + rows, key=lambda r: r['updatedAt'])
+            return (rows, next_cursor)
+        except Exception as e:
+            logger.error(f'Error querying tasks for user {user_id}: {str(e)}')
+            raise
+
+    def get_latest_update(self, user_id: str) -> Optional[datetime]:
+        try:
+            filters = [('userId', '==', user_id)]
+            tasks_data = self.db.query(self.collection, filters=filters, order_by='updatedAt', direction='DESCENDING', limit=1, fields=['updatedAt'])
+            return tasks_data[0].get('updatedAt') if tasks_data else None
+        except Exception as e:
+            logger.error(f'Error getting latest update for user {user_id}: {str(e)}')
+            raise
+
+    def get_watermark(self, user_id: str) -> Optional[datetime]:
+        try:
+            removals = self.db.query(self.removals, filters=[('userId', '==', user_id)], order_by='removedAt', direction='DESCENDING', limit=1, fields=['removedAt'])
+            stamps = [s for s in (self.get_latest_update(user_id), removals[0].get('removedAt') if removals else None) if s is not None]
+            return max(stamps) if stamps else None
+        except Exception as e:
+            logger.error(f'Error getting task watermark for user {user_id}: {str(e)}')
+            raise
+
+    def get_removed_since(self, user_id: str, since: datetime) -> List[Dict[str, Any]]:
+        try:
+            rows = self.db.query(self.removals, filters=[('userId', '==', user_id), ('removedAt', '>', since)], order_by='removedAt', direction='ASCENDING')
+            return [{'id': r['taskId'], 'removed': True, 'updatedAt': r['removedAt']} for r in rows]
+        except Exception as e:
+            logger.error(f'Error getting removed tasks for user {user_id}: {str(e)}')
+            raise
+
+    def get_task_updated_at(self, user_id: str, task_id: str) -> Optional[datetime]:
+        try:
+            task_data = self.db.read(self.collection, task_id, fields=['userId', 'updatedAt'])
+            if not task_data or task_data.get('userId') != user_id:
+                return None
+            return task_data.get('updatedAt')
+        except Exception as e:
+            logger.error(f'Error getting update time of task {task_id}: {str(e)}')
+            raise
+
     def get_active_tasks(self, user_id: str) -> List[Task]:
         try:
             filters = [('userId', '==', user_id), ('status', '==', TaskStatus.ACTIVE)]
@@ -155,15 +222,71 @@ class TaskRepository:
             logger.error(f'Error completing task {task_id}: {str(e)}')
             raise
 
+    def apply_changes(self, user_id: str, creates: List[Task], updates: List[tuple]) -> Dict[str, Any]:
+        operations = [('create', None, task, None) for task in creates] + [('update', task_id, task_data, update_text) for task_id, task_data, update_text in updates]
+        results = self.apply_operations(user_id, operations)
+        created = [task_id for task_id, _ in results[:len(creates)]]
+        updated = {task_id: error is None for task_id, error in results[len(creates):]}
+        return {'created': created, 'updated': updated}
+
+    def apply_operations(self, user_id: str, operations: List[tuple]) -> List[Tuple[Optional[str], Optional[str]]]:
+        try:
+            found = self.db.get_many(self.collection, list(dict.fromkeys((op[1] for op in operations if op[0] != 'create'))))
+            statuses = {task_id: data.get('status') for task_id, data in found.items() if data and data.get('userId') == user_id}
+            writes = []
+            results = []
+            for kind, task_id, payload, update_text in operations:
+                now = datetime.now()
+                if kind == 'create':
+                    payload.id = self.db.new_id(self.collection)
+                    task_data = payload.to_dict()
+                    task_data.pop('id', None)
+                    task_data['createdAt'] = now
+                    writes.append(('set', self.collection, payload.id, task_data))
+                    results.append((payload.id, None))
+                    continue
+                if task_id not in statuses:
+                    logger.warning(f'Task {task_id} not found or does not belong to user {user_id}')
+                    results.append((task_id, 'Task not found or not owned by user'))
+                    continue
+                if kind == 'complete' and statuses[task_id] != TaskStatus.ACTIVE:
+                    logger.warning(f'Task {task_id} is not active, cannot complete')
+                    results.append((task_id, 'Task is not active'))
+                    continue
+                if kind == 'complete':
+                    task_data = {'status': TaskStatus.COMPLETED, 'completionDate': now}
+                elif kind == 'delete':
+                    task_data = {'status': TaskStatus.DELETED, 'deletionDate': now}
+                else:
+                    task_data = dict(payload)
+                task_data['updatedAt'] = now
+                task_data['updates'] = self.db.array_union([{'timestamp': now, 'user': user_id, 'updateText': update_text or UPDATE_TEXT[kind]}])
+                statuses[task_id] = task_data.get('status', statuses[task_id])
+                writes.append(('update', self.collection, task_id, task_data))
+                results.append((task_id, None))
+            if writes:
+                self.db.batch_write(writes)
+            logger.info(f'Applied {len(writes)} of {len(operations)} task operations for user {user_id}')
+            return results
+        except Exception as e:
+            logger.error(f'Error applying task operations for user {user_id}: {str(e)}')
+            raise
+
     def assign_tasks(self, task_ids: List[str], new_user_id: str) -> bool:
         try:
-            for task_id in task_ids:
-                task_data = self.db.read(self.collection, task_id)
+            writes = []
+            now = datetime.now(timezone.utc)
+            for task_id, task_data in self.db.get_many(self.collection, task_ids).items():
                 if not task_data:
                     continue
                 updates = task_data.get('updates') or []
                 update_entry = {'timestamp': datetime.now(), 'user': new_user_id, 'updateText': 'Task assigned'}
-                self.db.update(self.collection, task_id, {'userId': new_user_id, 'updates': updates + [update_entry]})
+                writes.append(('update', self.collection, task_id, {'userId': new_user_id, 'updates': updates + [update_entry]}))
+                old_user_id = task_data.get('userId')
+                if old_user_id and old_user_id != new_user_id:
+                    writes.append(('set', self.removals, f'{task_id}-{int(now.timestamp() * 1000000)}', {'userId': old_user_id, 'taskId': task_id, 'removedAt': now}))
+            if writes:
+                self.db.batch_write(writes)
             return True
         except Exception as e:
             logger.error(f'Error assigning tasks: {str(e)}')
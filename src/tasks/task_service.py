@@ -1,14 +1,17 @@
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from src.database.models import Task, TaskStatus
 from src.tasks.task_repository import get_task_repository
+from src.tasks.task_snapshot import TaskSnapshot, get_task_snapshot_cache
 logger = logging.getLogger(__name__)
+BATCH_OPS = ('create', 'update', 'complete', 'delete')
 
 class TaskService:
 
     def __init__(self):
         self.repository = get_task_repository()
+        self.snapshots = get_task_snapshot_cache()
 
     def get_all_tasks_for_user(self, user_id: str) -> List[Task]:
         logger.info(f'Getting all tasks for user {user_id}')
@@ -26,6 +29,28 @@ class TaskService:
         logger.info(f'Getting deleted tasks for user {user_id}')
         return self.repository.get_deleted_tasks(user_id)
 
+    def query_tasks(self, user_id: str, **criteria: Any) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        logger.info(f'Querying tasks for user {user_id}: {criteria}')
+        return self.repository.query_tasks(user_id, **criteria)
+
+    def get_watermark(self, user_id: str) -> Optional[datetime]:
+        return self.repository.get_watermark(user_id)
+
+    def get_task_updated_at(self, user_id: str, task_id: str) -> Optional[datetime]:
+        return self.repository.get_task_updated_at(user_id, task_id)
+
+    def get_task_snapshot(self, user_id: str) -> Dict[TaskStatus, List[Task]]:
+        snapshot = self.snapshots.get(user_id)
+        if snapshot is not None and not self.snapshots.needs_probe(snapshot):
+            return snapshot.tasks
+        watermark = self.repository.get_latest_update(user_id)
+        if snapshot is not None and snapshot.accepts(watermark):
+            return snapshot.tasks
+        logger.info(f'Loading task snapshot for user {user_id}')
+        snapshot = TaskSnapshot(self.repository.get_all_tasks_for_user(user_id), watermark)
+        self.snapshots.put(user_id, snapshot)
+        return snapshot.tasks
+
     def get_task(self, user_id: str, task_id: str) -> Optional[Task]:
         logger.info(f'Getting task {task_id} for user {user_id}')
         return self.repository.get_task(user_id, task_id)
@@ -34,15 +59,19 @@ class TaskService:
         logger.info(f'Getting all tasks for all users')
         return self.repository.get_all_tasks()
 
-    def create_task(self, user_id: str, task_data: Dict[str, Any]) -> str:
-        logger.info(f'Creating task for user {user_id}')
+    def _new_task(self, user_id: str, task_data: Dict[str, Any]) -> Task:
         due_date = task_data.get('due_date') or datetime.now() + timedelta(days=7)
         task = Task(user_id=user_id, title=task_data.get('title'), description=task_data.get('description'), due_date=due_date, notes=task_data.get('notes'), owner_id=task_data.get('owner_id', user_id), owner_email=task_data.get('owner_email'), owner_name=task_data.get('owner_name'), tags=task_data.get('tags'))
         task.updates = [{'timestamp': datetime.now(), 'user': user_id, 'updateText': 'Task created'}]
-        return self.repository.create_task(task)
+        return task
 
-    def update_task(self, user_id: str, task_id: str, task_data: Dict[str, Any]) -> bool:
-        logger.info(f'Updating task {task_id} for user {user_id}')
+    def create_task(self, user_id: str, task_data: Dict[str, Any]) -> str:
+        logger.info(f'Creating task for user {user_id}')
+        task_id = self.repository.create_task(self._new_task(user_id, task_data))
+        self.snapshots.invalidate(user_id)
+        return task_id
+
+    def _db_fields(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
         db_task_data = {}
         if 'title' in task_data:
             db_task_data['title'] = task_data['title']
@@ -56,23 +85,82 @@ class TaskService:
             db_task_data['status'] = task_data['status']
         if 'tags' in task_data:
             db_task_data['tags'] = task_data['tags']
-        return self.repository.update_task(user_id, task_id, db_task_data)
+        return db_task_data
+
+    def update_task(self, user_id: str, task_id: str, task_data: Dict[str, Any]) -> bool:
+        logger.info(f'Updating task {task_id} for user {user_id}')
+        result = self.repository.update_task(user_id, task_id, self._db_fields(task_data))
+        self.snapshots.invalidate(user_id)
+        return result
+
+    def apply_changes(self, user_id: str, changes: Any) -> List[Dict[str, Any]]:
+        logger.info(f'Applying {len(changes.new_tasks)} new and {len(changes.modified_tasks)} modified tasks for user {user_id}')
+        creates = [self._new_task(user_id, getattr(t, 'model_dump', t.dict)(exclude_none=True)) for t in changes.new_tasks]
+        updates = []
+        for mod_task in changes.modified_tasks:
+            raw_data = getattr(mod_task, 'model_dump', mod_task.dict)(exclude={'id'}, exclude_none=True)
+            updates.append((mod_task.id, self._db_fields(raw_data), 'Task updated by AI assistant'))
+        outcome = self.repository.apply_changes(user_id, creates, updates)
+        self.snapshots.invalidate(user_id)
+        results = [{'op': 'create', 'id': task_id, 'ok': True} for task_id in outcome['created']]
+        for task_id, _, _ in updates:
+            ok = outcome['updated'].get(task_id, False)
+            results.append({'op': 'update', 'id': task_id, 'ok': ok} if ok else {'op': 'update', 'id': task_id, 'ok': False, 'error': 'Task not found or not owned by user'})
+        return results
+
+    def apply_batch(self, user_id: str, operations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        logger.info(f'Applying batch of {len(operations)} task operations for user {user_id}')
+        results: List[Optional[Dict[str, Any]]] = []
+        valid = []
+        for op in operations:
+            kind = op.get('op') if isinstance(op, dict) else None
+            task_id = op.get('id') if isinstance(op, dict) else None
+            if kind not in BATCH_OPS:
+                results.append({'op': kind, 'id': task_id, 'ok': False, 'error': f'Unknown op: {kind}'})
+            elif kind != 'create' and not task_id:
+                results.append({'op': kind, 'id': None, 'ok': False, 'error': 'id is required'})
+            else:
+                data = op.get('data') or {}
+                payload = self._new_task(user_id, data) if kind == 'create' else self._db_fields(data) if kind == 'update' else None
+                valid.append((len(results), kind, (kind, task_id, payload, None)))
+                results.append(None)
+        outcome = self.repository.apply_operations(user_id, [v[2] for v in valid]) if valid else []
+        for (index, kind, _), (task_id, error) in zip(valid, outcome):
+            results[index] = {'op': kind, 'id': task_id, 'ok': True} if error is None else {'op': kind, 'id': task_id, 'ok': False, 'error': error}
+        if valid:
+            self.snapshots.invalidate(user_id)
+        return results
 
     def delete_task(self, user_id: str, task_id: str) -> bool:
         logger.info(f'Deleting task {task_id} for user {user_id}')
-        return self.repository.delete_task(user_id, task_id)
+        result = self.repository.delete_task(user_id, task_id)
+        if result:
+            self._patch_snapshot(user_id, task_id, TaskStatus.DELETED)
+        return result
 
     def restore_task(self, user_id: str, task_id: str) -> bool:
         logger.info(f'Restoring task {task_id} for user {user_id}')
-        return self.repository.restore_task(user_id, task_id)
+        result = self.repository.restore_task(user_id, task_id)
+        if result:
+            self._patch_snapshot(user_id, task_id, TaskStatus.ACTIVE)
+        return result
 
     def complete_task(self, user_id: str, task_id: str) -> bool:
         logger.info(f'Completing task {task_id} for user {user_id}')
-        return self.repository.complete_task(user_id, task_id)
+        result = self.repository.complete_task(user_id, task_id)
+        if result:
+            self._patch_snapshot(user_id, task_id, TaskStatus.COMPLETED)
+        return result
+
+    def _patch_snapshot(self, user_id: str, task_id: str, new_status: TaskStatus):
+        if self.snapshots.get(user_id) is not None:
+            self.snapshots.patch_status(user_id, task_id, new_status, self.repository.get_latest_update(user_id))
 
     def assign_tasks(self, task_ids: List[str], new_user_id: str) -> bool:
         logger.info(f'Assigning tasks {task_ids} to user {new_user_id}')
-        return self.repository.assign_tasks(task_ids, new_user_id)
+        result = self.repository.assign_tasks(task_ids, new_user_id)
+        self.snapshots.invalidate()
+        return result
 _task_service: Optional[TaskService] = None
 
 def get_task_service() -> TaskService:
@@ -0,0 +1,104 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from src.database.models import Task, TaskStatus
+logger = logging.getLogger(__name__)
+
+class TaskSnapshot:
+
+    def __init__(self, tasks: List[Task], watermark: Any=None):
+        self.tasks: Dict[TaskStatus, List[Task]] = {status: [] for status in TaskStatus}
+        for task in tasks:
+            try:
+                self.tasks[TaskStatus(task.status)].append(task)
+            except ValueError:
+                logger.warning(f'Task {task.id} has unknown status {task.status}')
+        self.watermark = watermark
+        self.loaded_at = time.monotonic()
+        self.probed_at = self.loaded_at
+
+    def accepts(self, watermark: Any) -> bool:
+        if self.watermark is not None and self.watermark != watermark:
+            return False
+        self.watermark = watermark
+        self.probed_at = time.monotonic()
+        return True
+
+    def move(self, task_id: str, new_status: TaskStatus) -> bool:
+        task = None
+        for status, tasks in self.tasks.items():
+            for t in tasks:
+                if t.id == task_id:
+                    task = t
+            self.tasks[status] = [t for t in tasks if t.id != task_id]
+        if task is None:
+            return False
+        now = datetime.now()
+        task.status = new_status
+        task.updated_at = now
+        if new_status == TaskStatus.COMPLETED:
+            task.completion_date = now
+        elif new_status == TaskStatus.DELETED:
+            task.deletion_date = now
+        else:
+            task.deletion_date = None
+        self.tasks[new_status].insert(0, task)
+        return True
+
+class TaskSnapshotCache:
+
+    def __init__(self, ttl: float=300, probe_interval: float=2, max_entries: int=256):
+        self.ttl = ttl
+        self.probe_interval = probe_interval
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, TaskSnapshot]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> Optional[TaskSnapshot]:
+        with self._lock:
+            snapshot = self._entries.get(user_id)
+            if snapshot is None:
+                return None
+            if time.monotonic() - snapshot.loaded_at > self.ttl:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return snapshot
+
+    def put(self, user_id: str, snapshot: TaskSnapshot):
+        with self._lock:
+            self._entries[user_id] = snapshot
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def needs_probe(self, snapshot: TaskSnapshot) -> bool:
+        return time.monotonic() - snapshot.probed_at >= self.probe_interval
+
+    def patch_status(self, user_id: str, task_id: str, new_status: TaskStatus, watermark: Any=None):
+        with self._lock:
+            snapshot = self._entries.get(user_id)
+            if snapshot is None:
+                return
+            if watermark is not None and snapshot.move(task_id, new_status):
+                # Our own write bumps updatedAt; record its watermark so later external writes still force a reload.
+                snapshot.watermark = watermark
+            else:
+                del self._entries[user_id]
+
+    def invalidate(self, user_id: Optional[str]=None):
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+_task_snapshot_cache: Optional[TaskSnapshotCache] = None
+
+def get_task_snapshot_cache() -> TaskSnapshotCache:
+    global _task_snapshot_cache
+    if _task_snapshot_cache is None:
+        _task_snapshot_cache = TaskSnapshotCache()
+    return _task_snapshot_cache
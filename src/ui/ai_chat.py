@@ -43,26 +43,40 @@ def _display_response(resp: TaskChanges):
         st.code(last)
     st.json(getattr(resp, 'model_dump', resp.dict)(exclude_none=True))
 
-def _process_chat(user_id: str):
+def _finish_chat(result: Dict[str, Any]):
+    st.session_state.ai_response = result.get('response')
+    st.session_state.chat_id = result.get('chat_id')
+    st.session_state.ai_input = ''
+    st.session_state.ai_processing = False
+    st.session_state.ai_input_with_id = ''
+    st.rerun()
+
+def _stream_chat(user_id: str):
     try:
         ai_input_with_id = st.session_state.get('ai_input_with_id', f"{st.session_state.ai_input}\n\nuser_id: {user_id}")
-        result = get_llm_service().process_chat(user_id, ai_input_with_id)
-        if result:
-            st.session_state.ai_response = result.get('response')
-            st.session_state.chat_id = result.get('chat_id')
-            st.session_state.ai_input = ''
-            st.session_state.ai_processing = False
-            st.session_state.ai_input_with_id = ''
-            st.rerun()
+        st.subheader('Response')
+        thinking = st.empty()
+        items = st.container()
+        text = ''
+        for event, payload in get_llm_service().stream_chat(user_id, ai_input_with_id):
+            if event == 'token':
+                text += payload
+                thinking.markdown(text)
+            elif event in ('new_task', 'modified_task'):
+                with items:
+                    st.caption('New task' if event == 'new_task' else 'Modified task')
+                    st.json(getattr(payload, 'model_dump', payload.dict)(exclude_none=True))
+            elif event == 'done' and payload:
+                _finish_chat(payload)
     except Exception as e:
-        logger.error(f'Error processing AI chat: {str(e)}')
+        logger.error(f'Error streaming AI chat: {str(e)}')
         st.error(f'Error processing your question: {str(e)}')
         st.session_state.ai_processing = False
         traceback.print_exc()
 
 def _main_tab(user_id: str):
     if st.session_state.ai_processing:
-        _process_chat(user_id)
+        _stream_chat(user_id)
     with st.form(key='ai_chat_form'):
         ai_input = st.text_area('Your request', value=st.session_state.ai_input, height=100)
         submit_button = st.form_submit_button('Submit')
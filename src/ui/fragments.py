@@ -0,0 +1,16 @@
+from typing import Callable
+
+import streamlit as st
+
+
+def fragment(func: Callable) -> Callable:
+    wrapper = getattr(st, 'fragment', None)
+    if wrapper is None:
+        return func
+    return wrapper(func)
+
+
+def rerun_fragment():
+    if getattr(st, 'fragment', None) is not None:
+        st.rerun(scope='fragment')
+    st.rerun()
@@ -1,7 +1,7 @@
 import streamlit as st
 from src.groups.group_service import get_group_service
 from src.groups.user_group_service import get_user_group_service
-from src.users.user_service import get_user_service
+from src.ui.user_picker import search_user_options
 
 
 def _groups_tab():
@@ -33,20 +33,19 @@ def _groups_tab():
 def _user_groups_tab():
     service = get_user_group_service()
     group_service = get_group_service()
-    user_service = get_user_service()
     records = service.get_user_groups()
     groups = group_service.get_groups()
-    users = user_service.get_users()
     st.dataframe(records)
 
     st.subheader('Add User to Group')
     group_options = [''] + [g['groupName'] for g in groups]
     add_group = st.selectbox('Group', group_options, key='add_group')
-    user_options = [''] + [u.get('userName') or u['userEmail'] for u in users]
+    users = search_user_options('add_user_group')
+    user_options = [''] + list(users.keys())
     add_user_label = st.selectbox('User', user_options, key='add_user')
     if st.button('Add User to Group'):
         group = next((g for g in groups if g['groupName'] == add_group), None)
-        user = next((u for u in users if (u.get('userName') or u['userEmail']) == add_user_label), None)
+        user = users.get(add_user_label)
         if group and user:
             exists = any(
                 ((r.get('groupId') == group.get('id') or r.get('groupName') == group['groupName']) and
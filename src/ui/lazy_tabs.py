@@ -0,0 +1,28 @@
+from typing import Any, Callable, Dict
+
+import streamlit as st
+
+
+def render_lazy_tabs(key: str, renderers: Dict[str, Callable[[], None]]):
+    names = list(renderers.keys())
+    containers = st.tabs(names, key=key, on_change='rerun')
+    for name, container in zip(names, containers):
+        if getattr(container, 'open', True) is False:
+            continue
+        with container:
+            renderers[name]()
+
+
+def cached_tab_data(key: str, loader: Callable[[], Any]) -> Any:
+    if 'lazy_tab_data' not in st.session_state:
+        st.session_state['lazy_tab_data'] = {}
+    cache = st.session_state['lazy_tab_data']
+    if key not in cache:
+        cache[key] = loader()
+    return cache[key]
+
+
+def clear_tab_data(prefix: str=''):
+    cache = st.session_state.get('lazy_tab_data') or {}
+    for key in [k for k in cache if k.startswith(prefix)]:
+        del cache[key]
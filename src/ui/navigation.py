@@ -7,6 +7,7 @@ from src.ui.ai_chat import render_ai_chat
 from src.ui.settings import render_settings
 from src.ui.system_management import render_system_management
 from src.ui.evals_page import render_evals
+from src.ui.lazy_tabs import render_lazy_tabs, cached_tab_data, clear_tab_data
 from src.ai.chat_service import delete_all_chats_one_by_one, get_all_chats
 from src.tasks.task_service import get_task_service
 from src.ai.prompt_repository import get_prompt_repository
@@ -90,30 +91,28 @@ def debug_session_state():
     st.json(session_items)
 
 def debug_eval_inputs():
-    df = pd.DataFrame(get_eval_inputs())
+    df = pd.DataFrame(cached_tab_data('view_tables.eval_inputs', get_eval_inputs))
     st.dataframe(df)
 
 def debug_eval_results():
-    df = pd.DataFrame(get_eval_results())
+    df = pd.DataFrame(cached_tab_data('view_tables.eval_results', get_eval_results))
     st.dataframe(df)
 
 def _debug_session_state_tab():
     debug_session_state()
 
 def _debug_ai_chats_tab():
-    df = pd.DataFrame(get_all_chats())
+    df = pd.DataFrame(cached_tab_data('view_tables.ai_chats', get_all_chats))
     st.dataframe(df)
 
 def _debug_tasks_tab():
-    task_service = get_task_service()
-    tasks = task_service.get_all_tasks()
+    tasks = cached_tab_data('view_tables.tasks', lambda: get_task_service().get_all_tasks())
     task_list = [{'id': task.id, 'userId': task.user_id, 'title': task.title, 'status': task.status, 'description': task.description, 'dueDate': task.due_date.isoformat() if hasattr(task.due_date, 'isoformat') else task.due_date, 'createdAt': task.created_at.isoformat() if hasattr(task.created_at, 'isoformat') else task.created_at, 'updatedAt': task.updated_at.isoformat() if hasattr(task.updated_at, 'isoformat') else task.updated_at, 'notes': task.notes, 'updates_count': len(task.updates) if task.updates else 0} for task in tasks]
     df = pd.DataFrame(task_list)
     st.dataframe(df)
 
 def _debug_prompts_tab():
-    prompt_repository = get_prompt_repository()
-    prompts = prompt_repository.get_all_prompts()
+    prompts = cached_tab_data('view_tables.prompts', lambda: get_prompt_repository().get_all_prompts())
     prompt_list = [prompt.to_dict() for prompt in prompts]
     df = pd.DataFrame(prompt_list)
     st.dataframe(df)
@@ -131,37 +130,24 @@ def _delete_ai_chats_tab():
         delete_all_chats_one_by_one(delete_count)
 
 def _debug_user_tables_tab():
-    client = get_client()
-    users_df = pd.DataFrame(client.get_all('users'))
+    users_df = pd.DataFrame(cached_tab_data('view_tables.users', lambda: get_client().get_all('users')))
     st.dataframe(users_df)
-    roles_df = pd.DataFrame(client.get_all('user_roles'))
+    roles_df = pd.DataFrame(cached_tab_data('view_tables.user_roles', lambda: get_client().get_all('user_roles')))
     st.dataframe(roles_df)
 
 def view_tables_page():
     st.header('Debug Information')
-    tabs = st.tabs([
-        'Session State',
-        'AI Chats',
-        'Tasks',
-        'Prompts',
-        'AI Eval Inputs',
-        'AI Eval Results',
-        'Users and Roles',
-    ])
-    with tabs[0]:
-        _debug_session_state_tab()
-    with tabs[1]:
-        _debug_ai_chats_tab()
-    with tabs[2]:
-        _debug_tasks_tab()
-    with tabs[3]:
-        _debug_prompts_tab()
-    with tabs[4]:
-        _debug_eval_inputs_tab()
-    with tabs[5]:
-        _debug_eval_results_tab()
-    with tabs[6]:
-        _debug_user_tables_tab()
+    if st.button('Reload Tables', key='reload_tables_button'):
+        clear_tab_data('view_tables.')
+    render_lazy_tabs('view_tables_tabs', {
+        'Session State': _debug_session_state_tab,
+        'AI Chats': _debug_ai_chats_tab,
+        'Tasks': _debug_tasks_tab,
+        'Prompts': _debug_prompts_tab,
+        'AI Eval Inputs': _debug_eval_inputs_tab,
+        'AI Eval Results': _debug_eval_results_tab,
+        'Users and Roles': _debug_user_tables_tab,
+    })
 
 
 def danger_zone_page():
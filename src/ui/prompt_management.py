@@ -1,10 +1,10 @@
 import streamlit as st
 from src.ai.prompt_service import get_prompt_service
-from src.database.models import PromptStatus
+from src.database.models import PromptMode
 from src.utils.time_utils import format_user_tz
 
 
-def _save_prompt(text, target):
+def _save_prompt(text, target, mode=None):
     if not text.strip():
         st.error('Prompt text cannot be empty')
         return
@@ -12,7 +12,10 @@ def _save_prompt(text, target):
         st.error('Prompt not found')
         return
     try:
-        if get_prompt_service().update_prompt(target, {'text': text}):
+        data = {'text': text}
+        if mode:
+            data['mode'] = mode
+        if get_prompt_service().update_prompt(target, data):
             st.success('New version created successfully!')
             st.rerun()
         else:
@@ -21,13 +24,16 @@ def _save_prompt(text, target):
         st.error(f'Failed to create new version: {e}')
 
 
-def _create_version_form(text, target):
+def _create_version_form(text, target, mode=PromptMode.TWO_PASS):
+    modes = [m.value for m in PromptMode]
     with st.form(key='create_new_version'):
         st.subheader('Create new version')
         value = st.text_area('Prompt Text', value=text)
+        idx = modes.index(mode) if mode in modes else 0
+        new_mode = st.selectbox('Execution Mode', modes, index=idx)
         save = st.form_submit_button('Save')
     if save:
-        _save_prompt(value, target)
+        _save_prompt(value, target, new_mode)
 
 
 def _upload_section(target):
@@ -36,12 +42,12 @@ def _upload_section(target):
         _save_prompt(file.getvalue().decode('utf-8'), target)
 
 
-def _change_active_version_form(selected, active, name):
+def _change_active_version_form(versions, active, name):
     with st.form(key='change_active_version'):
         st.subheader('Change Active version')
         options = {
-            f"v{p.version} - {(format_user_tz(p.created_at, '%Y-%m-%d %H:%M:%S') if p.created_at else 'unknown')}": p.version
-            for p in selected
+            f"v{v['version']} - {(format_user_tz(v['createdAt'], '%Y-%m-%d %H:%M:%S') if v.get('createdAt') else 'unknown')}": v['version']
+            for v in versions
         }
         current = active.version if active else None
         idx = list(options.values()).index(current) if current in options.values() else 0
@@ -71,21 +77,21 @@ def _download_section(name, active):
 def render_prompt_management():
     st.header('Prompt Management')
     try:
-        prompts = get_prompt_service().get_all_prompts()
+        heads = {h.prompt_name: h for h in get_prompt_service().get_catalog()}
     except Exception as e:
         st.error(f'Error loading prompts: {e}')
         return
-    if not prompts:
+    if not heads:
         st.info('No prompts found.')
         return
-    names = sorted({p.prompt_name for p in prompts})
-    prompt_name = st.selectbox('Select Prompt', names)
-    selected = [p for p in prompts if p.prompt_name == prompt_name]
-    selected.sort(key=lambda p: p.version, reverse=True)
-    active = next((p for p in selected if p.status == PromptStatus.ACTIVE), None)
-    target = active.id if active else selected[0].id if selected else None
-    text = active.text if active else selected[0].text if selected else ''
-    _create_version_form(text, target)
+    prompt_name = st.selectbox('Select Prompt', sorted(heads))
+    head = heads[prompt_name]
+    active = head.active
+    base = active or (get_prompt_service().get_prompt(head.latest_id) if head.latest_id else None)
+    target = base.id if base else None
+    text = base.text if base else ''
+    mode = base.mode if base else PromptMode.TWO_PASS
+    _create_version_form(text, target, mode)
     _upload_section(target)
-    _change_active_version_form(selected, active, prompt_name)
+    _change_active_version_form(head.versions, active, prompt_name)
     _download_section(prompt_name, active)
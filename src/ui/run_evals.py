@@ -2,7 +2,7 @@ import streamlit as st
 from src.eval.eval_input_service import get_eval_input_service
 from src.eval.eval_service import get_eval_service
 from src.ai.prompt_repository import get_prompt_repository
-from src.database.models import EvalStatus
+from src.database.models import EvalRunStatus, EvalStatus
 
 def render_run_evals():
     st.header('Run Evals')
@@ -13,15 +13,57 @@ def render_run_evals():
             st.info('No evaluation inputs found.')
         for ev in active_inputs:
             st.markdown(f'- {ev.input_text}')
-    repo = get_prompt_repository()
-    prompts = repo.get_all_prompts()
-    if not prompts:
+    heads = {h.prompt_name: h for h in get_prompt_repository().get_catalog()}
+    if not heads:
         st.info('No prompts available.')
         return
-    names = sorted({p.prompt_name for p in prompts})
-    prompt_name = st.selectbox('Prompt Name', names)
-    versions = sorted([p.version for p in prompts if p.prompt_name == prompt_name], reverse=True)
+    prompt_name = st.selectbox('Prompt Name', sorted(heads))
+    versions = [v['version'] for v in heads[prompt_name].versions]
     prompt_version = st.selectbox('Prompt Version', versions)
+    service = get_eval_service()
     if st.button('Run Evaluations'):
-        get_eval_service().run_evals(prompt_name, int(prompt_version), active_inputs)
-        st.success('Evaluations completed')
+        _run_with_progress(lambda cb: service.run_evals(prompt_name, int(prompt_version), active_inputs, on_progress=cb))
+    _sweep(service, list(heads.values()), active_inputs)
+    _unfinished_runs(service)
+
+def _run_with_progress(start):
+    bar = st.progress(0.0, text='Starting evaluations...')
+
+    def on_progress(progress):
+        bar.progress(progress.done / max(progress.total, 1), text=f'{progress.done}/{progress.total} evaluated, {progress.failed} failed, {progress.throughput:.2f} inputs/s')
+    service = get_eval_service()
+    result_ids = start(on_progress)
+    run = service.last_run
+    progress = run['progress']
+    if run.get('judging'):
+        st.info(f"Outputs saved. Verdicts are being judged offline in batch {run['judging']}; use Resume under Unfinished Runs to collect them.")
+        return
+    st.success(f"Evaluations completed: {len(result_ids)} results ({run['skipped']} reused) in {progress.elapsed:.1f}s ({progress.throughput:.2f} inputs/s, {progress.retries} retries)")
+    for input_id, error in run['errors'].items():
+        st.error(f'{input_id}: {error}')
+
+def _sweep(service, heads, active_inputs):
+    st.subheader('Compare Versions')
+    options = {f"{h.prompt_name} v{v['version']}": (h.prompt_name, v['version']) for h in sorted(heads, key=lambda h: h.prompt_name) for v in h.versions}
+    selected = st.multiselect('Prompt Versions', list(options.keys()))
+    if st.button('Run Sweep', disabled=len(selected) < 2):
+        bar = st.progress(0.0, text='Starting sweep...')
+
+        def on_progress(progress):
+            bar.progress(progress.done / max(progress.total, 1), text=f'{progress.done}/{progress.total} evaluated, {progress.failed} failed')
+        sweep = service.run_sweep([options[label] for label in selected], active_inputs, on_progress=on_progress)
+        st.dataframe(sweep['table'])
+        st.caption(f"{sweep['judge_calls']} judge calls, {sweep['judge_reused']} reused for identical outputs, {sweep['progress'].elapsed:.1f}s")
+        for key, error in sweep['errors'].items():
+            st.error(f'{key}: {error}')
+
+def _unfinished_runs(service):
+    runs = service.get_unfinished_runs()
+    if not runs:
+        return
+    st.subheader('Unfinished Runs')
+    for run in runs:
+        st.markdown(f'- {run.prompt_name} v{run.prompt_version}: {run.completed}/{run.total} done, {run.failed} failed ({run.status})')
+        label = 'Collect Verdicts' if run.status == EvalRunStatus.JUDGING else 'Resume'
+        if st.button(label, key=f'resume_eval_run_{run.id}'):
+            _run_with_progress(lambda cb, run_id=run.id: service.resume_run(run_id, on_progress=cb))
@@ -4,6 +4,7 @@ from src.users.user_service import get_user_service
 from src.groups.user_group_service import get_user_group_service
 from src.ui.changelog import render_changelog
 from src.ui.run_tests import render_run_tests
+from src.ui.lazy_tabs import render_lazy_tabs
 
 def _user_settings_tab():
     user = st.session_state.user or {}
@@ -22,10 +23,8 @@ def _user_settings_tab():
 
 def render_settings():
     st.title('Settings')
-    tabs = st.tabs(['Settings', 'ChangeLog', 'Run Tests'])
-    with tabs[0]:
-        _user_settings_tab()
-    with tabs[1]:
-        render_changelog()
-    with tabs[2]:
-        render_run_tests()
+    render_lazy_tabs('settings_tabs', {
+        'Settings': _user_settings_tab,
+        'ChangeLog': render_changelog,
+        'Run Tests': render_run_tests,
+    })
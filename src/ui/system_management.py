@@ -3,15 +3,13 @@ from src.ui.prompt_management import render_prompt_management
 from src.ui.group_management import render_group_management
 from src.ui.task_assignment import render_task_assignment
 from src.ui.run_tests import render_run_tests
+from src.ui.lazy_tabs import render_lazy_tabs
 
 def render_system_management():
     st.title('System Management')
-    tabs = st.tabs(['Prompt Management', 'Group Management', 'Assign Tasks', 'Coverage'])
-    with tabs[0]:
-        render_prompt_management()
-    with tabs[1]:
-        render_group_management()
-    with tabs[2]:
-        render_task_assignment()
-    with tabs[3]:
-        render_run_tests()
+    render_lazy_tabs('system_management_tabs', {
+        'Prompt Management': render_prompt_management,
+        'Group Management': render_group_management,
+        'Assign Tasks': render_task_assignment,
+        'Coverage': render_run_tests,
+    })
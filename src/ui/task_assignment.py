@@ -1,6 +1,6 @@
 import streamlit as st
 from src.tasks.task_service import get_task_service
-from src.users.user_service import get_user_service
+from src.ui.user_picker import search_user_options
 from src.database.models import TaskStatus
 
 
@@ -8,10 +8,9 @@ def render_task_assignment():
     st.header('Assign Tasks')
     ts = get_task_service()
     tasks = [t for t in ts.get_all_tasks() if t.status == TaskStatus.ACTIVE]
-    users = get_user_service().get_users()
     task_opts = {f"{t.title} ({t.user_id})": t.id for t in tasks}
     selected_labels = st.multiselect('Tasks', list(task_opts.keys()))
-    user_opts = {u.get('userName') or u['userEmail']: u['userId'] for u in users}
+    user_opts = {label: u['userId'] for label, u in search_user_options('assign_tasks').items()}
     selected_user = st.selectbox('Assign To', [''] + list(user_opts.keys()))
     if st.button('Assign') and selected_labels and selected_user:
         ids = [task_opts[l] for l in selected_labels]
@@ -3,7 +3,7 @@ from datetime import datetime
 from typing import Dict, Optional, Any
 from src.database.models import Task
 from src.tasks.task_service import get_task_service
-from src.users.user_service import get_user_service
+from src.ui.user_picker import search_user_options
 
 def render_task_form(task: Optional[Task]=None):
     task_service = get_task_service()
@@ -12,6 +12,7 @@ def render_task_form(task: Optional[Task]=None):
         st.header('Edit Task')
     else:
         st.header('Create New Task')
+    users = search_user_options('task_form', st.session_state.user.get('email'))
     with st.form(key='task_form'):
         title = st.text_input('Title', value=task.title if task else '')
         if not title:
@@ -30,8 +31,7 @@ def render_task_form(task: Optional[Task]=None):
         tags_str = ', '.join(task.tags) if task and task.tags else ''
         tags_input = st.text_input('Tags (comma separated)', value=tags_str)
         notes = st.text_area('Notes', value=task.notes if task else '')
-        users = get_user_service().get_users()
-        opts = {u.get('userName') or u['userEmail']: u['userEmail'] for u in users}
+        opts = {label: u['userEmail'] for label, u in users.items()}
         default_label = next((k for k, v in opts.items() if v == st.session_state.user.get('email')), '')
         assign_label = st.selectbox('Assign To', list(opts.keys()), index=list(opts.keys()).index(default_label) if default_label in opts else 0)
         cols = st.columns([1, 1])
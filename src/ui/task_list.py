@@ -8,6 +8,11 @@ from src.tasks.task_service import get_task_service
 from src.utils.time_utils import format_user_tz
 from src.utils.sort_utils import sort_tasks
 from src.utils.filter_utils import filter_tasks_by_tags
+from src.ui.fragments import fragment, rerun_fragment
+
+
+def _load_tasks(user_id: str, status: TaskStatus) -> List[Task]:
+    return get_task_service().get_task_snapshot(user_id).get(status, [])
 
 def render_task_list(tasks: List[Task], status: str, on_refresh: Callable=None):
     print(f"\n\n****{status=}\n\n")
@@ -108,48 +113,51 @@ def render_task_list(tasks: List[Task], status: str, on_refresh: Callable=None):
                 else:
                     detail = get_task_service().get_task(task.user_id, task.id)
                     st.session_state.task_details[task.id] = detail
-                st.rerun()
+                rerun_fragment()
             if 'task_details' in st.session_state and task.id in st.session_state.task_details:
                 with st.expander('Task Details', expanded=True):
                     detail = st.session_state.task_details.get(task.id)
                     st.json({k: str(v) for k, v in vars(detail).items()})
             st.markdown("<hr class='task-separator'>", unsafe_allow_html=True)
 
+@fragment
 def render_active_tasks():
     st.header('Active Tasks')
     user_id = st.session_state.user.get('email')
-    tasks = get_task_service().get_active_tasks(user_id)
+    tasks = _load_tasks(user_id, TaskStatus.ACTIVE)
     tag_query = st.text_input('Search Tags', key='tags_active')
     tasks = filter_tasks_by_tags(tasks, tag_query)
     st.write(f'Total tasks: {len(tasks)}')
 
     def refresh_tasks():
         st.session_state.refresh_active = True
-        st.rerun()
+        rerun_fragment()
     render_task_list(tasks, TaskStatus.ACTIVE, refresh_tasks)
 
+@fragment
 def render_completed_tasks():
     st.header('Completed Tasks')
     user_id = st.session_state.user.get('email')
-    tasks = get_task_service().get_completed_tasks(user_id)
+    tasks = _load_tasks(user_id, TaskStatus.COMPLETED)
     tag_query = st.text_input('Search Tags', key='tags_completed')
     tasks = filter_tasks_by_tags(tasks, tag_query)
     st.write(f'Total tasks: {len(tasks)}')
 
     def refresh_tasks():
         st.session_state.refresh_completed = True
-        st.rerun()
+        rerun_fragment()
     render_task_list(tasks, TaskStatus.COMPLETED, refresh_tasks)
 
+@fragment
 def render_deleted_tasks():
     st.header('Deleted Tasks')
     user_id = st.session_state.user.get('email')
-    tasks = get_task_service().get_deleted_tasks(user_id)
+    tasks = _load_tasks(user_id, TaskStatus.DELETED)
     tag_query = st.text_input('Search Tags', key='tags_deleted')
     tasks = filter_tasks_by_tags(tasks, tag_query)
     st.write(f'Total tasks: {len(tasks)}')
 
     def refresh_tasks():
         st.session_state.refresh_deleted = True
-        st.rerun()
+        rerun_fragment()
     render_task_list(tasks, TaskStatus.DELETED, refresh_tasks)
@@ -1,4 +1,5 @@
 import streamlit as st
+from src.ui.lazy_tabs import render_lazy_tabs
 from src.ui.task_form import render_task_form
 from src.ui.task_list import (
     render_active_tasks,
@@ -12,20 +13,21 @@ from src.ui.group_tasks import (
 )
 
 
+def _active_tasks_tab():
+    if st.session_state.get('editing_task'):
+        render_task_form(st.session_state.editing_task)
+    else:
+        render_active_tasks()
+
+
 def render_my_tasks_page():
     st.title('My Tasks')
-    tabs = st.tabs(['Add Task', 'Active Tasks', 'Completed Tasks', 'Deleted Tasks'])
-    with tabs[0]:
-        render_task_form()
-    with tabs[1]:
-        if st.session_state.get('editing_task'):
-            render_task_form(st.session_state.editing_task)
-        else:
-            render_active_tasks()
-    with tabs[2]:
-        render_completed_tasks()
-    with tabs[3]:
-        render_deleted_tasks()
+    render_lazy_tabs('my_tasks_tabs', {
+        'Add Task': render_task_form,
+        'Active Tasks': _active_tasks_tab,
+        'Completed Tasks': render_completed_tasks,
+        'Deleted Tasks': render_deleted_tasks,
+    })
 
 
 def render_group_tasks_page():
@@ -0,0 +1,16 @@
+from typing import Any, Dict, Optional
+
+import streamlit as st
+
+from src.users.user_directory import get_user_directory, user_label
+
+
+def search_user_options(key: str, include_email: Optional[str]=None, limit: int=50) -> Dict[str, Dict[str, Any]]:
+    query = st.text_input('Search Users', key=f'{key}_user_search')
+    directory = get_user_directory()
+    users = directory.search(query, limit)
+    if include_email:
+        current = directory.get_by_email(include_email)
+        if current and current not in users:
+            users = [current] + users
+    return {user_label(u): u for u in users}
@@ -0,0 +1,95 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional
+from .user_repository import get_user_repository
+
+logger = logging.getLogger(__name__)
+
+def user_label(user: Dict[str, Any]) -> str:
+    return user.get('userName') or user.get('userEmail') or ''
+
+class UserDirectory:
+    def __init__(self, ttl: float=300):
+        self.repo = get_user_repository()
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+        self._users: List[Dict[str, Any]] = []
+        self._by_email: Dict[str, Dict[str, Any]] = {}
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._terms: List[str] = []
+        self._term_users: List[int] = []
+
+    def _index(self, users: List[Dict[str, Any]]):
+        users = sorted(users, key=lambda u: user_label(u).lower())
+        by_email = {u['userEmail'].lower(): u for u in users if u.get('userEmail')}
+        by_id = {u['userId']: u for u in users if u.get('userId')}
+        entries = []
+        for idx, user in enumerate(users):
+            terms = {user_label(user).lower(), (user.get('userEmail') or '').lower()}
+            terms.update((user.get('userName') or '').lower().split())
+            entries.extend((term, idx) for term in terms if term)
+        entries.sort()
+        with self._lock:
+            self._users = users
+            self._by_email = by_email
+            self._by_id = by_id
+            self._terms = [term for term, _ in entries]
+            self._term_users = [idx for _, idx in entries]
+            self._loaded_at = time.monotonic()
+        logger.info(f'User directory indexed {len(users)} users')
+
+    def refresh(self):
+        self._index(self.repo.get_users())
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def _ensure_fresh(self):
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > self.ttl:
+            self.refresh()
+
+    def get_users(self) -> List[Dict[str, Any]]:
+        self._ensure_fresh()
+        return self._users
+
+    def get_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        self._ensure_fresh()
+        return self._by_email.get((email or '').lower())
+
+    def get_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
+        self._ensure_fresh()
+        return self._by_id.get(user_id)
+
+    def search(self, query: str, limit: int=20) -> List[Dict[str, Any]]:
+        self._ensure_fresh()
+        q = (query or '').strip().lower()
+        users, terms, term_users = self._users, self._terms, self._term_users
+        if not q:
+            return users[:limit]
+        results = []
+        seen = set()
+        for pos in range(bisect_left(terms, q), len(terms)):
+            if not terms[pos].startswith(q) or len(results) >= limit:
+                break
+            idx = term_users[pos]
+            if idx not in seen:
+                seen.add(idx)
+                results.append(users[idx])
+        return results
+
+_user_directory: UserDirectory | None = None
+
+def get_user_directory() -> UserDirectory:
+    global _user_directory
+    if _user_directory is None:
+        _user_directory = UserDirectory()
+    return _user_directory
+
+def invalidate_user_directory():
+    if _user_directory is not None:
+        _user_directory.invalidate()
@@ -13,15 +13,16 @@ class UserRepository:
         records = self.db.query(self.collection, filters=[('userEmail', '==', email)], limit=1)
         return records[0] if records else None
 
-    def create_user(self, email: str, tz: str, name: str | None=None) -> Dict[str, str]:
-        data = {'userEmail': email, 'userTZ': tz}
-        if name:
-            data['userName'] = name
-        doc_id = self.db.create(self.collection, data)
-        self.db.update(self.collection, doc_id, {'userId': doc_id})
-        record = {'userId': doc_id, 'userEmail': email, 'userTZ': tz}
+    def create_user(self, email: str, tz: str, name: str | None=None, role: str | None=None) -> Dict[str, str]:
+        user_id = self.db.new_id(self.collection)
+        record = {'userId': user_id, 'userEmail': email, 'userTZ': tz}
         if name:
             record['userName'] = name
+        writes = [('set', self.collection, user_id, dict(record))]
+        if role:
+            writes.append(('set', 'user_roles', user_id, {'userId': user_id, 'role': role}))
+            record['role'] = role
+        self.db.batch_write(writes)
         return record
 
     def update_user_timezone(self, user_id: str, tz: str) -> bool:
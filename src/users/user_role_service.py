@@ -4,6 +4,8 @@ from .user_role_repository import get_user_role_repository
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_ROLE = 'regular'
+
 class UserRoleService:
     def __init__(self):
         self.repo = get_user_role_repository()
@@ -12,7 +14,7 @@ class UserRoleService:
         record = self.repo.get_by_user_id(user_id)
         if record:
             return record
-        return self.repo.create_role(user_id, 'regular')
+        return self.repo.create_role(user_id, DEFAULT_ROLE)
 
 _service: UserRoleService | None = None
 
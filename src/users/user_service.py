@@ -1,27 +1,42 @@
 import logging
 from typing import Dict
 from .user_repository import get_user_repository
-from .user_role_service import get_user_role_service
+from .user_role_service import DEFAULT_ROLE, get_user_role_service
+from .user_directory import invalidate_user_directory
+from src.utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_TZ = 'America/Los_Angeles'
+
 class UserService:
     def __init__(self):
         self.repo = get_user_repository()
         self.role_service = get_user_role_service()
+        self.profiles = TTLCache(ttl=60)
 
     def login(self, email: str, name: str | None=None) -> Dict[str, str]:
+        record = self.profiles.get(email)
+        if record:
+            return dict(record)
         record = self.repo.get_by_email(email)
-        if not record:
-            record = self.repo.create_user(email, 'America/Los_Angeles', name)
-        self.role_service.ensure_default_role(record['userId'])
-        return record
+        if record:
+            role = self.role_service.ensure_default_role(record['userId'])
+            record = {**record, 'role': role.get('role')}
+        else:
+            record = self.repo.create_user(email, DEFAULT_TZ, name, role=DEFAULT_ROLE)
+            invalidate_user_directory()
+        self.profiles.put(email, record)
+        return dict(record)
 
     def get_users(self):
         return self.repo.get_users()
 
     def update_timezone(self, user_id: str, tz: str) -> bool:
-        return self.repo.update_user_timezone(user_id, tz)
+        result = self.repo.update_user_timezone(user_id, tz)
+        self.profiles.discard_where(lambda email, record: record.get('userId') == user_id)
+        invalidate_user_directory()
+        return result
 
 _service: UserService | None = None
 
@@ -52,3 +52,23 @@ def test_render_ai_chat_tabs(monkeypatch):
     tabs_called.clear()
     ai_chat.render_ai_chat()
     assert tabs_called and tabs_called[0] == ['Main', 'Feedback']
+
+
+def test_stream_chat_renders_incrementally(monkeypatch):
+    rendered = []
+    placeholder = SimpleNamespace(markdown=lambda text: rendered.append(('md', text)))
+    monkeypatch.setattr(ai_chat.st, 'subheader', lambda *a, **k: None, raising=False)
+    monkeypatch.setattr(ai_chat.st, 'empty', lambda: placeholder, raising=False)
+    monkeypatch.setattr(ai_chat.st, 'container', lambda: Tab(), raising=False)
+    monkeypatch.setattr(ai_chat.st, 'caption', lambda text: rendered.append(('caption', text)), raising=False)
+    monkeypatch.setattr(ai_chat.st, 'json', lambda data: rendered.append(('json', data)))
+    monkeypatch.setattr(ai_chat.st, 'rerun', lambda: rendered.append(('rerun',)))
+    from src.ai.llm_models import NewTask
+    task = NewTask(title='x')
+    events = [('token', 'a'), ('token', 'b'), ('new_task', task), ('done', {'chat_id': 'c1', 'response': 'r'})]
+    monkeypatch.setattr(ai_chat, 'get_llm_service', lambda: SimpleNamespace(stream_chat=lambda uid, text: iter(events)))
+    st.session_state.update({'ai_input': 'q', 'ai_input_with_id': 'q', 'ai_processing': True})
+    ai_chat._stream_chat('e')
+    assert rendered == [('md', 'a'), ('md', 'ab'), ('caption', 'New task'), ('json', {'title': 'x'}), ('rerun',)]
+    assert st.session_state['chat_id'] == 'c1'
+    assert st.session_state['ai_processing'] is False
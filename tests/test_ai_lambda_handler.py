@@ -6,26 +6,60 @@ sys.path.append(str(root))
 sys.path.append(str(root / 'aws_lambda_api'))
 from ai_handler import handler
 
-class DummyService:
+class DummyJobs:
     def __init__(self):
         self.calls = []
-    def process_chat(self, uid, text):
-        self.calls.append((uid, text))
-        return {'chat_id': 'c', 'response': 'ok'}
+    def submit(self, uid, text):
+        self.calls.append(('submit', uid, text))
+        return 'c'
+    def get(self, chat_id, user_id=None):
+        self.calls.append(('get', chat_id, user_id))
+        return {'chat_id': chat_id, 'status': 'done', 'response': {'new_tasks': [], 'modified_tasks': []}, 'error': None} if chat_id == 'c' and user_id == 'u' else None
+    def run(self, job):
+        self.calls.append(('run', job))
 
-def _run(event, monkeypatch, service):
-    monkeypatch.setattr('ai_handler.get_llm_service', lambda: service)
+def _run(event, monkeypatch, jobs):
+    monkeypatch.setattr('ai_handler.get_chat_jobs', lambda: jobs)
     return handler(event, None)
 
 def test_chat(monkeypatch):
-    service = DummyService()
+    jobs = DummyJobs()
     event = {
         'httpMethod': 'POST',
         'path': '/chat',
         'queryStringParameters': {'user_id': 'u'},
         'body': json.dumps({'text': 'hi'})
     }
-    result = _run(event, monkeypatch, service)
-    assert json.loads(result['body']) == {'chat_id': 'c', 'response': 'ok'}
-    assert service.calls == [('u', 'hi')]
+    result = _run(event, monkeypatch, jobs)
+    assert result['statusCode'] == 202
+    assert json.loads(result['body']) == {'chat_id': 'c', 'status': 'queued'}
+    assert jobs.calls == [('submit', 'u', 'hi')]
 
+def test_chat_status(monkeypatch):
+    jobs = DummyJobs()
+    result = _run({'httpMethod': 'GET', 'path': '/chat/c', 'queryStringParameters': {'user_id': 'u'}}, monkeypatch, jobs)
+    assert result['statusCode'] == 200
+    assert json.loads(result['body'])['status'] == 'done'
+    missing = _run({'httpMethod': 'GET', 'path': '/chat/x', 'queryStringParameters': {'user_id': 'u'}}, monkeypatch, jobs)
+    assert missing['statusCode'] == 404
+    other = _run({'httpMethod': 'GET', 'path': '/chat/c', 'queryStringParameters': {'user_id': 'v'}}, monkeypatch, jobs)
+    assert other['statusCode'] == 404
+    assert jobs.calls[-1] == ('get', 'c', 'v')
+
+def test_chat_requires_user(monkeypatch):
+    jobs = DummyJobs()
+    for event in ({'httpMethod': 'POST', 'path': '/chat', 'body': json.dumps({'text': 'hi'})}, {'httpMethod': 'GET', 'path': '/chat/c'}):
+        assert _run(event, monkeypatch, jobs)['statusCode'] == 400
+    assert jobs.calls == []
+
+def test_chat_job_event(monkeypatch):
+    jobs = DummyJobs()
+    job = {'chat_id': 'c', 'user_id': 'u', 'text': 'hi'}
+    assert _run({'chat_job': job}, monkeypatch, jobs)['statusCode'] == 200
+    assert jobs.calls == [('run', job)]
+
+def test_warmup_event(monkeypatch):
+    jobs = DummyJobs()
+    result = _run({'warmup': True}, monkeypatch, jobs)
+    assert result['statusCode'] == 200
+    assert jobs.calls == []
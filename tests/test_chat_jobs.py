@@ -0,0 +1,117 @@
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src.ai import chat_jobs
+from src.ai.chat_jobs import ChatJobs
+
+
+class DB:
+    def __init__(self):
+        self.docs = {}
+    def create(self, collection, data):
+        doc_id = f'c{len(self.docs)}'
+        self.docs[doc_id] = dict(data)
+        return doc_id
+    def update(self, collection, doc_id, data):
+        self.docs[doc_id].update(data)
+        return True
+    def read(self, collection, doc_id):
+        return self.docs.get(doc_id)
+    def transact(self, collection, doc_id, build):
+        writes, result = build(self.read(collection, doc_id))
+        for _, c, wid, data in writes:
+            self.update(c, wid, data)
+        return result
+
+
+def _jobs(monkeypatch, process_chat):
+    db = DB()
+    monkeypatch.setattr(chat_jobs, 'get_client', lambda: db)
+    monkeypatch.setattr('src.ai.llm_service.get_llm_service', lambda: SimpleNamespace(process_chat=process_chat))
+    return ChatJobs(max_workers=2), db
+
+
+def test_submit_returns_immediately_and_completes(monkeypatch):
+    release = threading.Event()
+
+    def process_chat(uid, text, chat_id=None):
+        release.wait(5)
+        db.update('AI_chats', chat_id, {'status': 'done', 'Response': '{"new_tasks": [], "modified_tasks": []}'})
+        return {'chat_id': chat_id}
+    jobs, db = _jobs(monkeypatch, process_chat)
+    chat_id = jobs.submit('u', 'hi')
+    assert jobs.get(chat_id)['status'] in ('queued', 'running')
+    seen = []
+    assert jobs.subscribe(chat_id, seen.append)
+    release.set()
+    result = jobs.wait(chat_id, timeout=5)
+    assert result['status'] == 'done'
+    assert result['response'] == {'new_tasks': [], 'modified_tasks': []}
+    assert seen and seen[0]['status'] == 'done'
+
+
+def test_failed_job_records_error(monkeypatch):
+    def process_chat(uid, text, chat_id=None):
+        raise RuntimeError('llm down')
+    jobs, db = _jobs(monkeypatch, process_chat)
+    chat_id = jobs.submit('u', 'hi')
+    result = jobs.wait(chat_id, timeout=5)
+    assert result['status'] == 'failed'
+    assert result['error'] == 'llm down'
+    assert jobs.get(chat_id, 'u')['status'] == 'failed'
+    assert jobs.get(chat_id, 'someone-else') is None
+
+
+def test_dispatcher_bypasses_pool(monkeypatch):
+    dispatched = []
+    db = DB()
+    monkeypatch.setattr(chat_jobs, 'get_client', lambda: db)
+    jobs = ChatJobs(dispatcher=dispatched.append)
+    chat_id = jobs.submit('u', 'hi')
+    assert dispatched == [{'chat_id': chat_id, 'user_id': 'u', 'text': 'hi'}]
+    assert jobs._pool is None
+
+
+def test_run_skips_jobs_that_are_not_queued(monkeypatch):
+    calls = []
+
+    def process_chat(uid, text, chat_id=None):
+        calls.append(chat_id)
+        return {'chat_id': chat_id}
+    jobs, db = _jobs(monkeypatch, process_chat)
+    jobs.dispatcher = lambda job: None
+    chat_id = jobs.submit('u', 'hi')
+    job = {'chat_id': chat_id, 'user_id': 'u', 'text': 'hi'}
+    assert jobs.run(job) == {'chat_id': chat_id}
+    assert db.docs[chat_id]['status'] == 'running'
+    assert jobs.run(job) is None
+    assert calls == [chat_id]
+
+
+def test_dispatch_failure_marks_job_failed(monkeypatch):
+    import pytest
+    db = DB()
+    monkeypatch.setattr(chat_jobs, 'get_client', lambda: db)
+
+    def dispatch(job):
+        raise RuntimeError('throttled')
+    jobs = ChatJobs(dispatcher=dispatch)
+    with pytest.raises(RuntimeError):
+        jobs.submit('u', 'hi')
+    assert db.docs['c0']['status'] == 'failed'
+    assert db.docs['c0']['error'] == 'Dispatch failed: throttled'
+
+
+def test_lambda_requires_dispatcher(monkeypatch):
+    import pytest
+    monkeypatch.setattr(chat_jobs, 'get_client', lambda: DB())
+    monkeypatch.setattr(chat_jobs, '_chat_jobs', None)
+    monkeypatch.setenv('AWS_LAMBDA_FUNCTION_NAME', 'ai')
+    monkeypatch.delenv('CHAT_JOB_FUNCTION_NAME', raising=False)
+    with pytest.raises(RuntimeError):
+        chat_jobs.get_chat_jobs()
+    monkeypatch.setenv('CHAT_JOB_FUNCTION_NAME', 'ai')
+    monkeypatch.setattr(chat_jobs, 'lambda_dispatcher', lambda name: ('dispatch', name))
+    assert chat_jobs.get_chat_jobs().dispatcher == ('dispatch', 'ai')
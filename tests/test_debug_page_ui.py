@@ -30,7 +30,7 @@ class Tab:
         pass
 tabs_called = []
 
-def tabs(names):
+def tabs(names, **k):
     tabs_called.append(names)
     return [Tab() for _ in names]
 st.expander = expander
@@ -47,8 +47,10 @@ pd.DataFrame = lambda data=None: data
 sys.modules['pandas'] = pd
 sys.modules.pop('src.ui.navigation', None)
 import src.ui.navigation as navigation
+import src.ui.lazy_tabs as lazy_tabs
 
 def test_view_tables_page_tabs(monkeypatch):
+    monkeypatch.setattr(lazy_tabs, 'st', st)
     tabs_called.clear()
     expander_called.clear()
     monkeypatch.setattr('src.ui.navigation.get_all_chats', lambda: [])
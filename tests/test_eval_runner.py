@@ -0,0 +1,116 @@
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src.eval.eval_runner import EvalRunner, TokenBucket
+from src.database.models import AIEvalInput
+
+
+def test_token_bucket_waits_for_refill():
+    now = [0.0]
+    slept = []
+
+    def sleep(seconds):
+        slept.append(seconds)
+        now[0] += seconds
+    bucket = TokenBucket(60, clock=lambda: now[0], sleep=sleep)
+    assert bucket.acquire(60) == 0
+    waited = bucket.acquire(30)
+    assert abs(waited - 30) < 1e-9
+    assert slept == [30]
+
+
+class Repo:
+    def __init__(self):
+        self.batches = []
+        self.ids = []
+    def create_results(self, results, ids=None, extra_writes=None):
+        self.batches.append(results)
+        self.ids.extend(ids or [])
+        return ids or [f'r-{r.eval_input_id}' for r in results]
+
+
+class Chat:
+    def __init__(self, fail_first=()):
+        self.active = 0
+        self.peak = 0
+        self.fail_first = set(fail_first)
+        self.lock = threading.Lock()
+        self.barrier = threading.Barrier(4, timeout=5)
+    def invoke(self, messages):
+        text = messages[-1].content
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            fail = text in self.fail_first
+            self.fail_first.discard(text)
+        try:
+            if text.startswith('q') and not fail:
+                try:
+                    self.barrier.wait()
+                except threading.BrokenBarrierError:
+                    pass
+            if fail:
+                raise RuntimeError('rate limited')
+            return SimpleNamespace(content=f'answer {text}')
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def test_runner_is_concurrent_batched_and_retries():
+    chat = Chat(fail_first={'q3'})
+    repo = Repo()
+    inputs = [AIEvalInput(id=f'i{i}', input_text=f'q{i}', eval_prompt='ok?') for i in range(8)]
+    seen = []
+    runner = EvalRunner(chat, repo, max_workers=4, batch_size=3, sleep=lambda s: None)
+    run = runner.run(SimpleNamespace(text='S', prompt_name='p', prompt_version=1, version=1), inputs, on_progress=lambda p: seen.append(p.done))
+    assert chat.peak == 4
+    assert sorted(run['result_ids']) == sorted(f'r-i{i}' for i in range(8))
+    assert [len(b) for b in repo.batches] == [3, 3, 2]
+    assert run['progress'].retries == 1
+    assert seen == list(range(1, 9))
+    assert run['errors'] == {}
+
+
+def test_runner_records_failures():
+    class Broken:
+        def invoke(self, messages):
+            raise RuntimeError('down')
+    runner = EvalRunner(Broken(), Repo(), max_workers=2, max_retries=1, sleep=lambda s: None)
+    run = runner.run(SimpleNamespace(text='S', prompt_name='p', version=1), [AIEvalInput(id='i1', input_text='q')])
+    assert run['result_ids'] == []
+    assert run['errors'] == {'i1': 'down'}
+    assert run['progress'].failed == 1
+
+
+def test_sweep_dedupes_judge_calls_and_aggregates():
+    class SweepChat:
+        def __init__(self):
+            self.judge_calls = 0
+            self.lock = threading.Lock()
+        def invoke(self, messages):
+            if messages[0].content == 'S2':
+                return SimpleNamespace(content='different', usage_metadata={'total_tokens': 7})
+            if messages[0].content.startswith('S'):
+                return SimpleNamespace(content='same', usage_metadata={'total_tokens': 5})
+            with self.lock:
+                self.judge_calls += 1
+            return SimpleNamespace(content='Looks right.\nPASS' if messages[-1].content == 'same' else 'FAIL', usage_metadata={'total_tokens': 3})
+    chat = SweepChat()
+    repo = Repo()
+    prompts = [SimpleNamespace(text=f'S{v}', prompt_name='p', version=v) for v in (1, 2, 3)]
+    inputs = [AIEvalInput(id=f'i{i}', input_text=f'q{i}', eval_prompt='ok?') for i in range(2)]
+    sweep = EvalRunner(chat, repo, max_workers=4, sleep=lambda s: None).sweep(prompts, inputs)
+    assert chat.judge_calls == 2
+    assert sweep['judge_calls'] == 2 and sweep['judge_reused'] == 4
+    table = {row['version']: row for row in sweep['table']}
+    assert table[1]['pass_rate'] == 1.0 and table[2]['pass_rate'] == 0.0
+    assert table[1]['outputs'] == 2 and table[2]['errors'] == 0
+    assert table[1]['tokens'] + table[3]['tokens'] == 2 * 5 * 2 + 3
+    assert table[2]['tokens'] == 2 * 7 + 3
+    assert sum(len(b) for b in repo.batches) == 6
+    from src.eval.eval_result_repository import input_hash, result_id
+    run_keys = {result_id(ev.id, 'p', v, input_hash(ev)) for ev in inputs for v in (1, 2, 3)}
+    assert len(set(repo.ids)) == 6 and not run_keys & set(repo.ids)
@@ -36,24 +36,30 @@ lc_openai.ChatOpenAI = DummyChat
 sys.modules['langchain_openai'] = lc_openai
 from src.eval.eval_service import EvalService
 from src.eval.eval_input_service import EvalInputService
-from src.database.models import AIEvalInput, AIPrompt
+from src.database.models import AIEvalInput, AIEvalResult, AIEvalRun, AIPrompt, EvalRunStatus
+from src.eval.eval_result_repository import input_hash, result_id
 
 def _setup_eval_service(monkeypatch):
     repo = MagicMock()
-    repo.create_result.return_value = 'rid'
+    repo.create_results.side_effect = lambda results, ids=None, extra_writes=None: ids
+    repo.get_existing.return_value = {}
+    run_repo = MagicMock()
+    run_repo.create_run.return_value = 'run1'
+    run_repo.checkpoint.side_effect = lambda run_id, data: ('update', 'Eval_Runs', run_id, data)
     prompt_repo = MagicMock()
     prompt_repo.get_prompt_by_name_version.return_value = AIPrompt(prompt_name='p', text='t', version=1)
     monkeypatch.setattr('src.eval.eval_service.get_eval_result_repository', lambda: repo)
     monkeypatch.setattr('src.eval.eval_service.get_prompt_repository', lambda: prompt_repo)
+    monkeypatch.setattr('src.eval.eval_service.get_eval_run_repository', lambda: run_repo)
+    monkeypatch.setattr('src.eval.eval_service.get_eval_input_repository', lambda: MagicMock())
     monkeypatch.setenv('OPENAI_API_KEY', 'k')
     monkeypatch.setenv('LANGCHAIN_TRACING_V2', 'false')
     monkeypatch.setenv('LANGCHAIN_ENDPOINT', 'http://localhost')
     monkeypatch.setenv('LANGCHAIN_API_KEY', 'x')
-    monkeypatch.setattr('src.ai.llm_executor.LangChainTracer', lambda: SimpleNamespace())
-    monkeypatch.setattr('src.eval.eval_service.LangChainTracer', lambda: SimpleNamespace())
     sys.modules['langchain_core.messages'].AIMessage = _Msg
     service = EvalService()
-    monkeypatch.setattr('src.eval.eval_service.ChatOpenAI', DummyChat)
+    monkeypatch.setattr('src.ai.llm_clients.ChatOpenAI', DummyChat)
+    monkeypatch.setattr('src.ai.llm_clients._llm_clients', None)
     return (service, repo, prompt_repo)
 
 def _setup_input_service(monkeypatch):
@@ -67,10 +73,40 @@ def test_run_evals(monkeypatch):
     service, repo, prepo = _setup_eval_service(monkeypatch)
     ev = AIEvalInput(id='i1', user_id='u', input_text='q')
     result = service.run_evals('p', 1, [ev])
-    assert result == ['rid']
-    repo.create_result.assert_called_once()
-    assert repo.create_result.call_args[0][0].input_text == 'q'
+    key = result_id('i1', 'p', 1, input_hash(ev))
+    assert result == [key]
+    repo.create_results.assert_called_once()
+    results, ids, extra = repo.create_results.call_args[0]
+    assert results[0].input_text == 'q' and results[0].run_id == 'run1'
+    assert ids == [key]
+    assert extra == [('update', 'Eval_Runs', 'run1', {'completed': 1, 'skipped': 0, 'failed': 0})]
     prepo.get_prompt_by_name_version.assert_called_once_with('p', 1)
+    service.run_repo.update_run.assert_called_once_with('run1', {'status': EvalRunStatus.COMPLETED, 'completed': 1, 'skipped': 0, 'failed': 0})
+
+def test_run_evals_skips_existing_results(monkeypatch):
+    service, repo, _ = _setup_eval_service(monkeypatch)
+    done = AIEvalInput(id='i1', user_id='u', input_text='q')
+    todo = AIEvalInput(id='i2', user_id='u', input_text='r')
+    done_key = result_id('i1', 'p', 1, input_hash(done))
+    repo.get_existing.return_value = {done_key: AIEvalResult(eval_input_id='i1')}
+    result = service.run_evals('p', 1, [done, todo])
+    assert result == [done_key, result_id('i2', 'p', 1, input_hash(todo))]
+    assert [r.eval_input_id for r in repo.create_results.call_args[0][0]] == ['i2']
+    assert service.last_run['skipped'] == 1
+    service.run_repo.update_run.assert_called_once_with('run1', {'status': EvalRunStatus.COMPLETED, 'completed': 2, 'skipped': 1, 'failed': 0})
+
+def test_resume_run_reloads_inputs(monkeypatch):
+    service, repo, _ = _setup_eval_service(monkeypatch)
+    ev = AIEvalInput(id='i1', user_id='u', input_text='q')
+    service.run_repo.get_run.return_value = AIEvalRun(id='run9', prompt_name='p', prompt_version=1, input_ids=['i1'], status=EvalRunStatus.RUNNING)
+    service.input_repo.get_inputs.return_value = [ev]
+    assert service.resume_run('run9') == [result_id('i1', 'p', 1, input_hash(ev))]
+    service.input_repo.get_inputs.assert_called_once_with(['i1'])
+    service.run_repo.create_run.assert_not_called()
+    assert service.last_run['run_id'] == 'run9'
+    service.run_repo.get_run.return_value = None
+    with pytest.raises(ValueError):
+        service.resume_run('missing')
 
 def test_run_evals_missing_prompt(monkeypatch):
     service, repo, prepo = _setup_eval_service(monkeypatch)
@@ -92,3 +128,38 @@ def test_eval_input_update(monkeypatch):
     service, repo, _ = _setup_input_service(monkeypatch)
     service.update_input('x', {'inputText': 'n'})
     repo.update_input.assert_called_once_with('x', {'inputText': 'n'})
+
+def test_offline_judging_saves_outputs_then_collects_on_resume(monkeypatch, tmp_path):
+    from src.eval.judge import JudgeVerdict, JudgeVerdicts, LocalBatchProvider, OfflineJudge
+    service, repo, _ = _setup_eval_service(monkeypatch)
+    store = {}
+
+    def create_results(results, ids=None, extra_writes=None):
+        store.update(zip(ids, results))
+        return ids
+    repo.create_results.side_effect = create_results
+    repo.get_existing.side_effect = lambda ids: {k: store[k] for k in ids if k in store}
+
+    def respond(body):
+        count = body['messages'][-1]['content'].count('### Result ')
+        return JudgeVerdicts(verdicts=[JudgeVerdict(index=i, evaluation='fine', verdict='PASS') for i in range(count)]).model_dump_json()
+    provider = LocalBatchProvider(respond)
+    states = ['in_progress', 'completed']
+    monkeypatch.setattr(provider, 'status', lambda batch_id: states.pop(0))
+    monkeypatch.setattr(service, '_offline_judge', lambda: OfflineJudge(provider, 'm', workdir=str(tmp_path)))
+    service.judge_mode = 'offline'
+    inputs = [AIEvalInput(id=f'i{n}', user_id='u', input_text=f'q{n}', eval_prompt='crit') for n in range(3)]
+    keys = service.run_evals('p', 1, inputs)
+    assert len(store) == 3 and all(r.llm_judge_says is None for r in store.values())
+    assert service.last_run['judging'] == 'local-0'
+    judging = service.run_repo.update_run.call_args_list[0].args[1]
+    assert judging['status'] == EvalRunStatus.JUDGING and sorted(judging['judgeResultIds']) == sorted(keys)
+    assert service.run_repo.update_run.call_args_list[-1].args[1]['status'] == EvalRunStatus.JUDGING
+    run = AIEvalRun(id='run1', prompt_name='p', prompt_version=1, input_ids=[ev.id for ev in inputs], status=EvalRunStatus.JUDGING, judge_batch_id='local-0', judge_result_ids=judging['judgeResultIds'], judge_chunks=judging['judgeChunks'])
+    service.run_repo.get_run.return_value = run
+    assert service.resume_run('run1') == []
+    assert service.last_run['judging'] == 'local-0'
+    assert sorted(service.resume_run('run1')) == sorted(keys)
+    assert all(r.llm_judge_says == 'fine\nPASS' for r in store.values())
+    done = repo.create_results.call_args.args[2][0][3]
+    assert done['status'] == EvalRunStatus.COMPLETED and done['judgeBatchId'] is None
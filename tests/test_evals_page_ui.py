@@ -17,7 +17,7 @@ class Tab:
 
 tabs_called = []
 
-def tabs(names):
+def tabs(names, **k):
     tabs_called.append(names)
     return [Tab() for _ in names]
 
@@ -26,6 +26,7 @@ st.title = lambda *a, **k: None
 sys.modules['streamlit'] = st
 
 import importlib
+import src.ui.lazy_tabs as lazy_tabs
 import src.ui.evals_page as ep
 importlib.reload(ep)
 
@@ -34,6 +35,7 @@ def test_render_evals(monkeypatch):
     calls = []
     monkeypatch.setattr(ep, 'render_eval_candidates', lambda: calls.append('c'))
     monkeypatch.setattr(ep, 'render_run_evals', lambda: calls.append('r'))
+    monkeypatch.setattr(lazy_tabs, 'st', st)
     tabs_called.clear()
     ep.render_evals()
     assert tabs_called and tabs_called[0] == ['Eval Candidates', 'Run Evals']
@@ -42,7 +42,7 @@ importlib.reload(gm)
 def test_render_group_management_tabs(monkeypatch):
     monkeypatch.setattr(gm, 'get_group_service', lambda: SimpleNamespace(get_groups=lambda: []))
     monkeypatch.setattr(gm, 'get_user_group_service', lambda: SimpleNamespace(get_user_groups=lambda: []))
-    monkeypatch.setattr(gm, 'get_user_service', lambda: SimpleNamespace(get_users=lambda: []))
+    monkeypatch.setattr(gm, 'search_user_options', lambda key: {})
     tabs_called.clear()
     gm.render_group_management()
     assert tabs_called and tabs_called[0] == ['Groups', 'UserGroups']
@@ -52,10 +52,10 @@ def test_user_groups_add(monkeypatch):
     calls = {}
     ug_service = SimpleNamespace(get_user_groups=lambda: [], create_user_group=lambda d: calls.setdefault('create', d))
     group_service = SimpleNamespace(get_groups=lambda: [{'id': 'g1', 'groupName': 'G'}])
-    user_service = SimpleNamespace(get_users=lambda: [{'userId': 'u1', 'userEmail': 'E'}])
+    user_options = lambda key: {'E': {'userId': 'u1', 'userEmail': 'E'}}
     monkeypatch.setattr(gm, 'get_user_group_service', lambda: ug_service)
     monkeypatch.setattr(gm, 'get_group_service', lambda: group_service)
-    monkeypatch.setattr(gm, 'get_user_service', lambda: user_service)
+    monkeypatch.setattr(gm, 'search_user_options', user_options)
     values = ['G', 'E', '']
     st.selectbox = lambda *a, **k: values.pop(0)
     st.button = lambda label: label == 'Add User to Group'
@@ -74,10 +74,10 @@ def test_user_groups_delete(monkeypatch):
     calls = []
     ug_service = SimpleNamespace(get_user_groups=lambda: [record], delete_user_group=lambda rid: calls.append(('delete', rid)))
     group_service = SimpleNamespace(get_groups=lambda: [{'id': 'g1', 'groupName': 'G'}])
-    user_service = SimpleNamespace(get_users=lambda: [{'userId': 'u1', 'userEmail': 'E'}])
+    user_options = lambda key: {'E': {'userId': 'u1', 'userEmail': 'E'}}
     monkeypatch.setattr(gm, 'get_user_group_service', lambda: ug_service)
     monkeypatch.setattr(gm, 'get_group_service', lambda: group_service)
-    monkeypatch.setattr(gm, 'get_user_service', lambda: user_service)
+    monkeypatch.setattr(gm, 'search_user_options', user_options)
     values = ['', '', 'G', 'E']
     st.selectbox = lambda *a, **k: values.pop(0)
     st.button = lambda label: label == 'Delete?'
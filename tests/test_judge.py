@@ -0,0 +1,81 @@
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src.eval.judge import BatchJudge, JudgeVerdict, JudgeVerdicts, LocalBatchProvider, OfflineJudge, chunk_items, read_batch_results
+from src.eval.eval_runner import EvalRunner, verdict
+from src.database.models import AIEvalInput
+
+
+def _verdicts(numbered):
+    results = [part for part in numbered.split('### Result ') if part.strip()]
+    return JudgeVerdicts(verdicts=[JudgeVerdict(index=i, evaluation=f'checked {r.split(chr(10), 1)[1].strip()}', verdict='pass' if 'good' in r else 'fail') for i, r in enumerate(results)])
+
+
+class StructuredChat:
+    def __init__(self):
+        self.calls = []
+    def invoke(self, messages):
+        self.calls.append([m.content for m in messages])
+        return _verdicts(messages[-1].content)
+
+
+def test_chunk_items_groups_by_eval_prompt():
+    items = [('a', 'x'), ('b', 'y'), ('a', 'z'), ('a', 'w')]
+    assert chunk_items(items, 2) == [('a', [0, 2]), ('a', [3]), ('b', [1])]
+
+
+def test_batch_judge_packs_outputs_per_eval_prompt():
+    chat = StructuredChat()
+    items = [('crit', 'good one'), ('crit', 'bad one'), ('other', 'good two')]
+    results = BatchJudge(chat, batch_size=5).judge(items)
+    assert len(chat.calls) == 2
+    assert chat.calls[0][1] == 'crit'
+    assert results == ['checked good one\nPASS', 'checked bad one\nFAIL', 'checked good two\nPASS']
+    assert [verdict(r) for r in results] == [True, False, True]
+
+
+def test_offline_judge_round_trips_batch_files(tmp_path):
+    bodies = []
+
+    def respond(body):
+        bodies.append(body)
+        return _verdicts(body['messages'][-1]['content']).model_dump_json()
+    judge = OfflineJudge(LocalBatchProvider(respond), 'm', batch_size=2, workdir=str(tmp_path))
+    results = judge.judge([('crit', 'good'), ('crit', 'bad'), ('crit', 'good again')])
+    assert results == ['checked good\nPASS', 'checked bad\nFAIL', 'checked good again\nPASS']
+    lines = [json.loads(line) for line in (tmp_path / 'judge_requests.jsonl').read_text().splitlines()]
+    assert [line['custom_id'] for line in lines] == ['judge-0', 'judge-1']
+    assert lines[0]['url'] == '/v1/chat/completions' and lines[0]['body']['model'] == 'm'
+    assert lines[0]['body']['response_format']['json_schema']['name'] == 'JudgeVerdicts'
+    assert len(bodies) == 2
+
+
+def test_read_batch_results_skips_corrupt_rows(tmp_path):
+    good = JudgeVerdicts(verdicts=[JudgeVerdict(index=0, evaluation='ok', verdict='pass')]).model_dump_json()
+    rows = [{'custom_id': 'judge-0', 'response': {'status_code': 200, 'body': {'choices': [{'message': {'content': good}}]}}}, {'custom_id': 'judge-1', 'response': {'status_code': 200, 'body': {'choices': [{'message': {'content': '{"verdicts": [{"index": 0'}}]}}}]
+    path = tmp_path / 'results.jsonl'
+    path.write_text('\n'.join([json.dumps(r) for r in rows] + ['{not json']) + '\n')
+    assert read_batch_results(str(path), {'judge-0': [0], 'judge-1': [1]}, 2) == ['ok\nPASS', None]
+
+
+def test_runner_uses_batched_judge():
+    class Chat:
+        def __init__(self):
+            self.calls = 0
+        def invoke(self, messages):
+            self.calls += 1
+            return SimpleNamespace(content=f'good {messages[-1].content}')
+
+    class Repo:
+        def create_results(self, results, ids=None, extra_writes=None):
+            self.results = results
+            return [r.eval_input_id for r in results]
+    chat, repo, judge_chat = Chat(), Repo(), StructuredChat()
+    inputs = [AIEvalInput(id=f'i{i}', input_text=f'q{i}', eval_prompt='crit') for i in range(4)]
+    run = EvalRunner(chat, repo, max_workers=2, judge=BatchJudge(judge_chat, batch_size=10)).run(SimpleNamespace(text='S', prompt_name='p', version=1), inputs)
+    assert chat.calls == 4
+    assert len(judge_chat.calls) == 1
+    assert sorted(run['result_ids']) == ['i0', 'i1', 'i2', 'i3']
+    assert all(verdict(r.llm_judge_says) for r in repo.results)
@@ -1,5 +1,6 @@
 import sys
 import json
+from datetime import datetime, timezone
 from pathlib import Path
 root = Path(__file__).resolve().parents[1]
 sys.path.append(str(root))
@@ -9,15 +10,25 @@ from handler import handler
 class DummyService:
     def __init__(self):
         self.calls = []
-    def get_all_tasks_for_user(self, uid):
-        self.calls.append(('list', uid))
-        return [type('T', (), {'to_dict': lambda self: {'id': '1'}})()]
+    latest = None
+    def get_watermark(self, uid):
+        return self.latest
+    def get_task_updated_at(self, uid, tid):
+        self.calls.append(('check', uid, tid))
+        return datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    def query_tasks(self, uid, **criteria):
+        self.calls.append(('list', uid, criteria))
+        rows = [{'id': '1', 'title': 't', 'updatedAt': datetime(2024, 1, 2, tzinfo=timezone.utc), 'dueDate': None}]
+        return (rows, '1' if criteria.get('limit') == 1 else None)
+    def apply_batch(self, uid, operations):
+        self.calls.append(('batch', uid, operations))
+        return [{'op': o['op'], 'id': o.get('id', 'n'), 'ok': o['op'] != 'delete'} for o in operations]
     def create_task(self, uid, data):
         self.calls.append(('create', uid, data))
         return '1'
     def get_task(self, uid, tid):
         self.calls.append(('get', uid, tid))
-        return type('T', (), {'to_dict': lambda self: {'id': tid}})()
+        return type('T', (), {'to_dict': lambda self: {'id': tid}, 'updated_at': datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)})()
     def update_task(self, uid, tid, data):
         self.calls.append(('update', uid, tid, data))
         return True
@@ -33,8 +44,27 @@ def test_list(monkeypatch):
     service = DummyService()
     event = {'httpMethod': 'GET', 'path': '/tasks', 'queryStringParameters': {'user_id': 'u'}}
     result = _run(event, monkeypatch, service)
-    assert json.loads(result['body']) == [{'id': '1'}]
-    assert service.calls == [('list', 'u')]
+    assert json.loads(result['body']) == [{'id': '1', 'title': 't', 'updatedAt': '2024-01-02T00:00:00+00:00', 'dueDate': None}]
+    assert service.calls == [('list', 'u', {'status': None, 'tag': None, 'limit': 100})]
+    assert result['headers'] == {'X-Watermark': '2024-01-02T00:00:00+00:00'}
+
+def test_list_filters_projection_and_cursor(monkeypatch):
+    service = DummyService()
+    params = {'user_id': 'u', 'status': 'active', 'tag': 'work', 'fields': 'title', 'limit': '1', 'since': '2024-01-01T00:00:00', 'cursor': 'YWJj'}
+    result = _run({'httpMethod': 'GET', 'path': '/tasks', 'queryStringParameters': params}, monkeypatch, service)
+    assert json.loads(result['body']) == [{'id': '1', 'title': 't'}]
+    criteria = service.calls[0][2]
+    assert criteria['since'] == datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert criteria['fields'] == ['title']
+    assert criteria['cursor'] == 'abc'
+    assert result['headers']['X-Next-Cursor'] == 'MQ'
+
+def test_list_bad_params(monkeypatch):
+    service = DummyService()
+    for params in ({'limit': 'x'}, {'limit': '0'}, {'since': 'yesterday'}):
+        result = _run({'httpMethod': 'GET', 'path': '/tasks', 'queryStringParameters': dict(params, user_id='u')}, monkeypatch, service)
+        assert result['statusCode'] == 400
+    assert service.calls == []
 
 def test_create(monkeypatch):
     service = DummyService()
@@ -60,3 +90,53 @@ def test_update(monkeypatch):
     assert json.loads(result['body']) == {'success': True}
     assert service.calls[0] == ('update', 'u', 'x', {'title': 't'})
 
+
+def test_batch(monkeypatch):
+    service = DummyService()
+    ops = [{'op': 'create', 'data': {'title': 'a'}}, {'op': 'complete', 'id': 'x'}, {'op': 'delete', 'id': 'y'}]
+    event = {'httpMethod': 'POST', 'path': '/tasks:batch', 'queryStringParameters': {'user_id': 'u'}, 'body': json.dumps({'operations': ops})}
+    body = json.loads(_run(event, monkeypatch, service)['body'])
+    assert service.calls == [('batch', 'u', ops)]
+    assert (body['succeeded'], body['failed']) == (2, 1)
+    assert [r['id'] for r in body['results']] == ['n', 'x', 'y']
+
+def test_batch_rejects_bad_body(monkeypatch):
+    service = DummyService()
+    for body in ('not json', json.dumps({'operations': []}), json.dumps([{'op': 'delete', 'id': 'x'}] * 501)):
+        event = {'httpMethod': 'POST', 'path': '/tasks:batch', 'queryStringParameters': {'user_id': 'u'}, 'body': body}
+        assert _run(event, monkeypatch, service)['statusCode'] == 400
+    assert service.calls == []
+
+def test_list_conditional_get(monkeypatch):
+    service = DummyService()
+    service.latest = datetime(2024, 1, 2, 3, 4, 5, 600000, tzinfo=timezone.utc)
+    event = {'httpMethod': 'GET', 'path': '/tasks', 'queryStringParameters': {'user_id': 'u', 'status': 'active'}}
+    first = _run(event, monkeypatch, service)
+    etag = first['headers']['ETag']
+    assert first['headers']['Last-Modified'] == 'Tue, 02 Jan 2024 03:04:05 GMT'
+    assert _run(dict(event, headers={'If-None-Match': etag}), monkeypatch, service)['statusCode'] == 304
+    assert _run(dict(event, headers={'if-modified-since': 'Tue, 02 Jan 2024 03:04:05 GMT'}), monkeypatch, service)['statusCode'] == 304
+    assert len(service.calls) == 1
+    other = dict(event, queryStringParameters={'user_id': 'u', 'status': 'completed'}, headers={'If-None-Match': etag})
+    assert _run(other, monkeypatch, service)['statusCode'] == 200
+    service.latest = datetime(2024, 1, 2, 3, 4, 6, tzinfo=timezone.utc)
+    assert _run(dict(event, headers={'If-None-Match': etag}), monkeypatch, service)['statusCode'] == 200
+
+def test_get_task_conditional(monkeypatch):
+    service = DummyService()
+    event = {'httpMethod': 'GET', 'path': '/tasks/x', 'queryStringParameters': {'user_id': 'u'}}
+    first = _run(event, monkeypatch, service)
+    assert service.calls == [('get', 'u', 'x')]
+    cached = _run(dict(event, headers={'If-None-Match': 'W/' + first['headers']['ETag']}), monkeypatch, service)
+    assert cached['statusCode'] == 304 and cached['headers']['ETag'] == first['headers']['ETag']
+    assert service.calls[1:] == [('check', 'u', 'x')]
+    stale = _run(dict(event, headers={'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT'}), monkeypatch, service)
+    assert stale['statusCode'] == 200
+
+def test_list_since_with_fields_keeps_tombstones(monkeypatch):
+    service = DummyService()
+    moved = datetime(2024, 1, 3, tzinfo=timezone.utc)
+    service.query_tasks = lambda uid, **criteria: ([{'id': 'a', 'title': 'x', 'updatedAt': moved, 'dueDate': None}, {'id': 'b', 'removed': True, 'updatedAt': moved}], None)
+    params = {'user_id': 'u', 'since': '2024-01-01T00:00:00Z', 'fields': 'title'}
+    result = _run({'httpMethod': 'GET', 'path': '/tasks', 'queryStringParameters': params}, monkeypatch, service)
+    assert json.loads(result['body']) == [{'id': 'a', 'title': 'x'}, {'id': 'b', 'removed': True}]
@@ -0,0 +1,17 @@
+import sys
+from pathlib import Path
+root = Path(__file__).resolve().parents[1]
+sys.path.append(str(root / 'aws_lambda_api'))
+import import_benchmark
+
+
+def test_parse_importtime():
+    stderr = 'import time: self [us] | cumulative | imported package\nimport time:       120 |        450 |   json.decoder\nimport time:        80 |        900 | json\n'
+    assert import_benchmark.parse_importtime(stderr) == {'json.decoder': 450, 'json': 900}
+
+
+def test_lambda_handlers_stay_light():
+    report = import_benchmark.check(runs=1)
+    for module, result in report.items():
+        assert result['forbidden'] == [], module
+        assert result['import_ms'] <= result['budget_ms'], module
@@ -0,0 +1,51 @@
+import json
+import sys
+from pathlib import Path
+root = Path(__file__).resolve().parents[1]
+sys.path.append(str(root))
+from aws_lambda_api.lambda_runtime import LambdaRuntime, eager_init_enabled
+
+
+def test_init_times_steps_and_survives_failures():
+    calls = []
+
+    def broken():
+        raise ValueError('no credentials')
+    runtime = LambdaRuntime('t', [('ok', lambda: calls.append('ok')), ('broken', broken), ('after', lambda: calls.append('after'))], emit=lambda line: None)
+    assert runtime.init() is False
+    assert calls == ['ok', 'after']
+    assert set(runtime.init_steps) == {'ok', 'broken', 'after'}
+    assert runtime.init_errors == {'broken': 'no credentials'}
+    assert runtime.init_ms is not None
+
+
+def test_warmup_short_circuits_and_metrics_are_emitted():
+    lines = []
+    handled = []
+    runtime = LambdaRuntime('t', [('noop', lambda: None)], metrics=lambda: {'ConnectionReuseRate': 0.5}, emit=lines.append)
+    runtime.init()
+
+    @runtime.handler
+    def handler(event, context):
+        handled.append(event)
+        return {'statusCode': 200}
+    warm = handler({'warmup': True}, None)
+    assert warm['statusCode'] == 200 and json.loads(warm['body'])['warm'] is True
+    assert handled == []
+    assert handler({'path': '/x'}, None) == {'statusCode': 200}
+    first, second = [json.loads(line) for line in lines]
+    assert (first['ColdStart'], first['Warmup'], first['InitMs']) == (1, 1, runtime.init_ms)
+    assert (second['ColdStart'], second['Warmup'], second['InitMs']) == (0, 0, 0.0)
+    assert second['ConnectionReuseRate'] == 0.5 and second['Function'] == 't'
+    names = [m['Name'] for m in second['_aws']['CloudWatchMetrics'][0]['Metrics']]
+    assert 'HandleMs' in names and 'InitMs' in names
+
+
+def test_eager_init_defaults_to_lambda_environment(monkeypatch):
+    monkeypatch.delenv('LAMBDA_EAGER_INIT', raising=False)
+    monkeypatch.delenv('AWS_LAMBDA_FUNCTION_NAME', raising=False)
+    assert eager_init_enabled() is False
+    monkeypatch.setenv('AWS_LAMBDA_FUNCTION_NAME', 'fn')
+    assert eager_init_enabled() is True
+    monkeypatch.setenv('LAMBDA_EAGER_INIT', '0')
+    assert eager_init_enabled() is False
@@ -0,0 +1,50 @@
+import sys
+from pathlib import Path
+from types import ModuleType
+
+root = Path(__file__).resolve().parents[1]
+sys.path.append(str(root))
+sys.path.append(str(root / 'src'))
+
+st = ModuleType('streamlit')
+
+class Tab:
+    def __init__(self, open):
+        self.open = open
+    def __enter__(self):
+        return self
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+tabs_called = []
+
+def tabs(names, **k):
+    tabs_called.append((names, k))
+    return [Tab(i == 1) for i in range(len(names))]
+
+st.tabs = tabs
+st.session_state = {}
+sys.modules['streamlit'] = st
+
+import src.ui.lazy_tabs as lazy_tabs
+
+
+def test_only_open_tab_renders(monkeypatch):
+    monkeypatch.setattr(lazy_tabs, 'st', st)
+    calls = []
+    lazy_tabs.render_lazy_tabs('k', {'A': lambda: calls.append('a'), 'B': lambda: calls.append('b'), 'C': lambda: calls.append('c')})
+    assert calls == ['b']
+    assert tabs_called[-1] == (['A', 'B', 'C'], {'key': 'k', 'on_change': 'rerun'})
+
+
+def test_cached_tab_data(monkeypatch):
+    monkeypatch.setattr(lazy_tabs, 'st', st)
+    st.session_state.clear()
+    loads = []
+    loader = lambda: loads.append(1) or ['row']
+    assert lazy_tabs.cached_tab_data('t.users', loader) == ['row']
+    assert lazy_tabs.cached_tab_data('t.users', loader) == ['row']
+    assert len(loads) == 1
+    lazy_tabs.clear_tab_data('t.')
+    lazy_tabs.cached_tab_data('t.users', loader)
+    assert len(loads) == 2
@@ -17,7 +17,6 @@ from ai.llm_models import NewTask, ModifiedTask, TaskChanges
 def create_service(monkeypatch):
     os.environ.setdefault('OPENAI_API_KEY', 'k')
     monkeypatch.setattr('ai.llm_service.get_client', lambda: SimpleNamespace())
-    monkeypatch.setattr('ai.llm_executor.LangChainTracer', lambda: SimpleNamespace())
     return LlmService()
 
 
@@ -35,8 +34,8 @@ def test_second_call_raises(monkeypatch):
             err = DummyChatError('boom')
             err.response = SimpleNamespace(status_code=500, headers={'h': 'v'}, json=lambda: {'e': 'x'}, text='t')
             raise err
-    monkeypatch.setattr('ai.llm_executor.ChatOpenAI', DummyChat)
-    monkeypatch.setattr('ai.llm_executor.LangChainTracer', lambda: SimpleNamespace())
+    monkeypatch.setattr('src.ai.llm_clients.ChatOpenAI', DummyChat)
+    monkeypatch.setattr('src.ai.llm_clients._llm_clients', None)
     executor = LlmExecutor(SimpleNamespace(api_key='k', model='m'))
     with pytest.raises(DummyChatError):
         executor._second_call('content')
@@ -70,12 +69,82 @@ def test_update_task_error(monkeypatch):
 
 def test_third_call_handles_exception(monkeypatch):
     class TS:
-        def create_task(self, u, d):
-            pass
-        def update_task(self, u, t, d):
+        def apply_changes(self, u, changes):
             raise RuntimeError('bad')
     monkeypatch.setattr('ai.llm_executor.get_task_service', lambda: TS())
     executor = LlmExecutor(SimpleNamespace())
     changes = TaskChanges(new_tasks=[NewTask(title='x')], modified_tasks=[ModifiedTask(id='m', title='y')])
     res = executor._third_call('u1', changes)
     assert res is None
+
+
+def test_single_pass_makes_one_structured_call(monkeypatch):
+    calls = []
+
+    class DummyChat:
+        def __init__(self, api_key=None, model=None, temperature=None, **k):
+            calls.append(('init', temperature))
+        def with_structured_output(self, schema):
+            calls.append(('structured', schema))
+            return self
+        def invoke(self, messages):
+            calls.append(('invoke', messages[0].content))
+            return TaskChanges(new_tasks=[NewTask(title='x')], modified_tasks=[])
+    monkeypatch.setattr('src.ai.llm_clients.ChatOpenAI', DummyChat)
+    monkeypatch.setattr('src.ai.llm_clients._llm_clients', None)
+    executor = LlmExecutor(SimpleNamespace(api_key='k', model='m'))
+    monkeypatch.setattr(executor, '_first_call', lambda *a: pytest.fail('two-pass path used'))
+    resp = executor.plan('S', ' add x ', {'active': [{'id': 't1'}]}, 'single_pass')
+    assert resp.new_tasks[0].title == 'x'
+    assert [c[0] for c in calls] == ['init', 'structured', 'invoke']
+    assert calls[1][1].__name__ == 'TaskChanges'
+    assert '"id":"t1"' in calls[2][1]
+
+
+def test_mode_benchmark_offline():
+    from ai.mode_benchmark import compare_modes, _sample_cases
+    report = compare_modes(_sample_cases(), latency=0)
+    assert report['equivalent']
+    assert report['two_pass']['accuracy'] == report['single_pass']['accuracy'] == 1
+    assert report['two_pass']['calls'] == 2 * report['single_pass']['calls']
+    assert report['single_pass']['prompt_chars'] < report['two_pass']['prompt_chars']
+
+
+def test_mode_benchmark_detects_divergence():
+    from ai.mode_benchmark import StubChatModel, compare_modes, _sample_cases
+
+    class LossyPlanner(StubChatModel):
+        def _plan_line(self, task, modified):
+            return f'- complete task {task.id}' if modified else f'- new task: {task.title}'
+    report = compare_modes(_sample_cases(), latency=0, model=LossyPlanner)
+    assert not report['equivalent'] and report['mismatches'] == [2]
+    assert report['two_pass']['wrong'] == [2] and report['single_pass']['wrong'] == []
+    assert report['two_pass']['outputs'][2]['new_tasks'] == [{'title': 'Call the bank'}]
+
+
+def test_stream_yields_tokens_then_items(monkeypatch):
+    class DummyChat:
+        def __init__(self, *a, **k):
+            self.schema = None
+        def with_structured_output(self, schema):
+            chat = DummyChat()
+            chat.schema = schema
+            return chat
+        def stream(self, messages):
+            if self.schema is None:
+                for token in ['add ', 'x ', 'and y']:
+                    yield SimpleNamespace(content=token)
+                return
+            yield {'new_tasks': [{'title': 'x'}]}
+            yield {'new_tasks': [{'title': 'x'}, {'title': 'y'}]}
+            yield {'new_tasks': [{'title': 'x'}, {'title': 'y'}], 'modified_tasks': [{'id': 'm', 'status': 'completed'}]}
+    monkeypatch.setattr('src.ai.llm_clients.ChatOpenAI', DummyChat)
+    monkeypatch.setattr('src.ai.llm_clients._llm_clients', None)
+    executor = LlmExecutor(SimpleNamespace(api_key='k', model='m'))
+    monkeypatch.setattr(executor, '_third_call', lambda uid, resp: resp)
+    events = list(executor.stream('u1', 'S', 'hi', {}))
+    kinds = [e[0] for e in events]
+    assert kinds == ['token', 'token', 'token', 'new_task', 'new_task', 'modified_task', 'done']
+    assert ''.join(p for k, p in events if k == 'token') == 'add x and y'
+    assert [p.title for k, p in events if k == 'new_task'] == ['x', 'y']
+    assert events[-1][1].modified_tasks[0].id == 'm'
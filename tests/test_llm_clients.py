@@ -0,0 +1,79 @@
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src.ai import llm_clients
+from src.ai.llm_clients import LlmClientRegistry
+from src.ai.llm_models import TaskChanges
+
+
+class DummyChat:
+
+    def __init__(self, api_key=None, model=None, temperature=None, http_client=None):
+        self.args = (api_key, model, temperature)
+        self.http_client = http_client
+        self.schema = None
+
+    def with_structured_output(self, schema):
+        structured = DummyChat(*self.args, http_client=self.http_client)
+        structured.schema = schema
+        return structured
+
+
+def test_registry_reuses_clients(monkeypatch):
+    monkeypatch.setattr(llm_clients, 'ChatOpenAI', DummyChat)
+    registry = LlmClientRegistry()
+    a = registry.get_chat('k', 'm', 0.2)
+    b = registry.get_chat('k', 'm', 0.2)
+    c = registry.get_chat('k', 'm', 0.2, TaskChanges)
+    d = registry.get_chat('k', 'm', 0.7)
+    assert a is b
+    assert c is not a and c.schema is TaskChanges
+    assert d.args == ('k', 'm', 0.7)
+    assert a.http_client is d.http_client
+    stats = registry.stats()
+    assert stats['clients'] == 3
+    assert stats['client_hits'] == 1
+    registry.close()
+
+
+def test_registry_caches_json_schema_bindings(monkeypatch):
+    monkeypatch.setattr(llm_clients, 'ChatOpenAI', DummyChat)
+    registry = LlmClientRegistry()
+    a = registry.get_chat('k', 'm', 0.2, TaskChanges.model_json_schema())
+    b = registry.get_chat('k', 'm', 0.2, TaskChanges.model_json_schema())
+    assert a is b and a.schema['title'] == 'TaskChanges'
+    assert registry.stats()['client_hits'] == 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+def test_connection_reuse_is_tracked():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    registry = LlmClientRegistry()
+    try:
+        client = registry.http_client()
+        for _ in range(3):
+            assert client.get(f'http://127.0.0.1:{server.server_port}/').text == 'ok'
+        stats = registry.stats()
+        assert stats['http_requests'] == 3
+        assert stats['new_connections'] == 1
+        assert abs(stats['connection_reuse_rate'] - 2 / 3) < 1e-9
+    finally:
+        registry.close()
+        server.shutdown()
+        server.server_close()
@@ -1,6 +1,7 @@
 import json
 import os
 import sys
+import pytest
 from datetime import datetime
 from pathlib import Path
 from types import SimpleNamespace, ModuleType
@@ -34,7 +35,7 @@ def test_list_tasks(monkeypatch):
     assert result == {'active': [{'id': 'a'}], 'completed': [{'id': 'b'}], 'deleted': [{'id': 'c'}]}
 
 def test_get_system_prompt_fallback(monkeypatch):
-    monkeypatch.setattr('ai.llm_service.get_prompt_repository', lambda: SimpleNamespace(get_active_prompt=lambda n: None))
+    monkeypatch.setattr('ai.llm_service.get_prompt_registry', lambda: SimpleNamespace(get_active=lambda n: None))
     service = create_service(monkeypatch)
     prompt = service._get_system_prompt()
     assert prompt.prompt_name == 'AI_Tasks'
@@ -51,21 +52,18 @@ def test_update_task_success(monkeypatch):
     assert updates == [('u1', 't1', {'title': 'n'})]
 
 def test_executor_third_call(monkeypatch):
-    calls = {'c': [], 'u': []}
+    calls = []
 
     class DummyTS:
 
-        def create_task(self, uid, data):
-            calls['c'].append((uid, data))
-
-        def update_task(self, uid, tid, data):
-            calls['u'].append((uid, tid, data))
+        def apply_changes(self, uid, changes):
+            calls.append((uid, changes))
+            return [{'op': 'create', 'id': 'n1', 'ok': True}, {'op': 'update', 'id': 'm', 'ok': False, 'error': 'x'}]
     monkeypatch.setattr('ai.llm_executor.get_task_service', lambda: DummyTS())
     executor = LlmExecutor(SimpleNamespace())
     changes = TaskChanges(new_tasks=[NewTask(title='x')], modified_tasks=[ModifiedTask(id='m', title='y')])
-    executor._third_call('u1', changes)
-    assert calls['c'][0][0] == 'u1'
-    assert calls['u'][0] == ('u1', 'm', {'title': 'y'})
+    assert executor._third_call('u1', changes) is changes
+    assert calls == [('u1', changes)]
 
 def test_first_call_builds_prompt(monkeypatch):
     record = {}
@@ -77,8 +75,8 @@ def test_first_call_builds_prompt(monkeypatch):
         def invoke(self, messages):
             record['messages'] = messages
             return SimpleNamespace(content='ok')
-    monkeypatch.setattr('ai.llm_executor.ChatOpenAI', DummyChat)
-    monkeypatch.setattr('ai.llm_executor.LangChainTracer', lambda: SimpleNamespace())
+    monkeypatch.setattr('src.ai.llm_clients.ChatOpenAI', DummyChat)
+    monkeypatch.setattr('src.ai.llm_clients._llm_clients', None)
     executor = LlmExecutor(SimpleNamespace(api_key='k', model='m'))
     result = executor._first_call('S', ' hi ', {'active': [], 'completed': []})
     assert result == 'ok'
@@ -108,37 +106,148 @@ def test_task_roundtrip():
     assert t2.due_date == dt
     assert t2.notes == 'n'
 
-def test_prompt_repo_set_active_version(monkeypatch):
-    updates = []
+class PromptDB:
 
-    class DB:
+    def __init__(self, prompts, head=None):
+        self.prompts = prompts
+        self.heads = {head['prompt_name']: head} if head else {}
+        self.batches = []
+        self.queries = []
+        self.texts = {}
+        self.meta = {}
+        self.transactions = []
+
+    def new_id(self, c):
+        return f'n{len(self.prompts) + 1}'
+
+    def read(self, c, doc_id):
+        if c == 'AI_prompt_heads':
+            return self.heads.get(doc_id)
+        if c == 'AI_prompt_texts':
+            return self.texts.get(doc_id)
+        if c == 'AI_prompt_meta':
+            return self.meta.get(doc_id)
+        return next((dict(p) for p in self.prompts if p['id'] == doc_id), None)
 
-        def query(self, *a, **k):
-            return [{'id': '1', 'version': 1}, {'id': '2', 'version': 2}]
+    def get_many(self, c, ids):
+        return {i: self.read(c, i) for i in ids}
 
-        def update(self, c, doc_id, data):
-            updates.append((doc_id, data['status']))
-    monkeypatch.setattr('ai.prompt_repository.get_client', lambda: DB())
+    def query(self, c, filters=None, **k):
+        self.queries.append((c, filters))
+        rows = list(self.heads.values()) if c == 'AI_prompt_heads' else self.prompts
+        for field, _, value in filters or []:
+            rows = [p for p in rows if p.get(field) == value]
+        return rows[:k['limit']] if k.get('limit') else rows
+
+    def transact(self, c, doc_id, build):
+        self.transactions.append((c, doc_id))
+        writes, result = build(self.read(c, doc_id))
+        if writes:
+            self.batch_write(writes)
+        return result
+
+    def batch_write(self, writes):
+        self.batches.append(writes)
+        for op, c, doc_id, data in writes:
+            if c == 'AI_prompt_heads' and op == 'set':
+                self.heads[doc_id] = data
+            elif c == 'AI_prompts' and op == 'set':
+                self.prompts.append(dict(data, id=doc_id))
+            elif c == 'AI_prompt_texts':
+                self.texts[doc_id] = data
+            elif c == 'AI_prompt_meta':
+                self.meta[doc_id] = data
+        return True
+
+def test_prompt_repo_set_active_version(monkeypatch):
+    db = PromptDB([{'id': '1', 'prompt_name': 'p', 'text': 'a', 'version': 1, 'status': 'active'}, {'id': '2', 'prompt_name': 'p', 'text': 'b', 'version': 2, 'status': 'inactive'}])
+    monkeypatch.setattr('ai.prompt_repository.get_client', lambda: db)
     repo = PromptRepository()
     res = repo.set_active_version('p', 2)
     assert res is True
-    assert updates == [('1', 'inactive'), ('2', 'active')]
+    assert len(db.batches) == 1
+    writes = db.batches[0]
+    assert [(w[0], w[1], w[2]) for w in writes] == [('update', 'AI_prompts', '1'), ('update', 'AI_prompts', '2'), ('set', 'AI_prompt_heads', 'p')]
+    assert writes[0][3] == {'status': 'inactive'} and writes[1][3] == {'status': 'active'}
+    head = writes[2][3]
+    assert head['activeId'] == '2' and head['prompt']['text'] == 'b'
+    assert (head['latestId'], head['latestVersion']) == ('2', 2)
+    assert [v['version'] for v in head['versions']] == [2, 1]
 
-def test_prompt_repo_set_active_version_notfound(monkeypatch):
-    updates = []
+def test_prompt_repo_set_active_version_uses_head(monkeypatch):
+    db = PromptDB([{'id': '1', 'prompt_name': 'p', 'text': 'a', 'version': 1}, {'id': '2', 'prompt_name': 'p', 'text': 'b', 'version': 2}, {'id': '3', 'prompt_name': 'p', 'text': 'c', 'version': 3}])
+    monkeypatch.setattr('ai.prompt_repository.get_client', lambda: db)
+    repo = PromptRepository()
+    db.heads['p'] = repo.rebuild_catalog()[0].to_dict()
+    db.heads['p'].update({'activeId': '1', 'activeVersion': 1, 'prompt': {'prompt_name': 'p', 'text': 'a', 'version': 1, 'status': 'active'}})
+    db.queries.clear()
+    assert repo.set_active_version('p', 3) is True
+    assert [w[2] for w in db.batches[-1]] == ['1', '3', 'p']
+    prompt = repo.get_active_prompt('p')
+    assert (prompt.id, prompt.version, prompt.text) == ('3', 3, 'c')
+    assert db.queries == []
+    assert db.transactions == [('AI_prompt_heads', 'p')]
 
-    class DB:
+def test_prompt_repo_activation_deactivates_transactional_active(monkeypatch):
+
+    class RetryDB(PromptDB):
 
-        def query(self, *a, **k):
-            return [{'id': '1', 'version': 1}]
+        def transact(self, c, doc_id, build):
+            build(self.read(c, doc_id))
+            self.heads['p'] = dict(self.heads['p'], activeId='2', activeVersion=2)
+            return super().transact(c, doc_id, build)
+    db = RetryDB([{'id': '1', 'prompt_name': 'p', 'text': 'a', 'version': 1}, {'id': '2', 'prompt_name': 'p', 'text': 'b', 'version': 2}, {'id': '3', 'prompt_name': 'p', 'text': 'c', 'version': 3}])
+    monkeypatch.setattr('ai.prompt_repository.get_client', lambda: db)
+    repo = PromptRepository()
+    db.heads['p'] = dict(repo.rebuild_catalog()[0].to_dict(), activeId='1', activeVersion=1)
+    assert repo.set_active_version('p', 3) is True
+    assert [(w[2], w[3]) for w in db.batches[-1][:2]] == [('2', {'status': 'inactive'}), ('3', {'status': 'active'})]
+    assert db.heads['p']['activeId'] == '3'
 
-        def update(self, c, doc_id, data):
-            updates.append((doc_id, data['status']))
-    monkeypatch.setattr('ai.prompt_repository.get_client', lambda: DB())
+def test_prompt_repo_set_active_version_notfound(monkeypatch):
+    db = PromptDB([{'id': '1', 'prompt_name': 'p', 'version': 1, 'status': 'active'}])
+    monkeypatch.setattr('ai.prompt_repository.get_client', lambda: db)
     repo = PromptRepository()
     res = repo.set_active_version('p', 2)
     assert res is False
-    assert updates == [('1', 'inactive')]
+    assert db.batches == []
+    with pytest.raises(ValueError):
+        repo.set_active_version('missing', 1)
+
+def test_prompt_repo_catalog_tracks_latest_version(monkeypatch):
+    db = PromptDB([{'id': '1', 'prompt_name': 'p', 'text': 'a', 'version': 1, 'status': 'active'}, {'id': '2', 'prompt_name': 'p', 'text': 'b', 'version': 2, 'status': 'inactive'}, {'id': '3', 'prompt_name': 'q', 'text': 'z', 'version': 1, 'status': 'active'}])
+    monkeypatch.setattr('ai.prompt_repository.get_client', lambda: db)
+    repo = PromptRepository()
+    catalog = repo.get_catalog()
+    assert [(h.prompt_name, h.active_version, h.latest_version) for h in catalog] == [('p', 1, 2), ('q', 1, 1)]
+    new_id = repo.create_prompt_version('1', {'text': 'c'})
+    head = db.heads['p']
+    assert (head['latestId'], head['latestVersion'], head['activeVersion']) == (new_id, 3, 1)
+    assert 'text' not in db.prompts[-1] and db.texts[db.prompts[-1]['textHash']] == {'text': 'c'}
+    db.queries.clear()
+    assert sorted(p.text for p in repo.get_latest_prompts()) == ['c', 'z']
+    assert db.queries == [('AI_prompt_heads', None)]
+
+def test_prompt_repo_new_version_requires_text_or_hash(monkeypatch):
+    db = PromptDB([{'id': '1', 'prompt_name': 'p', 'version': 1, 'status': 'active'}])
+    monkeypatch.setattr('ai.prompt_repository.get_client', lambda: db)
+    with pytest.raises(ValueError, match='neither text nor textHash'):
+        PromptRepository().create_prompt_version('1', {})
+
+
+def test_prompt_repo_catalog_backfills_legacy_and_partial_heads(monkeypatch):
+    legacy = [{'id': '1', 'prompt_name': 'p', 'text': 'a', 'version': 1, 'status': 'inactive'}, {'id': '2', 'prompt_name': 'p', 'text': 'b', 'version': 2, 'status': 'active'}, {'id': '3', 'prompt_name': 'q', 'text': 'z', 'version': 1, 'status': 'active'}]
+    db = PromptDB(legacy, head={'prompt_name': 'p', 'activeId': '2', 'activeVersion': 2, 'prompt': {'prompt_name': 'p', 'text': 'b', 'version': 2, 'status': 'active'}})
+    monkeypatch.setattr('ai.prompt_repository.get_client', lambda: db)
+    repo = PromptRepository()
+    head, actives = repo._load_head('p')
+    assert [v['version'] for v in head.versions] == [2, 1] and actives == ['2']
+    catalog = repo.get_catalog()
+    assert [(h.prompt_name, h.latest_version, len(h.versions)) for h in catalog] == [('p', 2, 2), ('q', 1, 1)]
+    assert db.meta['catalog']['version'] == 1
+    fresh = PromptRepository()
+    assert [h.prompt_name for h in fresh.get_catalog()] == ['p', 'q']
+    assert len(db.batches) == 1
 
 def test_eval_input_repo_create(monkeypatch):
     captured = {}
@@ -66,13 +66,11 @@ def test_call_openai(monkeypatch):
     tc = TaskChanges(new_tasks=[], modified_tasks=[])
     monkeypatch.setattr(executor, '_second_call', lambda c1: tc)
     monkeypatch.setattr(executor, '_third_call', lambda uid, r: 'done')
-    monkeypatch.setattr('ai.llm_executor.LangChainTracer', lambda: SimpleNamespace())
     result = executor.execute('user', 'prompt', 'input', {}, 'chat1')
     assert result == 'done'
 
 def test_process_chat_records_prompt(monkeypatch):
     monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
-    monkeypatch.setattr('ai.llm_executor.LangChainTracer', lambda: SimpleNamespace())
     captured = {}
 
     def create(coll, data):
@@ -87,8 +85,9 @@ def test_process_chat_records_prompt(monkeypatch):
     monkeypatch.setattr('ai.llm_service.get_task_service', lambda: dummy_ts)
     service = LlmService()
     monkeypatch.setattr(service, '_get_system_prompt', lambda: AIPrompt(prompt_name='AI_Tasks', text='t', version=3))
-    monkeypatch.setattr(service.executor, 'execute', lambda u, sp, it, tl, cid: TaskChanges(new_tasks=[], modified_tasks=[]))
+    monkeypatch.setattr(service.executor, 'execute', lambda u, sp, it, tl, cid, mode=None: TaskChanges(new_tasks=[], modified_tasks=[]))
     service.process_chat('user1', 'hello')
     assert captured['data']['prompt_name'] == 'AI_Tasks'
     assert captured['data']['prompt_version'] == 3
+    assert captured['data']['prompt_mode'] == 'two_pass'
     assert 'Response' in captured['update']
@@ -0,0 +1,75 @@
+import sys
+import threading
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src.ai.prompt_registry import PromptRegistry
+from src.database.models import AIPrompt
+
+
+class Loader:
+    def __init__(self):
+        self.version = 1
+        self.calls = 0
+    def __call__(self, name):
+        self.calls += 1
+        return AIPrompt(prompt_name=name, text='t', version=self.version)
+
+
+def test_fresh_entries_are_served_from_memory():
+    now = [0.0]
+    loader = Loader()
+    registry = PromptRegistry(loader, fresh_for=10, max_stale=100, clock=lambda: now[0], background=False)
+    assert registry.get_active('AI_Tasks').version == 1
+    now[0] = 5
+    assert registry.get_active('AI_Tasks').version == 1
+    assert loader.calls == 1
+    assert registry.stats()['hits'] == 1
+
+
+def test_stale_entry_is_served_while_revalidating():
+    now = [0.0]
+    loader = Loader()
+    release = threading.Event()
+    registry = PromptRegistry(loader, fresh_for=10, max_stale=100, clock=lambda: now[0])
+    registry.get_active('AI_Tasks')
+    loader.version = 2
+    original = registry.refresh
+
+    def slow_refresh(name):
+        release.wait(5)
+        return original(name)
+    registry.refresh = slow_refresh
+    now[0] = 20
+    assert registry.get_active('AI_Tasks').version == 1
+    assert registry.get_active('AI_Tasks').version == 1
+    release.set()
+    for thread in threading.enumerate():
+        if thread.name.startswith('prompt-refresh-'):
+            thread.join(5)
+    assert loader.calls == 2
+    assert registry.get_active('AI_Tasks').version == 2
+
+
+def test_max_stale_bounds_and_invalidation():
+    now = [0.0]
+    loader = Loader()
+    registry = PromptRegistry(loader, fresh_for=10, max_stale=100, clock=lambda: now[0], background=False)
+    registry.get_active('AI_Tasks')
+    loader.version = 2
+    now[0] = 200
+    assert registry.get_active('AI_Tasks').version == 2
+    loader.version = 3
+    registry.invalidate('AI_Tasks')
+    assert registry.get_active('AI_Tasks').version == 3
+    assert loader.calls == 3
+
+
+def test_refresh_errors_keep_stale_prompt():
+    now = [0.0]
+    loader = Loader()
+    registry = PromptRegistry(loader, fresh_for=10, max_stale=100, clock=lambda: now[0], background=False)
+    registry.get_active('AI_Tasks')
+    registry.loader = lambda name: (_ for _ in ()).throw(RuntimeError('down'))
+    now[0] = 50
+    assert registry.get_active('AI_Tasks').version == 1
+    assert registry.stats()['refresh_errors'] == 1
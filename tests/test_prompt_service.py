@@ -7,6 +7,7 @@ from ai.prompt_service import PromptService
 def _setup(monkeypatch):
     repo = MagicMock()
     monkeypatch.setattr('ai.prompt_service.get_prompt_repository', lambda: repo)
+    monkeypatch.setattr('ai.prompt_service.get_prompt_registry', lambda: MagicMock())
     service = PromptService()
     return (service, repo)
 
@@ -23,6 +24,7 @@ def test_update_prompt_creates_new_version(monkeypatch):
     result = service.update_prompt('id1', {'text': 'new text'})
     assert result is True
     repo.create_prompt_version.assert_called_once_with('id1', {'text': 'new text'})
+    service.registry.invalidate.assert_called_once_with()
 
 def test_set_active_version(monkeypatch):
     service, repo = _setup(monkeypatch)
@@ -30,3 +32,4 @@ def test_set_active_version(monkeypatch):
     result = service.set_active_version('p1', 2)
     assert result is True
     repo.set_active_version.assert_called_once_with('p1', 2)
+    service.registry.refresh.assert_called_once_with('p1')
@@ -0,0 +1,68 @@
+import sys
+from pathlib import Path
+import pytest
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src.ai.prompt_text_store import PromptTextStore, apply_delta, encode_delta, text_hash
+
+
+class DB:
+    def __init__(self):
+        self.docs = {}
+        self.reads = 0
+    def read(self, c, doc_id):
+        self.reads += 1
+        return self.docs.get(doc_id)
+    def get_many(self, c, ids):
+        self.reads += 1
+        return {i: self.docs.get(i) for i in ids}
+    def commit(self, write):
+        if write:
+            self.docs[write[2]] = write[3]
+
+
+BASE = ''.join(f'Rule {i}: keep tasks short and actionable.\n' for i in range(40))
+
+
+def test_delta_round_trip():
+    text = BASE.replace('Rule 7:', 'Rule 7 (changed):') + 'One more line\n'
+    delta = encode_delta(BASE, text)
+    assert apply_delta(BASE, delta) == text
+    assert sum(len(op.get('text', '')) for op in delta) < 100
+
+
+def test_put_is_content_addressed_and_deduped():
+    db = DB()
+    store = PromptTextStore(db)
+    digest, write = store.put(BASE)
+    assert digest == text_hash(BASE) and write[3] == {'text': BASE}
+    db.commit(write)
+    assert store.put(BASE) == (digest, None)
+
+
+def test_delta_chain_resolves_and_is_cached():
+    db = DB()
+    writer = PromptTextStore(db, use_delta=True, max_depth=2)
+    base_hash, write = writer.put(BASE)
+    db.commit(write)
+    digests = [base_hash]
+    text = BASE
+    for i in range(4):
+        text = text + f'Extra rule {i}\n'
+        digest, write = writer.put(text, digests[-1])
+        db.commit(write)
+        digests.append(digest)
+    kinds = ['delta' if 'delta' in db.docs[d] else 'full' for d in digests]
+    assert kinds == ['full', 'delta', 'delta', 'full', 'delta']
+    reader = PromptTextStore(db)
+    assert reader.get(digests[-1]) == text
+    reads = db.reads
+    assert reader.get_many(digests[-1:]) == {digests[-1]: text}
+    assert db.reads == reads
+
+
+def test_hash_mismatch_is_rejected():
+    db = DB()
+    db.docs['bad'] = {'text': 'x'}
+    store = PromptTextStore(db)
+    with pytest.raises(ValueError, match='hash check'):
+        store.get('bad')
@@ -0,0 +1,78 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src.ai.response_cache import ResponseCache, normalize_input
+
+PROMPT = SimpleNamespace(prompt_name='AI_Tasks', version=2, mode='two_pass')
+
+
+def test_normalize_input():
+    assert normalize_input("  What's due   THIS week?\n") == 'what s due this week'
+
+
+def test_exact_hit_and_snapshot_invalidation():
+    cache = ResponseCache(ttl=60)
+    cache.put('u', PROMPT, "What's due this week?", 'h1', 'resp')
+    assert cache.get('u', PROMPT, 'whats due this week', 'h1') is None
+    assert cache.get('u', PROMPT, "what's due this week", 'h1') == 'resp'
+    assert cache.get('u', SimpleNamespace(prompt_name='AI_Tasks', version=3, mode='two_pass'), "what's due this week", 'h1') is None
+    assert cache.get('u', PROMPT, "what's due this week", 'h2') is None
+    assert cache.get('u', PROMPT, "what's due this week", 'h1') is None
+    assert cache.stats['hits'] == 1
+    assert cache.stats['invalidations'] == 2
+
+
+def test_similarity_lookup_uses_threshold():
+    vectors = {'what is due this week': [1.0, 0.0], 'whats due this week': [0.99, 0.1], 'add a task': [0.0, 1.0]}
+    embedded = []
+
+    def embed(text):
+        embedded.append(text)
+        return vectors[text]
+    cache = ResponseCache(ttl=60, similarity_threshold=0.95, embedder=embed)
+    cache.put('u', PROMPT, 'What is due this week', 'h', 'resp')
+    assert cache.get('u', PROMPT, 'whats due this week', 'h') == 'resp'
+    assert cache.get('u', PROMPT, 'add a task', 'h') is None
+    assert cache.stats['similar_hits'] == 1
+    cache.get('u', PROMPT, 'add a task', 'h')
+    assert embedded.count('add a task') == 1
+
+
+def test_llm_service_hit_skips_llm(monkeypatch):
+    import src.ai.llm_service as llm_service
+    from src.ai.llm_models import TaskChanges
+    monkeypatch.setenv('OPENAI_API_KEY', 'k')
+    monkeypatch.setattr(llm_service, 'get_client', lambda: SimpleNamespace(create=lambda c, d: 'cid', update=lambda *a: None))
+    monkeypatch.setattr(llm_service, 'get_response_cache', lambda: ResponseCache(ttl=60))
+    service = llm_service.LlmService()
+    monkeypatch.setattr(service, '_get_system_prompt', lambda: llm_service.AIPrompt(prompt_name='AI_Tasks', text='t', version=1))
+    monkeypatch.setattr(service, '_list_tasks', lambda uid: {'active': [{'id': 't1', 'title': 'a'}], 'completed': []})
+    calls = []
+    changes = TaskChanges(new_tasks=[], modified_tasks=[])
+
+    def execute(*a, **k):
+        calls.append('llm')
+        return changes
+    monkeypatch.setattr(service.executor, 'execute', execute)
+    assert service.process_chat('u', "What's due?")['response'] is changes
+    assert service.process_chat('u', 'whats due')['response'] is not None
+    assert service.process_chat('u', "what's due")['response'] is changes
+    assert calls == ['llm', 'llm']
+
+
+def test_llm_service_never_caches_or_replays_writes(monkeypatch):
+    import src.ai.llm_service as llm_service
+    from src.ai.llm_models import NewTask, TaskChanges
+    monkeypatch.setenv('OPENAI_API_KEY', 'k')
+    monkeypatch.setattr(llm_service, 'get_client', lambda: SimpleNamespace(create=lambda c, d: 'cid', update=lambda *a: None))
+    monkeypatch.setattr(llm_service, 'get_response_cache', lambda: ResponseCache(ttl=60))
+    service = llm_service.LlmService()
+    monkeypatch.setattr(service, '_get_system_prompt', lambda: llm_service.AIPrompt(prompt_name='AI_Tasks', text='t', version=1))
+    monkeypatch.setattr(service, '_list_tasks', lambda uid: {'active': [], 'completed': []})
+    calls = []
+    monkeypatch.setattr(service.executor, 'execute', lambda *a, **k: calls.append('llm') or TaskChanges(new_tasks=[NewTask(title='x')], modified_tasks=[]))
+    service.process_chat('u', 'add x')
+    service.process_chat('u', 'add x')
+    assert calls == ['llm', 'llm']
+    assert service.cache.stats['hits'] == 0
@@ -16,7 +16,7 @@ class Tab:
 
 tabs_called = []
 
-def tabs(names):
+def tabs(names, **k):
     tabs_called.append(names)
     return [Tab() for _ in names]
 
@@ -49,6 +49,7 @@ st.error = lambda *a, **k: None
 sys.modules['streamlit'] = st
 
 import importlib
+import src.ui.lazy_tabs as lazy_tabs
 import src.ui.settings as settings
 importlib.reload(settings)
 
@@ -59,6 +60,7 @@ def test_render_settings(monkeypatch):
     monkeypatch.setattr(settings, 'get_user_service', lambda: SimpleNamespace(update_timezone=lambda uid, tz: calls.setdefault('update', (uid, tz)) or True))
     monkeypatch.setattr(settings, 'render_changelog', lambda: None)
     monkeypatch.setattr(settings, 'render_run_tests', lambda: None)
+    monkeypatch.setattr(lazy_tabs, 'st', st)
     tabs_called.clear()
     settings.render_settings()
     assert tabs_called and tabs_called[0] == ['Settings', 'ChangeLog', 'Run Tests']
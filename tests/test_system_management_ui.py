@@ -17,7 +17,7 @@ class Tab:
 
 tabs_called = []
 
-def tabs(names):
+def tabs(names, **k):
     tabs_called.append(names)
     return [Tab() for _ in names]
 
@@ -26,6 +26,7 @@ st.title = lambda *a, **k: None
 sys.modules['streamlit'] = st
 
 import importlib
+import src.ui.lazy_tabs as lazy_tabs
 import src.ui.system_management as sm
 importlib.reload(sm)
 
@@ -35,6 +36,7 @@ def test_render_system_management(monkeypatch):
     monkeypatch.setattr(sm, 'render_prompt_management', lambda: calls.append('p'))
     monkeypatch.setattr(sm, 'render_group_management', lambda: calls.append('g'))
     monkeypatch.setattr(sm, 'render_task_assignment', lambda: calls.append('t'))
+    monkeypatch.setattr(lazy_tabs, 'st', st)
     tabs_called.clear()
     sm.render_system_management()
     assert tabs_called and tabs_called[0] == ['Prompt Management', 'Group Management', 'Assign Tasks']
@@ -34,7 +34,7 @@ def test_render_task_assignment(monkeypatch):
     users = [{'userId': 'u2', 'userEmail': 'e'}]
     service = SimpleNamespace(get_all_tasks=lambda: tasks, assign_tasks=lambda ids, uid: setattr(st, 'assigned', (ids, uid)))
     monkeypatch.setattr(ta, 'get_task_service', lambda: service)
-    monkeypatch.setattr(ta, 'get_user_service', lambda: SimpleNamespace(get_users=lambda: users))
+    monkeypatch.setattr(ta, 'search_user_options', lambda key: {'e': users[0]})
     ta.render_task_assignment()
     assert getattr(st, 'assigned', None) == (['1'], 'u2')
     assert captured['opts'] == ["A (u1)"]
@@ -0,0 +1,40 @@
+import sys
+from datetime import datetime
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src.ai import task_context
+from src.ai.task_context import build_task_context, compact_task
+
+
+def _task(i, title, **extra):
+    data = {'id': f't{i}', 'userId': 'u', 'title': title, 'status': 'active', 'description': 'd' * 50, 'ownerEmail': 'o@x.com', 'updates': [{'ts': 'x', 'text': 'long update history ' * 5}], 'createdAt': datetime(2024, 1, 1)}
+    data.update(extra)
+    return data
+
+
+def test_compact_task_keeps_minimal_fields():
+    task = _task(1, 'Pay rent', dueDate=datetime(2024, 5, 1, 9, 30), tags=['home'])
+    assert compact_task(task) == {'id': 't1', 'title': 'Pay rent', 'due': '2024-05-01', 'status': 'active', 'tags': ['home']}
+
+
+def test_ranks_active_by_similarity_and_caps_completed(monkeypatch):
+    monkeypatch.setattr(task_context, '_encoding', False)
+    active = [_task(i, f'Unrelated chore {i}') for i in range(30)] + [_task(99, 'Renew passport application')]
+    completed = [_task(100 + i, f'Done {i}', status='completed', completionDate=datetime(2024, 1, i + 1)) for i in range(20)]
+    ctx = build_task_context('please renew my passport', {'active': active, 'completed': completed}, token_budget=200, max_completed=3)
+    lines = ctx.text.split('\n')
+    assert lines[1].startswith('{"id":"t99"')
+    assert ctx.tokens <= 200
+    assert ctx.completed <= 3
+    assert ctx.dropped == 51 - ctx.active - ctx.completed
+    assert 'updates' not in ctx.text and 'ownerEmail' not in ctx.text
+    assert ctx.tokens_saved > 0
+    assert ctx.stats()['contextTokensSaved'] == ctx.tokens_saved
+
+
+def test_completed_most_recent_first(monkeypatch):
+    monkeypatch.setattr(task_context, '_encoding', False)
+    completed = [_task(i, f'Done {i}', status='completed', completionDate=datetime(2024, 1, i + 1)) for i in range(5)]
+    ctx = build_task_context('x', {'active': [], 'completed': completed}, max_completed=2)
+    assert ctx.completed == 2
+    assert '"id":"t4"' in ctx.text and '"id":"t3"' in ctx.text and '"id":"t0"' not in ctx.text
@@ -21,8 +21,10 @@ st.session_state = SessionState({'user': {'email': 'u'}, 'userId': 'u'})
 sys.modules['streamlit'] = st
 
 import importlib
+import src.ui.fragments as fragments
 import src.ui.task_list as tl
 import src.ui.group_tasks as gt
+importlib.reload(fragments)
 importlib.reload(tl)
 importlib.reload(gt)
 
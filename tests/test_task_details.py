@@ -88,7 +88,9 @@ st.rerun = lambda: None
 sys.modules['streamlit'] = st
 
 import importlib
+import src.ui.fragments as fragments
 import src.ui.task_list as tl
+importlib.reload(fragments)
 importlib.reload(tl)
 
 def test_details_fetch(monkeypatch):
@@ -107,3 +109,13 @@ def test_details_fetch(monkeypatch):
     monkeypatch.setattr(tl, 'get_task_service', lambda: service)
     tl.render_task_list([task_obj], tl.TaskStatus.ACTIVE)
     assert calls.get('get') == ('u', '1')
+
+
+def test_lists_read_from_snapshot(monkeypatch):
+    task_obj = SimpleNamespace(id='1', title='A', user_id='u', status='active', due_date=None)
+    calls = []
+    service = SimpleNamespace(get_task_snapshot=lambda u: calls.append(u) or {tl.TaskStatus.ACTIVE: [task_obj]})
+    monkeypatch.setattr(tl, 'get_task_service', lambda: service)
+    assert tl._load_tasks('u', tl.TaskStatus.ACTIVE) == [task_obj]
+    assert tl._load_tasks('u', tl.TaskStatus.DELETED) == []
+    assert calls == ['u', 'u']
@@ -3,6 +3,8 @@ from pathlib import Path
 from unittest.mock import MagicMock
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 from tasks.task_service import TaskService
+from tasks.task_snapshot import TaskSnapshotCache
+from database.models import Task, TaskStatus
 
 def _setup_service(monkeypatch):
     mock_repo = MagicMock()
@@ -49,3 +51,181 @@ def test_assign_tasks(monkeypatch):
     service, repo = _setup_service(monkeypatch)
     service.assign_tasks(['t1', 't2'], 'u2')
     repo.assign_tasks.assert_called_once_with(['t1', 't2'], 'u2')
+
+def _setup_snapshot_service(monkeypatch, tasks):
+    service, repo = _setup_service(monkeypatch)
+    service.snapshots = TaskSnapshotCache(probe_interval=0)
+    repo.get_all_tasks_for_user.return_value = tasks
+    repo.get_latest_update.return_value = 'w1'
+    return (service, repo)
+
+def test_task_snapshot_reuses_until_watermark_changes(monkeypatch):
+    tasks = [Task(id='a', user_id='u1', title='A'), Task(id='b', user_id='u1', title='B', status=TaskStatus.COMPLETED)]
+    service, repo = _setup_snapshot_service(monkeypatch, tasks)
+    snapshot = service.get_task_snapshot('u1')
+    assert [t.id for t in snapshot[TaskStatus.ACTIVE]] == ['a']
+    assert [t.id for t in snapshot[TaskStatus.COMPLETED]] == ['b']
+    service.get_task_snapshot('u1')
+    assert repo.get_all_tasks_for_user.call_count == 1
+    repo.get_latest_update.return_value = 'w2'
+    service.get_task_snapshot('u1')
+    assert repo.get_all_tasks_for_user.call_count == 2
+
+def test_task_snapshot_patched_by_mutations(monkeypatch):
+    tasks = [Task(id='a', user_id='u1', title='A')]
+    service, repo = _setup_snapshot_service(monkeypatch, tasks)
+    service.get_task_snapshot('u1')
+    repo.complete_task.return_value = True
+    repo.get_latest_update.return_value = 'w2'
+    service.complete_task('u1', 'a')
+    snapshot = service.get_task_snapshot('u1')
+    assert snapshot[TaskStatus.ACTIVE] == []
+    assert [t.id for t in snapshot[TaskStatus.COMPLETED]] == ['a']
+    assert repo.get_all_tasks_for_user.call_count == 1
+    repo.get_latest_update.return_value = 'w3'
+    service.get_task_snapshot('u1')
+    assert repo.get_all_tasks_for_user.call_count == 2
+    service.create_task('u1', {'title': 'N'})
+    service.get_task_snapshot('u1')
+    assert repo.get_all_tasks_for_user.call_count == 3
+
+def test_apply_changes_returns_per_item_results(monkeypatch):
+    from ai.llm_models import ModifiedTask, NewTask, TaskChanges
+    service, repo = _setup_service(monkeypatch)
+    repo.apply_changes.return_value = {'created': ['n1'], 'updated': {'m1': True, 'm2': False}}
+    changes = TaskChanges(new_tasks=[NewTask(title='x', due_date='2024-01-01')], modified_tasks=[ModifiedTask(id='m1', status='completed'), ModifiedTask(id='m2', title='y')])
+    results = service.apply_changes('u1', changes)
+    creates, updates = repo.apply_changes.call_args.args[1:]
+    assert creates[0].title == 'x' and creates[0].user_id == 'u1'
+    assert [(u[0], u[1]) for u in updates] == [('m1', {'status': 'completed'}), ('m2', {'title': 'y'})]
+    assert results[0] == {'op': 'create', 'id': 'n1', 'ok': True}
+    assert results[1] == {'op': 'update', 'id': 'm1', 'ok': True}
+    assert results[2]['ok'] is False and results[2]['id'] == 'm2'
+
+def test_repository_apply_changes_uses_two_rpcs(monkeypatch):
+    from tasks.task_repository import TaskRepository
+    rpcs = []
+
+    class DB:
+        def get_many(self, collection, ids):
+            rpcs.append(('get_many', list(ids)))
+            return {'m1': {'id': 'm1', 'userId': 'u1'}, 'm2': {'id': 'm2', 'userId': 'other'}}
+        def new_id(self, collection):
+            return f'n{len(rpcs)}'
+        def array_union(self, values):
+            return ('union', values)
+        def batch_write(self, writes):
+            rpcs.append(('batch', writes))
+            return True
+    monkeypatch.setattr('tasks.task_repository.get_client', lambda: DB())
+    repo = TaskRepository()
+    creates = [Task(user_id='u1', title=f't{i}', due_date='2024-01-01') for i in range(10)]
+    updates = [('m1', {'title': 'a'}, 'Task updated'), ('m2', {'title': 'b'}, 'Task updated')]
+    outcome = repo.apply_changes('u1', creates, updates)
+    assert [r[0] for r in rpcs] == ['get_many', 'batch']
+    assert len(outcome['created']) == 10
+    assert outcome['updated'] == {'m1': True, 'm2': False}
+    writes = rpcs[1][1]
+    assert [w[0] for w in writes] == ['set'] * 10 + ['update']
+    assert writes[-1][3]['updates'][0] == 'union'
+    assert writes[-1][3]['updates'][1][0]['updateText'] == 'Task updated'
+
+def test_apply_batch_validates_and_keeps_order(monkeypatch):
+    service, repo = _setup_service(monkeypatch)
+    repo.apply_operations.return_value = [('n1', None), ('t1', 'Task is not active')]
+    ops = [{'op': 'create', 'data': {'title': 'x'}}, {'op': 'archive', 'id': 't9'}, {'op': 'complete', 'id': 't1'}, {'op': 'delete'}]
+    results = service.apply_batch('u1', ops)
+    sent = repo.apply_operations.call_args.args[1]
+    assert [o[0] for o in sent] == ['create', 'complete']
+    assert sent[0][2].title == 'x' and sent[0][2].user_id == 'u1'
+    assert results[0] == {'op': 'create', 'id': 'n1', 'ok': True}
+    assert results[1]['ok'] is False and 'archive' in results[1]['error']
+    assert results[2] == {'op': 'complete', 'id': 't1', 'ok': False, 'error': 'Task is not active'}
+    assert results[3]['error'] == 'id is required'
+
+def test_repository_apply_operations_tracks_status_in_batch(monkeypatch):
+    from tasks.task_repository import TaskRepository
+    rpcs = []
+
+    class DB:
+        def get_many(self, collection, ids):
+            rpcs.append(('get_many', list(ids)))
+            return {'a': {'userId': 'u1', 'status': 'active'}, 'b': {'userId': 'u1', 'status': 'completed'}, 'c': {'userId': 'other', 'status': 'active'}}
+        def array_union(self, values):
+            return values
+        def batch_write(self, writes):
+            rpcs.append(('batch', writes))
+    monkeypatch.setattr('tasks.task_repository.get_client', lambda: DB())
+    ops = [('update', 'a', {'title': 'x'}, None), ('complete', 'a', None, None), ('complete', 'a', None, None), ('complete', 'b', None, None), ('delete', 'b', None, None), ('delete', 'c', None, None)]
+    results = TaskRepository().apply_operations('u1', ops)
+    assert [e is None for _, e in results] == [True, True, False, False, True, False]
+    assert rpcs[0] == ('get_many', ['a', 'b', 'c'])
+    writes = rpcs[1][1]
+    assert [(w[2], w[3].get('status')) for w in writes] == [('a', None), ('a', TaskStatus.COMPLETED), ('b', TaskStatus.DELETED)]
+    assert writes[1][3]['updates'][0]['updateText'] == 'Task completed'
+
+class QueryDB:
+
+    def __init__(self, rows, removed=None):
+        self.rows = rows
+        self.removed = removed or []
+        self.calls = []
+        self.removal_calls = []
+
+    def query(self, collection, **kwargs):
+        if collection == 'task_removals':
+            self.removal_calls.append(kwargs)
+            return self.removed[:kwargs.get('limit') or len(self.removed)]
+        self.calls.append(kwargs)
+        return self.rows[:kwargs['limit']]
+
+def test_repository_query_tasks_pages_and_filters(monkeypatch):
+    from datetime import datetime
+    from tasks.task_repository import TaskRepository
+    rows = [{'id': str(i), 'dueDate': datetime(2024, 1, i + 1), 'updatedAt': datetime(2024, 2, i + 1)} for i in range(3)]
+    db = QueryDB(rows)
+    monkeypatch.setattr('tasks.task_repository.get_client', lambda: db)
+    repo = TaskRepository()
+    page, cursor = repo.query_tasks('u1', status='active', tag='x', fields=['title'], limit=2, cursor='c0')
+    assert [r['id'] for r in page] == ['0', '1'] and cursor == '1'
+    call = db.calls[0]
+    assert call['filters'] == [('userId', '==', 'u1'), ('status', '==', 'active'), ('tags', 'array_contains', 'x')]
+    assert (call['order_by'], call['direction'], call['limit'], call['start_after']) == ('updatedAt', 'DESCENDING', 3, 'c0')
+    assert call['fields'] == ['dueDate', 'title', 'updatedAt']
+    repo.query_tasks('u1', since=datetime(2024, 1, 1), due_before=datetime(2024, 1, 2), limit=5)
+    assert db.calls[1]['filters'][1:] == [('dueDate', '<', datetime(2024, 1, 2)), ('updatedAt', '>', datetime(2024, 1, 1))]
+    assert (db.calls[1]['order_by'], db.calls[1]['limit']) == ('updatedAt', 6)
+
+def test_repository_task_updated_at_reads_projection(monkeypatch):
+    from datetime import datetime
+    from tasks.task_repository import TaskRepository
+    reads = []
+
+    class DB:
+        def read(self, collection, doc_id, fields=None):
+            reads.append((doc_id, fields))
+            return {'userId': 'u1', 'updatedAt': datetime(2024, 1, 1)}
+    monkeypatch.setattr('tasks.task_repository.get_client', lambda: DB())
+    repo = TaskRepository()
+    assert repo.get_task_updated_at('u1', 't1') == datetime(2024, 1, 1)
+    assert repo.get_task_updated_at('u2', 't1') is None
+    assert reads[0] == ('t1', ['userId', 'updatedAt'])
+
+def test_repository_reassignment_moves_watermark_and_reports_removals(monkeypatch):
+    from datetime import datetime, timezone
+    from tasks.task_repository import TaskRepository
+    batches = []
+    moved = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    rows = [{'id': 'a', 'updatedAt': datetime(2024, 2, 1, tzinfo=timezone.utc)}]
+    db = QueryDB(rows, removed=[{'userId': 'u1', 'taskId': 'b', 'removedAt': moved}])
+    db.get_many = lambda c, ids: {'b': {'userId': 'u1', 'updates': []}, 'c': {'userId': 'u2'}, 'x': None}
+    db.batch_write = batches.append
+    monkeypatch.setattr('tasks.task_repository.get_client', lambda: db)
+    repo = TaskRepository()
+    repo.assign_tasks(['b', 'c', 'x'], 'u2')
+    assert [(w[0], w[1], w[2][:1]) for w in batches[0]] == [('update', 'tasks', 'b'), ('set', 'task_removals', 'b'), ('update', 'tasks', 'c')]
+    assert batches[0][1][3]['userId'] == 'u1' and batches[0][1][3]['taskId'] == 'b'
+    assert repo.get_watermark('u1') == moved
+    page, _ = repo.query_tasks('u1', since=datetime(2024, 1, 1, tzinfo=timezone.utc))
+    assert page == [rows[0], {'id': 'b', 'removed': True, 'updatedAt': moved}]
+    assert db.removal_calls[-1]['filters'][-1][:2] == ('removedAt', '>')
@@ -17,7 +17,7 @@ class Tab:
 
 tabs_called = []
 
-def tabs(names):
+def tabs(names, **k):
     tabs_called.append(names)
     return [Tab() for _ in names]
 
@@ -28,6 +28,7 @@ st.session_state = {}
 sys.modules['streamlit'] = st
 
 import importlib
+import src.ui.lazy_tabs as lazy_tabs
 import src.ui.tasks_page as tasks_page
 importlib.reload(tasks_page)
 
@@ -37,6 +38,7 @@ def test_render_my_tasks_page(monkeypatch):
     monkeypatch.setattr(tasks_page, 'render_completed_tasks', lambda: None)
     monkeypatch.setattr(tasks_page, 'render_deleted_tasks', lambda: None)
     monkeypatch.setattr(tasks_page, 'render_task_form', lambda *a, **k: None)
+    monkeypatch.setattr(lazy_tabs, 'st', st)
     tabs_called.clear()
     tasks_page.render_my_tasks_page()
     assert tabs_called and tabs_called[0] == ['Add Task', 'Active Tasks', 'Completed Tasks', 'Deleted Tasks']
@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src.utils import ttl_cache
+from src.utils.ttl_cache import TTLCache
+
+
+def test_get_put_expire(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(ttl_cache.time, 'monotonic', lambda: now[0])
+    cache = TTLCache(ttl=10)
+    cache.put('a', 1)
+    assert cache.get('a') == 1
+    now[0] = 111.0
+    assert cache.get('a') is None
+    assert len(cache) == 0
+
+
+def test_max_entries_and_discard():
+    cache = TTLCache(ttl=10, max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    cache.discard_where(lambda k, v: v == 3)
+    assert cache.get('c') is None
+    cache.clear()
+    assert cache.get('a') is None
@@ -0,0 +1,54 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src.users.user_directory import UserDirectory
+
+class DummyRepo:
+    def __init__(self, users):
+        self.users = users
+        self.calls = 0
+    def get_users(self):
+        self.calls += 1
+        return self.users
+
+def _directory(monkeypatch, users, ttl=300):
+    repo = DummyRepo(users)
+    monkeypatch.setattr('src.users.user_directory.get_user_repository', lambda: repo)
+    return (UserDirectory(ttl=ttl), repo)
+
+USERS = [
+    {'userId': 'u1', 'userEmail': 'ann@x.com', 'userName': 'Ann Lee'},
+    {'userId': 'u2', 'userEmail': 'bob@x.com', 'userName': 'Bob Stone'},
+    {'userId': 'u3', 'userEmail': 'lena@x.com'},
+]
+
+def test_lookups_share_one_scan(monkeypatch):
+    directory, repo = _directory(monkeypatch, USERS)
+    assert directory.get_by_email('ANN@x.com')['userId'] == 'u1'
+    assert directory.get_by_id('u2')['userEmail'] == 'bob@x.com'
+    assert len(directory.get_users()) == 3
+    assert repo.calls == 1
+
+def test_search_prefix(monkeypatch):
+    directory, _ = _directory(monkeypatch, USERS)
+    assert [u['userId'] for u in directory.search('le')] == ['u1', 'u3']
+    assert [u['userId'] for u in directory.search('sto')] == ['u2']
+    assert [u['userId'] for u in directory.search('', limit=2)] == ['u1', 'u2']
+    assert directory.search('zed') == []
+
+def test_invalidate_and_ttl(monkeypatch):
+    directory, repo = _directory(monkeypatch, USERS)
+    directory.search('a')
+    directory.invalidate()
+    directory.search('a')
+    assert repo.calls == 2
+    directory, repo = _directory(monkeypatch, USERS, ttl=0)
+    directory.search('a')
+    directory.search('a')
+    assert repo.calls == 2
+
+def test_null_names_do_not_break_index(monkeypatch):
+    users = USERS + [{'userId': 'u4', 'userEmail': 'max@x.com', 'userName': None}, {'userId': 'u5', 'userEmail': None, 'userName': None}]
+    directory, _ = _directory(monkeypatch, users)
+    assert [u['userId'] for u in directory.search('max')] == ['u4']
+    assert directory.get_by_id('u5')['userId'] == 'u5'
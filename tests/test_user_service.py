@@ -2,6 +2,7 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 from src.users.user_service import UserService
+from src.users.user_repository import UserRepository
 
 class DummyRepo:
     def __init__(self):
@@ -11,9 +12,9 @@ class DummyRepo:
         if email == 'e':
             return {'userId': 'u1', 'userEmail': 'e', 'userTZ': 'Z'}
         return None
-    def create_user(self, email, tz, name=None):
-        self.calls.append(('create', email, tz, name))
-        rec = {'userId': 'n1', 'userEmail': email, 'userTZ': tz}
+    def create_user(self, email, tz, name=None, role=None):
+        self.calls.append(('create', email, tz, name, role))
+        rec = {'userId': 'n1', 'userEmail': email, 'userTZ': tz, 'role': role}
         if name:
             rec['userName'] = name
         return rec
@@ -47,8 +48,9 @@ def test_login_new(monkeypatch):
     service = UserService()
     record = service.login('n', 'Name')
     assert record['userTZ'] == 'America/Los_Angeles'
-    assert repo.calls == [('get', 'n'), ('create', 'n', 'America/Los_Angeles', 'Name')]
-    assert roles.calls == ['n1']
+    assert repo.calls == [('get', 'n'), ('create', 'n', 'America/Los_Angeles', 'Name', 'regular')]
+    assert roles.calls == []
+    assert record['role'] == 'regular'
 
 def test_update_timezone(monkeypatch):
     repo = DummyRepo()
@@ -58,3 +60,36 @@ def test_update_timezone(monkeypatch):
     result = service.update_timezone('u1', 'UTC')
     assert result is True
     assert repo.calls[-1] == ('update_tz', 'u1', 'UTC')
+
+def test_login_uses_profile_cache(monkeypatch):
+    repo = DummyRepo()
+    roles = DummyRoleService()
+    monkeypatch.setattr('src.users.user_service.get_user_repository', lambda: repo)
+    monkeypatch.setattr('src.users.user_service.get_user_role_service', lambda: roles)
+    service = UserService()
+    first = service.login('e')
+    second = service.login('e')
+    assert first == second
+    assert first['role'] == 'regular'
+    assert repo.calls == [('get', 'e')]
+    assert roles.calls == ['u1']
+    service.update_timezone('u1', 'UTC')
+    service.login('e')
+    assert repo.calls[-1] == ('get', 'e')
+
+def test_create_user_single_batch(monkeypatch):
+    batches = []
+
+    class DB:
+        def new_id(self, collection):
+            return 'nid'
+        def batch_write(self, writes):
+            batches.append(writes)
+            return True
+    monkeypatch.setattr('src.users.user_repository.get_client', lambda: DB())
+    record = UserRepository().create_user('n', 'UTC', 'Name', role='regular')
+    assert record == {'userId': 'nid', 'userEmail': 'n', 'userTZ': 'UTC', 'userName': 'Name', 'role': 'regular'}
+    assert batches == [[
+        ('set', 'users', 'nid', {'userId': 'nid', 'userEmail': 'n', 'userTZ': 'UTC', 'userName': 'Name'}),
+        ('set', 'user_roles', 'nid', {'userId': 'nid', 'role': 'regular'}),
+    ]]